@@ -4,6 +4,7 @@ const AppState = {
     data: [],
     players: {},
     favorites: [],
+    thumbnailAtlas: null,
     currentLang: 'fr',
     state: {
         activeId: null,
@@ -12,6 +13,7 @@ const AppState = {
         isAutoNext: false,
         isMenuNavigation: false,
         isPlayingFavorites: false,
+        isDescriptionsPending: false,
         currentTagFilter: null,
         isGlobalMuted: false,
         isMainMenuOpen: false,
@@ -209,11 +211,15 @@ async function init() {
 
         const rawData = await response.json();
 
+        // Descriptions shipped apart from the data (tools/build_data.py), loaded once the feed is displayed
+        const descriptionsSource = ( AppState.config.site && AppState.config.site.descriptions_source )  ?  AppState.config.site.descriptions_source  :  null;
+        AppState.state.isDescriptionsPending = !!descriptionsSource;
+
         // VALIDATION
         AppState.data = rawData.filter( item => {
             const hasName  = item.event_name && item.event_name.trim() !== "";
             const hasImage = item.image && item.image.trim() !== "";
-            const hasDesc  = item.description && item.description.trim() !== "";
+            const hasDesc  = ( item.description && item.description.trim() !== "" ) || !!descriptionsSource;
 
             if( !hasName || !hasImage || !hasDesc ) {
                 console.error( "Skipping invalid item ( missing required fields):", item );
@@ -283,6 +289,14 @@ async function init() {
         renderDrawerTimeline();
         renderAtAGlance();
 
+        if( descriptionsSource ) {
+            loadDescriptions( descriptionsSource );
+        }
+
+        if( AppState.config.site && AppState.config.site.thumbnail_atlas ) {
+            loadThumbnailAtlas( AppState.config.site.thumbnail_atlas );
+        }
+
         if( favsParam ) {
             const urlFavs = favsParam.split( ',' ).map( Number ).filter( id => validIds.includes( id ) );
 
@@ -1051,6 +1065,33 @@ function getSvgHtml( spriteId, cssClass ) {
 }
 
 
+function getPictureSourcesHtml( g, sizeIds ) {
+    // <source> tags from the "image_srcset" descriptors written by tools/assets.py, one per format
+    // by order of preference. The candidates of several sizes ( e.g. image_mobile and image ) are
+    // merged, so the browser picks the smallest adequate file whatever the device
+    const srcset  = g.image_srcset || {};
+    const sources = new Map();
+    let sizes     = '100vw';
+
+    sizeIds.filter( ( id ) => srcset[id] ).forEach( ( id ) => {
+        sizes = srcset[id].sizes || sizes;
+        srcset[id].sources.forEach( ( source ) => {
+            const candidates = sources.get( source.type ) || new Map();
+            source.srcset.split( ',' ).forEach( ( candidate ) => {
+                const [ url, width ] = candidate.trim().split( /\s+/ );
+                if( !candidates.has( width ) ) candidates.set( width, url );
+            } );
+            sources.set( source.type, candidates );
+        } );
+    } );
+
+    return [ ...sources ].map( ( [ type, candidates ] ) => {
+        const candidatesList = [ ...candidates ].map( ( [ width, url ] ) => `${url} ${width}` ).join( ', ' );
+        return `<source type="${type}" srcset="${candidatesList}" sizes="${sizes}">`;
+    } ).join( '' );
+}
+
+
 function getHomeCardHtml() {
     const c           = AppState.config;
     //const s         = AppState.settings;
@@ -1219,6 +1260,82 @@ function getProgramItemsHtml() {
 }
 
 
+async function loadDescriptions( source ) {
+    // The cards are rendered with an empty description, filled in here
+    const descriptionsFile = source.replace( '{lang}', AppState.currentLang === 'en'  ?  'en'  :  'fr' );
+
+    try {
+        const response = await fetch( descriptionsFile );
+
+        if( !response.ok ) {
+            throw new Error( "Erreur " + descriptionsFile );
+        }
+
+        const descriptions = await response.json();
+
+        AppState.data.forEach( g => {
+            const descriptionText = descriptions[g.id];
+
+            if( !descriptionText ) {
+                return;
+            }
+
+            // Already in the current language
+            g.description = descriptionText;
+            delete g.descriptionEN;
+
+            const descText = document.querySelector( `#video-${g.id} .desc-text` );
+
+            if( descText ) {
+                descText.innerHTML = descriptionText;
+            }
+        } );
+    } catch( e ) {
+        console.error( "Descriptions non chargées", e );
+    }
+
+    AppState.state.isDescriptionsPending = false;
+}
+
+async function loadThumbnailAtlas( source ) {
+    // One sprite for the thumbnails of the drawer lists (tools/assets.py), instead of one request per artist
+    try {
+        const response = await fetch( source );
+
+        if( !response.ok ) {
+            throw new Error( "Erreur " + source );
+        }
+
+        AppState.thumbnailAtlas = await response.json();
+    } catch( e ) {
+        // The lists keep their <img> thumbnails
+        console.log( "Atlas non chargé", e );
+        return;
+    }
+
+    renderDrawerFavorites();
+    renderDrawerTimeline();
+}
+
+function getThumbnailHtml( g, src, className ) {
+    const atlas = AppState.thumbnailAtlas;
+    const cell  = atlas && atlas.items[g.id];
+
+    if( !cell ) {
+        return `<img src="${src}"${className  ?  ` class="${className}"`  :  ''} loading="lazy" alt="${g.event_name}">`;
+    }
+
+    // Percentages: the cell fills the element whatever its displayed size
+    const [ x, y, w, h ] = cell;
+    const sizeX = atlas.width  / w * 100;
+    const sizeY = atlas.height / h * 100;
+    const posX  = ( atlas.width  > w )  ?  x / ( atlas.width  - w ) * 100  :  0;
+    const posY  = ( atlas.height > h )  ?  y / ( atlas.height - h ) * 100  :  0;
+
+    return `<div class="thumb-atlas${className  ?  ` ${className}`  :  ''}" role="img" aria-label="${g.event_name}"
+                style="background-image: url('${atlas.image}'); background-size: ${sizeX}% ${sizeY}%; background-position: ${posX}% ${posY}%;"></div>`;
+}
+
 function getVideoCardHtml( g ) {
     const s        = AppState.settings;
     const tagsHtml = ( s.isDisplayTag && g.event_tags )
@@ -1285,7 +1402,7 @@ function getVideoCardHtml( g ) {
     const descriptionText = ( AppState.currentLang === 'en' && g.descriptionEN )  ?  g.descriptionEN  :  g.description;
     const socialsHtml     = getSocialsHtml( g );
     const ticketButtonsHtml = getTicketButtonsHtml( g );
-    const descHtml        = ( s.isDisplayArtistDescription && descriptionText )
+    const descHtml        = ( s.isDisplayArtistDescription && ( descriptionText || AppState.state.isDescriptionsPending ) )
         ? `
             <div class="artist-description" onclick="toggleArtistDescription( this, event )">
                 <div class="desc-header-row">
@@ -1307,6 +1424,7 @@ function getVideoCardHtml( g ) {
 
     const isMobile = isMobileDevice();
     const bgImage  = ( isMobile && g.image_mobile )  ?  g.image_mobile  :  g.image;
+    const bgSources = getPictureSourcesHtml( g, [ 'image_mobile', 'image' ] );
 
     const imageX = ( g.image_x !== undefined && g.image_x !== null )
         ? g.image_x
@@ -1318,6 +1436,10 @@ function getVideoCardHtml( g ) {
 
     const bgPosition = `${imageX}% ${imageY}%`;
 
+    // Painted until the image is loaded (tools/assets.py --image): dominant colour and tiny blurred preview
+    const bgPlaceholder = ( g.image_color  ?  `background-color: ${g.image_color};`  :  '' )
+        + ( g.image_placeholder  ?  ` background-image: url(${g.image_placeholder}); background-size: cover; background-position: ${bgPosition};`  :  '' );
+
     // Status logic
     const status = g.event_status || 'scheduled';
     const displayedStatuses = AppState.config.features.displayed_statuses || [];
@@ -1364,7 +1486,7 @@ function getVideoCardHtml( g ) {
         <article class="video-card section-snap ${AppState.favorites.includes( g.id )  ?  'is-favorite'  :  ''}" id="video-${g.id}" data-id="${g.id}">
             <div class="video-container">
                 ${boxTitleHtml}
-                <img class="video-background" src="${bgImage}" style="object-position: ${bgPosition};" loading="lazy" alt="${g.event_name}" />
+                <picture>${bgSources}<img class="video-background" src="${bgImage}" style="object-position: ${bgPosition}; ${bgPlaceholder}" loading="lazy" alt="${g.event_name}" /></picture>
                 <div id="player-${g.id}" class="yt-placeholder"></div>
                 <div class="video-click-layer"></div>
                 <div class="video-state-icon material-icons">play_arrow</div>
@@ -4074,7 +4196,7 @@ function renderDrawerFavorites() {
             const thumb = g.image_artist || g.image_thumbnail || g.image;
             return `
                 <li class="favorite-item">
-                    <img src="${thumb}" loading="lazy" alt="${g.event_name}">
+                    ${getThumbnailHtml( g, thumb )}
                     <div class="fav-title">${g.event_name}</div>
                     <button onclick="shareSong( ${g.id} )"             class="material-icons btn-fav-share">share</button>
                     <button onclick="VideoManager.scrollTo( ${g.id} )" class="material-icons btn-fav-play">play_arrow</button>
@@ -4173,7 +4295,7 @@ function renderDrawerTimeline() {
 
         return `
             <li class="timeline-item" onclick="VideoManager.scrollTo( ${g.id} )">
-                <img src="${thumb}" class="time-thumb" loading="lazy" alt="${g.event_name}">
+                ${getThumbnailHtml( g, thumb, 'time-thumb' )}
                 <div class="time-info">
                     <div class="time-row-title">
                         <h3>${g.event_name}</h3>
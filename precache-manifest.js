@@ -0,0 +1,530 @@
+// Generated by tools/precache.py - do not edit
+// Each entry is cached under its revision (content hash): the service worker only
+// refetches the files whose content changed
+self.PRECACHE_MANIFEST = {
+    "version": "29e86497d7bf5740",
+    "critical": [
+        {
+            "url": "./",
+            "revision": "6f6b908ca332c00a",
+            "size": 26049
+        },
+        {
+            "url": "./index.html",
+            "revision": "6f6b908ca332c00a",
+            "size": 26049
+        },
+        {
+            "url": "./manifest.json",
+            "revision": "b5bc4960993d49dd",
+            "size": 4716
+        },
+        {
+            "url": "./assets/css/style.css",
+            "revision": "774afada90cb1c4d",
+            "size": 104467
+        },
+        {
+            "url": "./assets/images/background/tinals-2018-trame-342x342-noir.svg",
+            "revision": "8d9b5139ebc309d6",
+            "size": 27411
+        },
+        {
+            "url": "./assets/images/sprites/sprite.svg",
+            "revision": "b3ccafa83021ba6a",
+            "size": 144206
+        },
+        {
+            "url": "./assets/js/app.js",
+            "revision": "704f6618061db1a7",
+            "size": 142945
+        },
+        {
+            "url": "./assets/js/control-bar.js",
+            "revision": "fda91a36b6ca129a",
+            "size": 3656
+        },
+        {
+            "url": "./assets/js/audio-player.js",
+            "revision": "e376ae7942b23b48",
+            "size": 1419
+        },
+        {
+            "url": "./assets/js/video-manager.js",
+            "revision": "ae0434be90fe0c4b",
+            "size": 18630
+        },
+        {
+            "url": "./assets/favicon/android-chrome-192x192.png",
+            "revision": "02088251dab73c33",
+            "size": 15518
+        },
+        {
+            "url": "./assets/favicon/android-chrome-512x512.png",
+            "revision": "df2d9e6b598616bf",
+            "size": 44273
+        },
+        {
+            "url": "./assets/favicon/favicon-maskable-192x192.png",
+            "revision": "2d960091e0ef28f3",
+            "size": 12223
+        },
+        {
+            "url": "./assets/favicon/favicon-maskable-512x512.png",
+            "revision": "9f5193936d654f3b",
+            "size": 39255
+        },
+        {
+            "url": "./assets/favicon/apple-touch-icon.png",
+            "revision": "7d2b1048ac8fe36f",
+            "size": 14412
+        },
+        {
+            "url": "./assets/favicon/favicon.ico",
+            "revision": "6901256d3333f057",
+            "size": 648
+        },
+        {
+            "url": "./assets/favicon/favicon.svg",
+            "revision": "091c874efa84aa15",
+            "size": 19272
+        },
+        {
+            "url": "./config/config_en.json",
+            "revision": "4bb1dbe604413428",
+            "size": 8525
+        },
+        {
+            "url": "./config/config_fr.json",
+            "revision": "5d296efe51850b97",
+            "size": 8872
+        },
+        {
+            "url": "./data/2026/data.min.json",
+            "revision": "cde389253a488abe",
+            "size": 29025
+        },
+        {
+            "url": "./data/2026/descriptions.fr.json",
+            "revision": "c19d0b4f90d0f684",
+            "size": 39625
+        },
+        {
+            "url": "./data/2026/descriptions.en.json",
+            "revision": "d3d96c8897ab6c0d",
+            "size": 33305
+        },
+        {
+            "url": "./data/2026/splash/affiche-tinals.webp",
+            "revision": "4acc35c78ce08257",
+            "size": 270114
+        }
+    ],
+    "media": [
+        {
+            "url": "./assets/images/peoples/olivier-loynet.jpg",
+            "revision": "13dc62f02a4ad0fe",
+            "size": 6528
+        },
+        {
+            "url": "./data/2026/images/thumbnails.json",
+            "revision": "ab6d08a9480bb865",
+            "size": 2723
+        },
+        {
+            "url": "./data/2026/images/thumbnails.webp",
+            "revision": "2cd383f42409eabf",
+            "size": 86408
+        },
+        {
+            "url": "./data/2026/images/16-horsepower.webp",
+            "revision": "2d5efe360798f302",
+            "size": 111976
+        },
+        {
+            "url": "./data/2026/images/16-horsepower.artist.webp",
+            "revision": "a7e05b0826344195",
+            "size": 8558
+        },
+        {
+            "url": "./data/2026/images/16-horsepower.mobile.webp",
+            "revision": "925accd3bb4a6f6c",
+            "size": 33710
+        },
+        {
+            "url": "./data/2026/images/augusta.webp",
+            "revision": "91b5b401cb732157",
+            "size": 394842
+        },
+        {
+            "url": "./data/2026/images/augusta.artist.webp",
+            "revision": "64cc071d1757ae29",
+            "size": 6726
+        },
+        {
+            "url": "./data/2026/images/augusta.mobile.webp",
+            "revision": "d178877e4ed3b2a1",
+            "size": 53418
+        },
+        {
+            "url": "./data/2026/images/bandit-bandit.webp",
+            "revision": "a816d8da6fd61171",
+            "size": 528216
+        },
+        {
+            "url": "./data/2026/images/bandit-bandit.artist.webp",
+            "revision": "06b7577faa369082",
+            "size": 15764
+        },
+        {
+            "url": "./data/2026/images/bandit-bandit.mobile.webp",
+            "revision": "167335939890fd1f",
+            "size": 70888
+        },
+        {
+            "url": "./data/2026/images/ben-kweller.webp",
+            "revision": "6c1e789f86af99e4",
+            "size": 505316
+        },
+        {
+            "url": "./data/2026/images/ben-kweller.artist.webp",
+            "revision": "6a01ec375418d305",
+            "size": 19500
+        },
+        {
+            "url": "./data/2026/images/ben-kweller.mobile.webp",
+            "revision": "79d327109ab7a7bc",
+            "size": 95282
+        },
+        {
+            "url": "./data/2026/images/black-country-new-road.webp",
+            "revision": "84208aaf6a975959",
+            "size": 202518
+        },
+        {
+            "url": "./data/2026/images/black-country-new-road.artist.webp",
+            "revision": "75a3314993755a81",
+            "size": 11136
+        },
+        {
+            "url": "./data/2026/images/black-country-new-road.mobile.webp",
+            "revision": "fb6c0ec6cdec6d22",
+            "size": 45422
+        },
+        {
+            "url": "./data/2026/images/body-horror.webp",
+            "revision": "088daf6ca0b945f2",
+            "size": 185416
+        },
+        {
+            "url": "./data/2026/images/body-horror.artist.webp",
+            "revision": "202d558be6a2c24c",
+            "size": 7020
+        },
+        {
+            "url": "./data/2026/images/body-horror.mobile.webp",
+            "revision": "df045d407292934d",
+            "size": 24448
+        },
+        {
+            "url": "./data/2026/images/brigitte-calls-me-baby.webp",
+            "revision": "bea17ca9f186fa99",
+            "size": 370304
+        },
+        {
+            "url": "./data/2026/images/brigitte-calls-me-baby.artist.webp",
+            "revision": "bea5aa9b1a7d136e",
+            "size": 14556
+        },
+        {
+            "url": "./data/2026/images/brigitte-calls-me-baby.mobile.webp",
+            "revision": "790511ad3d48b440",
+            "size": 70170
+        },
+        {
+            "url": "./data/2026/images/iguana-death-cult.webp",
+            "revision": "4f910a47583671cb",
+            "size": 374628
+        },
+        {
+            "url": "./data/2026/images/iguana-death-cult.artist.webp",
+            "revision": "8548028f4088f981",
+            "size": 14912
+        },
+        {
+            "url": "./data/2026/images/iguana-death-cult.mobile.webp",
+            "revision": "84c87acea451f52f",
+            "size": 66326
+        },
+        {
+            "url": "./data/2026/images/levitation-room.webp",
+            "revision": "756f9f54a4999da7",
+            "size": 99314
+        },
+        {
+            "url": "./data/2026/images/levitation-room.artist.webp",
+            "revision": "d9981733a342b4d4",
+            "size": 6202
+        },
+        {
+            "url": "./data/2026/images/levitation-room.mobile.webp",
+            "revision": "04331b21c9708922",
+            "size": 22550
+        },
+        {
+            "url": "./data/2026/images/m.a.o-cormontreuil.webp",
+            "revision": "19a0e845380fd7fb",
+            "size": 379438
+        },
+        {
+            "url": "./data/2026/images/m.a.o-cormontreuil.artist.webp",
+            "revision": "dbcc6ef665913f70",
+            "size": 14976
+        },
+        {
+            "url": "./data/2026/images/m.a.o-cormontreuil.mobile.webp",
+            "revision": "4325453a96b112a2",
+            "size": 84930
+        },
+        {
+            "url": "./data/2026/images/men-i-trust.webp",
+            "revision": "c6478966938b7a4d",
+            "size": 439764
+        },
+        {
+            "url": "./data/2026/images/men-i-trust.artist.webp",
+            "revision": "ddc125afaa48d17d",
+            "size": 16842
+        },
+        {
+            "url": "./data/2026/images/men-i-trust.mobile.webp",
+            "revision": "24f75e65f0fee459",
+            "size": 65544
+        },
+        {
+            "url": "./data/2026/images/modelactriz.webp",
+            "revision": "f0479ccf5edd18c5",
+            "size": 133532
+        },
+        {
+            "url": "./data/2026/images/modelactriz.artist.webp",
+            "revision": "03eeb3acf0ff0d96",
+            "size": 9036
+        },
+        {
+            "url": "./data/2026/images/modelactriz.mobile.webp",
+            "revision": "5e6ffce0241d2034",
+            "size": 34454
+        },
+        {
+            "url": "./data/2026/images/the-sophs.webp",
+            "revision": "98771eaad57f9d86",
+            "size": 132238
+        },
+        {
+            "url": "./data/2026/images/the-sophs.artist.webp",
+            "revision": "4447940aaa29241e",
+            "size": 9368
+        },
+        {
+            "url": "./data/2026/images/the-sophs.mobile.webp",
+            "revision": "71f057869b67a338",
+            "size": 39262
+        },
+        {
+            "url": "./data/2026/images/alice-phoebe-lou.webp",
+            "revision": "88df10eef7eb326b",
+            "size": 69762
+        },
+        {
+            "url": "./data/2026/images/alice-phoebe-lou.artist.webp",
+            "revision": "d9ba3f4ded3527fc",
+            "size": 6356
+        },
+        {
+            "url": "./data/2026/images/alice-phoebe-lou.mobile.webp",
+            "revision": "30743b35f40cb6d8",
+            "size": 19158
+        },
+        {
+            "url": "./data/2026/images/bar-italia.webp",
+            "revision": "630ba6a08138cd0d",
+            "size": 114352
+        },
+        {
+            "url": "./data/2026/images/bar-italia.artist.webp",
+            "revision": "bab7ead0bef98f59",
+            "size": 7464
+        },
+        {
+            "url": "./data/2026/images/bar-italia.mobile.webp",
+            "revision": "f4cebf2c5c53b64e",
+            "size": 26816
+        },
+        {
+            "url": "./data/2026/images/cardinals.webp",
+            "revision": "ca7825fb65fff413",
+            "size": 302380
+        },
+        {
+            "url": "./data/2026/images/cardinals.artist.webp",
+            "revision": "b53dbfdb05ff8794",
+            "size": 13670
+        },
+        {
+            "url": "./data/2026/images/cardinals.mobile.webp",
+            "revision": "e870e0ae48e54b65",
+            "size": 55194
+        },
+        {
+            "url": "./data/2026/images/chalk.webp",
+            "revision": "2d47bf67d34b7b79",
+            "size": 444566
+        },
+        {
+            "url": "./data/2026/images/chalk.artist.webp",
+            "revision": "1baf2854db8daf09",
+            "size": 18186
+        },
+        {
+            "url": "./data/2026/images/chalk.mobile.webp",
+            "revision": "4e13c4e433911ef5",
+            "size": 81294
+        },
+        {
+            "url": "./data/2026/images/fat-dog.webp",
+            "revision": "8763a2f86bd3c66f",
+            "size": 126654
+        },
+        {
+            "url": "./data/2026/images/fat-dog.artist.webp",
+            "revision": "416d96f0fc2dd1be",
+            "size": 16346
+        },
+        {
+            "url": "./data/2026/images/fat-dog.mobile.webp",
+            "revision": "435c38b46a251b4f",
+            "size": 85368
+        },
+        {
+            "url": "./data/2026/images/jehnny-beth.webp",
+            "revision": "bc0c6057cff293ac",
+            "size": 51594
+        },
+        {
+            "url": "./data/2026/images/jehnny-beth.artist.webp",
+            "revision": "9625622c945548dd",
+            "size": 9696
+        },
+        {
+            "url": "./data/2026/images/jehnny-beth.mobile.webp",
+            "revision": "a4980ed76acd00b4",
+            "size": 30870
+        },
+        {
+            "url": "./data/2026/images/knives.webp",
+            "revision": "0f1bfe229b0a8199",
+            "size": 100570
+        },
+        {
+            "url": "./data/2026/images/knives.artist.webp",
+            "revision": "2018e4c4b0193fb8",
+            "size": 10786
+        },
+        {
+            "url": "./data/2026/images/knives.mobile.webp",
+            "revision": "c470a144613c8ddb",
+            "size": 48672
+        },
+        {
+            "url": "./data/2026/images/la-securite.webp",
+            "revision": "8bd74f4241f3187b",
+            "size": 91690
+        },
+        {
+            "url": "./data/2026/images/la-securite.artist.webp",
+            "revision": "573cfc3ebb983b0e",
+            "size": 14076
+        },
+        {
+            "url": "./data/2026/images/la-securite.mobile.webp",
+            "revision": "d56e569d5a31ef25",
+            "size": 48734
+        },
+        {
+            "url": "./data/2026/images/meryl-streek.webp",
+            "revision": "dd3adfb5e8973212",
+            "size": 102350
+        },
+        {
+            "url": "./data/2026/images/meryl-streek.artist.webp",
+            "revision": "0627cdd837a2c31e",
+            "size": 8230
+        },
+        {
+            "url": "./data/2026/images/meryl-streek.mobile.webp",
+            "revision": "25044f4854269784",
+            "size": 23672
+        },
+        {
+            "url": "./data/2026/images/new-dad.webp",
+            "revision": "fc17c30197720724",
+            "size": 302164
+        },
+        {
+            "url": "./data/2026/images/new-dad.artist.webp",
+            "revision": "c4a49764d766e79c",
+            "size": 5598
+        },
+        {
+            "url": "./data/2026/images/new-dad.mobile.webp",
+            "revision": "2cedd2eac84b328e",
+            "size": 16992
+        },
+        {
+            "url": "./data/2026/images/quickly-quickly.webp",
+            "revision": "1531acbc8856767b",
+            "size": 614394
+        },
+        {
+            "url": "./data/2026/images/quickly-quickly.artist.webp",
+            "revision": "dfc8adce026cd165",
+            "size": 14840
+        },
+        {
+            "url": "./data/2026/images/quickly-quickly.mobile.webp",
+            "revision": "f4cabcb83ed17ebb",
+            "size": 57618
+        },
+        {
+            "url": "./data/2026/images/shortstraw..webp",
+            "revision": "81343e8369c543a2",
+            "size": 89982
+        },
+        {
+            "url": "./data/2026/images/shortstraw..artist.webp",
+            "revision": "b16bea82faa1ab56",
+            "size": 4802
+        },
+        {
+            "url": "./data/2026/images/shortstraw..mobile.webp",
+            "revision": "1c369f72b5b50c73",
+            "size": 22710
+        },
+        {
+            "url": "./data/2026/images/yerai-cortes.webp",
+            "revision": "70337d253a40518c",
+            "size": 95660
+        },
+        {
+            "url": "./data/2026/images/yerai-cortes.artist.webp",
+            "revision": "1100cc53327b78d0",
+            "size": 5296
+        },
+        {
+            "url": "./data/2026/images/yerai-cortes.mobile.webp",
+            "revision": "60ab7554bcb751d2",
+            "size": 17494
+        }
+    ]
+};
@@ -1,30 +1,126 @@
 import argparse
+import base64
+import contextlib
+import cProfile
 import json
 import os
-import subprocess
 import shutil
 import requests
 import re
+import subprocess
+import sys
 import unicodedata
-from PIL import Image
-
-# Disable DecompressionBombWarning for large images
+import hashlib
+import importlib
+import io
+import math
+import threading
+import time
+import resource
+from collections import Counter
+from urllib.parse import urlparse, parse_qs
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from PIL import Image, features
+
+try:
+    import numpy as np
+except ImportError:
+    np = None # only needed by --quality-search and the dominant colours (uv sync --extra images)
+
+# Disable DecompressionBombWarning for large images (the pixel budget below is used instead)
 Image.MAX_IMAGE_PIXELS = None
 
 # Configuration
 YEAR               = "2026"
 REMOTE_DATA_SOURCE = f"https://thisisnotalovesong.fr/data-2026-02-04.json"
 LOCAL_DATA_SOURCE  = f"../data/{YEAR}/data.json"
+DATA_JOURNAL_PATH  = f"{LOCAL_DATA_SOURCE}.journal" # per-item updates of the current run, see journal_update
 LOCAL_CONFIG_PATH  = "../config/config.json"
 COMPRESS_WEBP      = 80
 
-# Use environment variables or defaults for binaries to allow overriding in tests
-YT_DLP_BIN         = os.getenv( "YT_DLP_BIN", "yt-dlp" )
-WGET_BIN           = os.getenv( "WGET_BIN", "/usr/bin/wget" )
+# Image output formats ("format" in the config.json sizes): Pillow format, extension, MIME type
+IMAGE_FORMATS      = {
+    "webp": ("WEBP", ".webp", "image/webp"),
+    "avif": ("AVIF", ".avif", "image/avif"),
+    "jpeg": ("JPEG", ".jpg",  "image/jpeg"),
+}
+IMAGE_SRCSET_FIELD = "image_srcset" # per-artist responsive images descriptor, see get_image_srcset_descriptor
+
+# Placeholders painted by the player while the artist image loads: a tiny WebP (data URI) and the
+# dominant colour (NumPy histogram), both from the decoded source of the "image" size
+IMAGE_PLACEHOLDER_FIELD  = "image_placeholder"
+IMAGE_COLOR_FIELD        = "image_color"
+IMAGE_PLACEHOLDER_SOURCE = "image"
+PLACEHOLDER_SIZE         = 16 # pixels, longest side
+PLACEHOLDER_QUALITY      = 50
+PLACEHOLDER_SAMPLE       = 128 # pixels, width of the image analysed for the dominant colour
+PLACEHOLDER_COLOR_BINS   = 8 # histogram bins per channel
+
+# Thumbnail atlas: every image_thumbnail of the year in one WebP (grid in id order), with a JSON map
+# {"image", "width", "height", "items": {id: [x, y, width, height]}} read by the player lists
+ATLAS_SIZE_ID      = "image_thumbnail"
+ATLAS_IMAGE_PATH   = f"data/{YEAR}/images/thumbnails.webp"
+ATLAS_MAP_PATH     = f"data/{YEAR}/images/thumbnails.json"
+ATLAS_QUALITY      = 80 # the quality of the thumbnails: the atlas is smaller than their sum
+ATLAS_METHOD       = 6 # slowest and smallest WebP encoding, one file per run
+
+# Quality search (--quality-search): lowest quality reaching an SSIM floor, between "compress-min"
+# and the configured quality ("compress-max" to go above it), optionally capped by "max-bytes"
+# (per size in config.json)
+MIN_SSIM           = 0.95
+QUALITY_SEARCH_MIN = 40
+SSIM_WINDOW        = 8 # pixels
+
+# Source images decoding: pixel budget per image (per worker) and policy above it
+MAX_SOURCE_PIXELS  = 50 * 1000 * 1000
+OVERSIZE_POLICY    = "downsample" # or "refuse"
+DECODED_CACHE_SIZE = 64 # decoded sources kept between builds when enabled (build.py --watch), about 3 per artist
+
+# HTTP downloads (one pooled keep-alive session shared by all stages)
+HTTP_HEADERS         = {'User-Agent': 'Mozilla/5.0'}
+HTTP_TIMEOUT         = 30 # seconds (connect and read)
+HTTP_RETRIES         = 3 # retries on connection errors and 429/5xx responses, with exponential backoff
+HTTP_RETRY_BACKOFF   = 0.5 # seconds, doubled at each retry
+DOWNLOAD_CONCURRENCY = 8
+DOWNLOAD_CHUNK_SIZE  = 64 * 1024
+
+# Persistent download cache (survives between runs, unlike TMP_DIR)
+CACHE_DIR            = os.getenv( "TINALS_CACHE_DIR", "cache/" )
+CACHE_MAX_SIZE       = 2 * 1024 * 1024 * 1024 # bytes, least recently used entries are evicted above
+CACHE_MAX_AGE        = 24 * 3600 # seconds before an entry is revalidated (ETag / Last-Modified)
+REMOTE_DATA_SNAPSHOT = "remote-data.json" # inside the cache directory, last known remote data
+
+# Use environment variables or defaults for the extractor to allow overriding in tests
+# ("module:Class" implementing the yt_dlp.YoutubeDL interface, e.g. a local fake without network)
+YT_DLP_CLASS       = os.getenv( "YT_DLP_CLASS", "yt_dlp:YoutubeDL" )
+YT_DLP_CACHE_DIR   = "yt-dlp/" # inside the cache directory, kept between runs
+YT_DLP_ARCHIVE     = "yt-dlp-archive.json" # inside the cache directory
+YT_CONCURRENCY     = 3
+
+# Audio previews: short loudness-normalised low-bitrate clips, transcoded with a local ffmpeg
+FFMPEG_BIN         = os.getenv( "FFMPEG_BIN", "ffmpeg" )
+PREVIEW_DIR        = f"../data/{YEAR}/mp3/preview/"
+PREVIEW_LENGTH     = 30 # seconds, starting at video_timestart
+PREVIEW_LOUDNESS   = "I=-16:TP=-1.5:LRA=11" # ffmpeg loudnorm target (EBU R128)
+PREVIEW_FORMATS    = [
+    {"id": "audio_preview_opus", "ext": "opus", "codec": ["-c:a", "libopus",    "-b:a", "48k", "-ar", "48000"]},
+    {"id": "audio_preview_aac",  "ext": "m4a",  "codec": ["-c:a", "aac",        "-b:a", "64k", "-ar", "44100", "-movflags", "+faststart"]},
+    {"id": "audio_preview_mp3",  "ext": "mp3",  "codec": ["-c:a", "libmp3lame", "-b:a", "64k", "-ar", "44100"]},
+]
 MP3_DIR            = f"../data/{YEAR}/mp3/"
 IMAGES_DIR         = f"../data/{YEAR}/images/"
 TMP_DIR            = "tmp/"
 
+# Build manifest: records the inputs of every generated file to only rebuild what changed
+BUILD_MANIFEST_PATH = f"../data/{YEAR}/build-manifest.json"
+TOOL_VERSION        = "3" # Bump when a code change alters the generated files (forces a rebuild)
+
+# Timings (--timings / --profile)
+PROFILE_PATH        = "assets.prof"
+TIMINGS_TOP         = 10 # slowest artists / variants listed in the summary
+
 def load_json(filepath):
     try:
         with open(filepath, 'r', encoding='utf-8') as f:
@@ -37,19 +133,491 @@ def load_json(filepath):
         return []
 
 def save_json(filepath, data):
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=4, ensure_ascii=False)
+    # Atomic: a crash leaves either the previous or the new file, never a truncated one
+    content = json.dumps(data, indent=4, ensure_ascii=False)
+    if os.path.exists(filepath):
+        with open(filepath, 'r', encoding='utf-8') as f:
+            if f.read() == content:
+                print(f"{filepath} unchanged")
+                return False
+
+    with timed("json-write", detail=filepath) as record:
+        with open(f"{filepath}.tmp", 'w', encoding='utf-8') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(f"{filepath}.tmp", filepath)
+        record["bytes_out"] = len(content.encode('utf-8'))
     print(f"Updated {filepath}")
+    return True
+
+# data.json is written once per run: the stages update the items in memory and append every
+# finished item to the journal, which is replayed by the next run if this one is interrupted
+_journal = {"file": None}
+
+def journal_update(item, fields, manifest=None, outputs=()):
+    # One JSON line per finished item: its updated fields (None when removed) and build manifest entries
+    entry = {
+        "id": item.get('id'),
+        "fields": {field: item.get(field) for field in fields},
+        "manifest": {output: manifest[output] for output in outputs},
+    }
+    if _journal["file"] is None:
+        _journal["file"] = open(DATA_JOURNAL_PATH, 'a', encoding='utf-8')
+    _journal["file"].write(json.dumps(entry, ensure_ascii=False) + "\n")
+    _journal["file"].flush()
+    os.fsync(_journal["file"].fileno())
+
+def journal_changes(local_data, previous):
+    # Journals the items modified in place since the "previous" deep copy (--reset / --check)
+    for item, before in zip(local_data, previous):
+        fields = [field for field in set(item) | set(before) if item.get(field) != before.get(field)]
+        if fields:
+            journal_update(item, sorted(fields))
+
+def replay_journal(local_data):
+    # Applies the updates of an interrupted run, the files they reference are already generated
+    if not os.path.exists(DATA_JOURNAL_PATH):
+        return 0
+
+    items = {item.get('id'): item for item in local_data}
+    manifest = load_build_manifest()
+    count = 0
+    with open(DATA_JOURNAL_PATH, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                break # last line cut by the interruption
+            item = items.get(entry['id'])
+            if item is None:
+                continue
+            for field, value in entry['fields'].items():
+                if value is None:
+                    item.pop(field, None)
+                else:
+                    item[field] = value
+            manifest.update(entry['manifest'])
+            count += 1
+
+    save_build_manifest(manifest)
+    print(f"Resuming an interrupted run: {count} journalled updates replayed.")
+    return count
+
+def close_journal(remove=False):
+    if _journal["file"] is not None:
+        _journal["file"].close()
+        _journal["file"] = None
+    if remove and os.path.exists(DATA_JOURNAL_PATH):
+        os.remove(DATA_JOURNAL_PATH)
+
+_timings = {"enabled": False, "records": []}
+
+def configure_timings(enabled=False):
+    # Also the initializer of the worker processes (their records are sent back with their results)
+    _timings.update({"enabled": enabled, "records": []})
+
+def get_peak_rss_mb(who=resource.RUSAGE_SELF):
+    # ru_maxrss is in kilobytes on Linux, in bytes on macOS
+    peak = resource.getrusage(who).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+@contextlib.contextmanager
+def timed(stage, item=None, variant=None, detail=None):
+    # Records the wall time, CPU time (of the calling thread), bytes and peak RSS of a step
+    # The caller fills record["bytes_in"] / record["bytes_out"]; no-op unless timings are enabled
+    record = {"stage": stage, "item": item, "variant": variant, "detail": detail, "bytes_in": 0, "bytes_out": 0}
+    if not _timings["enabled"]:
+        yield record
+        return
+
+    wall = time.perf_counter()
+    cpu = time.thread_time()
+    try:
+        yield record
+    finally:
+        record.update({
+            "wall":        round(time.perf_counter() - wall, 6),
+            "cpu":         round(time.thread_time() - cpu, 6),
+            "peak_rss_mb": get_peak_rss_mb(),
+            "pid":         os.getpid(),
+        })
+        _timings["records"].append(record)
+
+def pop_timing_records(start):
+    # Records added since start (a worker process returns them to the main process)
+    records = _timings["records"][start:]
+    del _timings["records"][start:]
+    return records
+
+def summarize_timings(records, key):
+    # {stage, item or variant: totals}; whole stage records have neither item nor variant
+    totals = {}
+    for record in records:
+        if record.get(key) is None:
+            continue
+        total = totals.setdefault(record[key], {"count": 0, "wall": 0.0, "cpu": 0.0, "bytes_in": 0, "bytes_out": 0, "peak_rss_mb": 0.0, "stages": {}})
+        total["count"] += 1
+        total["wall"] = round(total["wall"] + record['wall'], 6)
+        total["cpu"] = round(total["cpu"] + record['cpu'], 6)
+        total["bytes_in"] += record['bytes_in']
+        total["bytes_out"] += record['bytes_out']
+        total["peak_rss_mb"] = max(total["peak_rss_mb"], record['peak_rss_mb'])
+        total["stages"][record['stage']] = round(total["stages"].get(record['stage'], 0.0) + record['wall'], 6)
+    return totals
+
+def report_timings(timings_path=None, top=TIMINGS_TOP):
+    records = _timings["records"]
+    stages = summarize_timings(records, "stage")
+    items = summarize_timings(records, "item")
+    variants = summarize_timings(records, "variant")
+
+    # Step times overlap when they run in threads or worker processes: their sum can exceed the wall time
+    print("Timings (seconds, summed over the steps):")
+    print(f"  {'stage':<20} {'count':>6} {'wall':>9} {'cpu':>9} {'in (KB)':>10} {'out (KB)':>10} {'peak RSS (MB)':>14}")
+    for stage, total in stages.items():
+        print(f"  {stage:<20} {total['count']:>6} {total['wall']:>9.3f} {total['cpu']:>9.3f} {total['bytes_in'] / 1024:>10.1f} {total['bytes_out'] / 1024:>10.1f} {total['peak_rss_mb']:>14.1f}")
+
+    for title, totals in [("artists", items), ("variants", variants)]:
+        slowest = sorted(totals.items(), key=lambda entry: entry[1]['wall'], reverse=True)[:top]
+        if not slowest:
+            continue
+        print(f"Slowest {title}:")
+        for name, total in slowest:
+            main_stage = max(total['stages'], key=total['stages'].get)
+            print(f"  {str(name):<32} {total['wall']:>9.3f} s   (mostly {main_stage}: {total['stages'][main_stage]:.3f} s)")
+
+    print(f"Peak RSS: {get_peak_rss_mb()} MB (main process), {get_peak_rss_mb(resource.RUSAGE_CHILDREN)} MB (largest child process)")
+
+    if timings_path:
+        with open(timings_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                "command":               sys.argv,
+                "date":                  time.strftime('%Y-%m-%dT%H:%M:%S'),
+                "peak_rss_mb":           get_peak_rss_mb(),
+                "children_peak_rss_mb":  get_peak_rss_mb(resource.RUSAGE_CHILDREN),
+                "stages":                stages,
+                "items":                 items,
+                "variants":              variants,
+                "records":               records,
+            }, f, indent=4, ensure_ascii=False)
+        print(f"Timings saved to {timings_path}")
+
+_http_session = None
+_http_pool_size = 0 # connections per origin of the adapter mounted on the session
+_http = {"timeout": HTTP_TIMEOUT, "retries": HTTP_RETRIES, "pool_size": DOWNLOAD_CONCURRENCY}
+
+def configure_http(timeout=HTTP_TIMEOUT, retries=HTTP_RETRIES, pool_size=DOWNLOAD_CONCURRENCY):
+    global _http_session
+    _http.update({"timeout": timeout, "retries": retries, "pool_size": pool_size})
+    _http_session = None
+
+def get_http_session(pool_size=None):
+    # A single session keeps the TCP+TLS connections alive between files of the same origin
+    global _http_session, _http_pool_size
+    pool_size = max(pool_size or 0, _http["pool_size"])
+    if _http_session is None:
+        _http_session = requests.Session()
+        _http_session.headers.update(HTTP_HEADERS)
+        _http_pool_size = 0
+    if pool_size > _http_pool_size:
+        # Sized for the most simultaneous downloads asked so far: a smaller pool drops the
+        # connections it cannot keep ("Connection pool is full")
+        if _http_pool_size:
+            _http_session.get_adapter('https://').close()
+        retry = Retry(
+            total=_http["retries"],
+            backoff_factor=HTTP_RETRY_BACKOFF,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=['GET'],
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        _http_session.mount('http://', adapter)
+        _http_session.mount('https://', adapter)
+        _http_pool_size = pool_size
+    return _http_session
+
+def file_sha256(filepath):
+    sha = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+# Download cache
+# index.json: {url: {"sha256", "size", "etag", "last_modified", "fetched_at", "last_used"}}
+# objects/ab/abcdef...: file contents, stored once per content hash
+# In offline mode, cached entries are used whatever their age and nothing is fetched
+_cache = {"enabled": True, "dir": CACHE_DIR, "max_size": CACHE_MAX_SIZE, "offline": False, "index": None}
+_cache_lock = threading.Lock()
+
+def configure_cache(cache_dir=CACHE_DIR, enabled=True, max_size=CACHE_MAX_SIZE, offline=False):
+    _cache.update({"enabled": enabled, "dir": cache_dir, "max_size": max_size, "offline": offline, "index": None})
+
+def get_cache_index():
+    if _cache["index"] is None:
+        index_path = os.path.join(_cache["dir"], "index.json")
+        index = {}
+        if os.path.exists(index_path):
+            try:
+                with open(index_path, 'r', encoding='utf-8') as f:
+                    index = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"Warning: ignoring unreadable cache index {index_path}: {e}")
+        _cache["index"] = index
+    return _cache["index"]
+
+def get_cache_object_path(sha256):
+    return os.path.join(_cache["dir"], "objects", sha256[:2], sha256)
+
+def get_cached_entry(url):
+    # Returns the index entry only if its content is still on disk
+    with _cache_lock:
+        entry = get_cache_index().get(url)
+    if entry and os.path.exists(get_cache_object_path(entry['sha256'])):
+        return entry
+    return None
+
+def store_cache_entry(url, part_path, sha256, response):
+    object_path = get_cache_object_path(sha256)
+    os.makedirs(os.path.dirname(object_path), exist_ok=True)
+    if os.path.exists(object_path):
+        os.remove(part_path) # Same content already cached under another URL
+    else:
+        os.replace(part_path, object_path)
+
+    now = time.time()
+    with _cache_lock:
+        get_cache_index()[url] = {
+            "sha256":        sha256,
+            "size":          os.path.getsize(object_path),
+            "etag":          response.headers.get('ETag'),
+            "last_modified": response.headers.get('Last-Modified'),
+            "fetched_at":    now,
+            "last_used":     now,
+        }
+    return object_path
+
+def touch_cache_entry(url, revalidated=False):
+    with _cache_lock:
+        entry = get_cache_index()[url]
+        entry['last_used'] = time.time()
+        if revalidated:
+            entry['fetched_at'] = entry['last_used']
+
+def save_cache_index():
+    # Evict least recently used contents above the size cap, then persist the index
+    if not _cache["enabled"] or _cache["index"] is None:
+        return
+
+    with _cache_lock:
+        index = _cache["index"]
+
+        # One content can be shared by several URLs: group them by hash
+        objects = {}
+        for url, entry in index.items():
+            obj = objects.setdefault(entry['sha256'], {"size": entry['size'], "last_used": 0, "urls": []})
+            obj['last_used'] = max(obj['last_used'], entry['last_used'])
+            obj['urls'].append(url)
+
+        total_size = sum(obj['size'] for obj in objects.values())
+        for sha256, obj in sorted(objects.items(), key=lambda kv: kv[1]['last_used']):
+            if total_size <= _cache["max_size"]:
+                break
+            object_path = get_cache_object_path(sha256)
+            if os.path.exists(object_path):
+                os.remove(object_path)
+            for url in obj['urls']:
+                del index[url]
+            total_size -= obj['size']
+            print(f"Evicted {sha256[:12]} from download cache ({obj['size']} bytes)")
+
+        os.makedirs(_cache["dir"], exist_ok=True)
+        index_path = os.path.join(_cache["dir"], "index.json")
+        with open(f"{index_path}.tmp", 'w', encoding='utf-8') as f:
+            json.dump(index, f, indent=4)
+        os.replace(f"{index_path}.tmp", index_path)
+
+def download_file(url, dest_path):
+    # Stream to a temporary ".part" file, then move it in place (never leaves a truncated dest_path)
+    # With the cache enabled, a fresh entry is served without any network I/O and a stale one
+    # is revalidated with a conditional GET
+    with timed("download", detail=url) as record:
+        part_path = f"{dest_path}.part"
+        entry = get_cached_entry(url) if _cache["enabled"] or _cache["offline"] else None
+
+        if entry and (_cache["offline"] or time.time() - entry['fetched_at'] < CACHE_MAX_AGE):
+            touch_cache_entry(url)
+            shutil.copyfile(get_cache_object_path(entry['sha256']), dest_path)
+            return True
+
+        if _cache["offline"]:
+            print(f"  Not in the download cache (offline): {url}")
+            return False
+
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        try:
+            with get_http_session().get(url, stream=True, timeout=_http["timeout"], headers=headers) as response:
+                if entry and response.status_code == 304:
+                    touch_cache_entry(url, revalidated=True)
+                    shutil.copyfile(get_cache_object_path(entry['sha256']), dest_path)
+                    return True
+
+                response.raise_for_status()
+                sha = hashlib.sha256()
+                with open(part_path, 'wb') as f:
+                    for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                        sha.update(chunk)
+                        f.write(chunk)
+                        record["bytes_in"] += len(chunk)
+
+            if _cache["enabled"]:
+                object_path = store_cache_entry(url, part_path, sha.hexdigest(), response)
+                shutil.copyfile(object_path, dest_path)
+            else:
+                shutil.move(part_path, dest_path)
+            return True
+        except (requests.RequestException, OSError) as e:
+            print(f"  Failed to download {url}: {e}")
+            if os.path.exists(part_path):
+                os.remove(part_path)
+            return False
+
+def download_files(downloads, concurrency=DOWNLOAD_CONCURRENCY):
+    # downloads: {url: dest_path}, returns {url: dest_path or None on failure}
+    results = {}
+    if not downloads:
+        return results
+
+    concurrency = max(1, min(concurrency, len(downloads)))
+    get_http_session(concurrency)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = {executor.submit(download_file, url, dest_path): url for url, dest_path in downloads.items()}
+        for future in as_completed(futures):
+            url = futures[future]
+            results[url] = downloads[url] if future.result() else None
+
+    save_cache_index()
+    return results
+
+def load_remote_snapshot(url):
+    # {"url", "etag", "last_modified", "fetched_at", "data"}
+    snapshot_path = os.path.join(_cache["dir"], REMOTE_DATA_SNAPSHOT)
+    if not os.path.exists(snapshot_path):
+        return None
+    snapshot = load_json(snapshot_path)
+    if not isinstance(snapshot, dict) or snapshot.get('url') != url:
+        return None
+    return snapshot
+
+def save_remote_snapshot(snapshot):
+    snapshot_path = os.path.join(_cache["dir"], REMOTE_DATA_SNAPSHOT)
+    os.makedirs(_cache["dir"], exist_ok=True)
+    with open(f"{snapshot_path}.tmp", 'w', encoding='utf-8') as f:
+        json.dump(snapshot, f, ensure_ascii=False)
+    os.replace(f"{snapshot_path}.tmp", snapshot_path)
+
+def fetch_remote_data(url, offline=False):
+    # Returns the remote data, or None when neither the server nor a local snapshot can provide it
+    # The last snapshot is revalidated with a conditional GET, and used as is when offline or on failure
+    snapshot = load_remote_snapshot(url)
+
+    if offline:
+        if snapshot is None:
+            print(f"Error: no local snapshot of {url} (offline mode).")
+            return None
+        print(f"Using remote data snapshot from {time.strftime('%Y-%m-%d %H:%M', time.localtime(snapshot['fetched_at']))} (offline mode)")
+        return snapshot['data']
 
-def fetch_remote_data(url):
     print(f"Fetching remote data from {url}...")
+    headers = {}
+    if snapshot:
+        if snapshot.get('etag'):
+            headers['If-None-Match'] = snapshot['etag']
+        if snapshot.get('last_modified'):
+            headers['If-Modified-Since'] = snapshot['last_modified']
+
     try:
-        response = requests.get(url, headers={'User-Agent': 'Mozilla/5.0'})
+        response = get_http_session().get(url, timeout=_http["timeout"], headers=headers)
+        if snapshot and response.status_code == 304:
+            print("Remote data not modified, using the local snapshot.")
+            snapshot['fetched_at'] = time.time()
+            save_remote_snapshot(snapshot)
+            return snapshot['data']
+
         response.raise_for_status()
-        return response.json()
-    except requests.RequestException as e:
+        data = response.json()
+        save_remote_snapshot({
+            "url":           url,
+            "etag":          response.headers.get('ETag'),
+            "last_modified": response.headers.get('Last-Modified'),
+            "fetched_at":    time.time(),
+            "data":          data,
+        })
+        return data
+    except (requests.RequestException, ValueError) as e:
         print(f"Error fetching remote data: {e}")
-        return []
+        if snapshot is None:
+            return None
+        print("Falling back to the last local snapshot of the remote data.")
+        return snapshot['data']
+
+def load_build_manifest():
+    if not os.path.exists(BUILD_MANIFEST_PATH):
+        return {}
+    manifest = load_json(BUILD_MANIFEST_PATH)
+    return manifest if isinstance(manifest, dict) else {}
+
+def save_build_manifest(manifest):
+    with open(f"{BUILD_MANIFEST_PATH}.tmp", 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=4, ensure_ascii=False, sort_keys=True)
+    os.replace(f"{BUILD_MANIFEST_PATH}.tmp", BUILD_MANIFEST_PATH)
+
+def get_build_inputs(source_url, source_sha256, config=None):
+    # Everything that can change an output file
+    inputs = {"source_url": source_url, "source_sha256": source_sha256, "tool_version": TOOL_VERSION}
+    if config is not None:
+        inputs["config"] = config
+    return inputs
+
+def is_output_up_to_date(manifest, output, inputs):
+    entry = manifest.get(output)
+    if not entry or not os.path.exists(get_local_path(output)):
+        return False
+    # Secondary files generated along with the output (other formats, srcset widths)
+    if not all(os.path.exists(get_local_path(path)) for path in entry.get('files', {})):
+        return False
+    return all(entry.get(key) == value for key, value in inputs.items())
+
+def record_output(manifest, output, inputs, files=None):
+    local_path = get_local_path(output)
+    manifest[output] = dict(inputs, sha256=file_sha256(local_path), size=os.path.getsize(local_path))
+    if files:
+        manifest[output]['files'] = {path: os.path.getsize(get_local_path(path)) for path in files}
+
+def print_build_summary(report):
+    # report: {variant: Counter({"rebuilt": n, "up to date": n, "failed": n})}
+    # Image variants also count the encoded "files" with their "bytes", "quality" and "ssim" sums
+    print("Build summary:")
+    for variant, counts in report.items():
+        line = f"  {variant:<20} rebuilt: {counts['rebuilt']:>3}   up to date: {counts['up to date']:>3}   failed: {counts['failed']:>3}"
+        if counts['files']:
+            line += f"   {counts['files']:>4} files {counts['bytes'] / 1024:>9.1f} KB   mean quality: {counts['quality'] / counts['files']:>4.1f}"
+        if counts['ssim files']:
+            line += f"   mean SSIM: {counts['ssim'] / counts['ssim files']:.4f}"
+        print(line)
+
+def get_local_path(data_path):
+    # data.json paths are relative to the project root, tools run from tools/
+    return data_path.replace(f"data/{YEAR}/", f"../data/{YEAR}/", 1)
 
 def sanitize_filename(name):
     # Normalize unicode characters to decompose accents (e.g., 'à' -> 'a' + '`')
@@ -82,30 +650,76 @@ def get_image_sizes_config():
         ]
     return config['sizes']
 
-def main():
+def main(argv=None):
     parser = argparse.ArgumentParser(description="TINALS Asset Import Tool")
     parser.add_argument("--yt-to-mp3", action="store_true",                                     help="Extract and import mp3 files from YouTube")
     parser.add_argument("--mp3",       action="store_true",                                     help="Import mp3 files locally from external server")
-    parser.add_argument("--image",     action="store_true",                                     help="Import image files locally from external server and convert to WebP")
+    parser.add_argument("--image",     action="store_true",                                     help="Import image files locally from external server and convert to WebP / AVIF")
+    parser.add_argument("--audio-preview", action="store_true",                                 help="Transcode short low-bitrate previews (Opus, AAC, MP3) of the local audio files")
+    parser.add_argument("--preview-length", type=int, default=PREVIEW_LENGTH,                   help="Length of the audio previews in seconds")
     parser.add_argument("--limit",     type=int,                                                help="Limit the number of items processed from the data file")
-    parser.add_argument("--reset",     choices=['image', 'mp3', 'all'],                         help="Reset fields and delete files")
+    parser.add_argument("--reset",     choices=['image', 'mp3', 'preview', 'all'],              help="Reset fields and delete files")
     parser.add_argument("--force",     action="store_true",                                     help="Force overwrite existing values")
-    parser.add_argument("--check",     nargs='?', const='all', choices=['image', 'mp3', 'all'], help="Check file existence and clean data")
+    parser.add_argument("--check",     nargs='?', const='all', choices=['image', 'mp3', 'preview', 'all'], help="Check file existence and clean data")
     parser.add_argument("--max-width", type=int,                                                help="Limit the width of the image (Override config)")
     parser.add_argument("--compress",  type=int,                                                help="Set compression quality percentage (Override config)")
-
-    args = parser.parse_args()
+    parser.add_argument("--quality-search", action="store_true",                              help="Search the lowest quality per image reaching the SSIM floor / byte ceiling of each size (needs NumPy)")
+    parser.add_argument("--min-ssim",  type=float,                                              help=f"SSIM floor of --quality-search (Override config, default {MIN_SSIM})")
+    parser.add_argument("--max-source-pixels", type=float, default=MAX_SOURCE_PIXELS / 1e6,  help="Pixel budget per source image, in megapixels (0 = unlimited)")
+    parser.add_argument("--oversize",  choices=['downsample', 'refuse'], default=OVERSIZE_POLICY, help="What to do with source images above the pixel budget")
+    parser.add_argument("--yt-concurrency", type=int, default=YT_CONCURRENCY,                  help="Number of simultaneous YouTube extractions")
+    parser.add_argument("--jobs",      type=int, default=1,                                     help="Number of parallel workers for --image (0 = one per CPU core)")
+    parser.add_argument("--preview-jobs", type=int, default=0,                                  help="Number of simultaneous ffmpeg transcodes for --audio-preview (0 = one per CPU core)")
+    parser.add_argument("--download-concurrency", type=int, default=DOWNLOAD_CONCURRENCY,      help="Maximum number of simultaneous downloads")
+    parser.add_argument("--cache-dir", default=CACHE_DIR,                                       help="Persistent download cache directory")
+    parser.add_argument("--no-cache",  action="store_true",                                     help="Disable the persistent download cache (up-to-date images are then not downloaded again, see --force)")
+    parser.add_argument("--offline",   action="store_true",                                     help="No network: use the last remote data snapshot and cached downloads only")
+    parser.add_argument("--timeout",   type=float, default=HTTP_TIMEOUT,                        help="HTTP timeout in seconds")
+    parser.add_argument("--retries",   type=int, default=HTTP_RETRIES,                          help="HTTP retries on connection errors and 429/5xx responses")
+    parser.add_argument("--cache-max-size", type=int, default=CACHE_MAX_SIZE // (1024 * 1024),  help="Download cache size limit in MB (least recently used entries are evicted)")
+    parser.add_argument("--timings",   metavar="PATH",                                          help="Record the time, bytes and memory of every step, per artist and size variant, and save them as JSON")
+    parser.add_argument("--profile",   nargs='?', const=PROFILE_PATH, metavar="PATH",           help=f"Run under cProfile and dump the stats (default {PROFILE_PATH}), with the timings summary")
+    parser.add_argument("--top",       type=int, default=TIMINGS_TOP,                           help="Number of slowest artists / variants in the timings summary")
+
+    args = parser.parse_args(argv)
+    # Checked before any stage runs (--reset / --check write the journal)
+    if args.image and args.quality_search and np is None:
+        parser.error("--quality-search needs NumPy (pip install numpy)")
 
     ensure_dirs()
+    configure_cache(args.cache_dir, not args.no_cache, args.cache_max_size * 1024 * 1024, args.offline)
+    configure_http(args.timeout, args.retries, args.download_concurrency)
 
-    if not any([args.yt_to_mp3, args.mp3, args.image, args.reset, args.check]):
+    if not any([args.yt_to_mp3, args.mp3, args.image, args.audio_preview, args.reset, args.check]):
         parser.print_help()
         return
 
+    configure_timings(bool(args.timings or args.profile))
+    profiler = cProfile.Profile() if args.profile else None
+    if profiler:
+        # Only the main process is profiled (use --jobs 1 to include the image encoding)
+        profiler.enable()
+
+    try:
+        exit_code = run_stages(args)
+    finally:
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(args.profile)
+            print(f"Profile saved to {args.profile} (python -m pstats {args.profile})")
+        if _timings["enabled"]:
+            report_timings(args.timings, args.top)
+
+    if exit_code:
+        sys.exit(exit_code)
+
+def run_stages(args):
     local_data = load_json(LOCAL_DATA_SOURCE)
     if not local_data:
         print("No local data found or empty.")
-        return
+        return 0
+
+    replay_journal(local_data)
 
     items_to_process = local_data
     if args.limit and args.limit > 0:
@@ -113,37 +727,75 @@ def main():
         items_to_process = local_data[:args.limit]
 
     if args.reset:
+        previous = json.loads(json.dumps(local_data))
         process_reset(local_data, args.reset)
-        save_json(LOCAL_DATA_SOURCE, local_data)
+        journal_changes(local_data, previous)
 
     if args.check:
+        previous = json.loads(json.dumps(local_data))
         process_check(local_data, args.check)
-        save_json(LOCAL_DATA_SOURCE, local_data)
-
-    remote_data = fetch_remote_data(REMOTE_DATA_SOURCE)
-
-    if args.yt_to_mp3:
-        process_yt_to_mp3(items_to_process, remote_data, args.force)
-        save_json(LOCAL_DATA_SOURCE, local_data)
+        journal_changes(local_data, previous)
+
+    # The remote data is only needed by the import stages
+    remote_data = []
+    exit_code = 0
+
+    if any([args.yt_to_mp3, args.mp3, args.image]):
+        with timed("remote-fetch", detail=REMOTE_DATA_SOURCE):
+            remote_data = fetch_remote_data(REMOTE_DATA_SOURCE, args.offline)
+        if remote_data is None:
+            print("Error: remote data unavailable, skipping the --yt-to-mp3 / --mp3 / --image stages.")
+            args.yt_to_mp3 = args.mp3 = args.image = False
+            exit_code = 1
+
+    if args.yt_to_mp3 and args.offline:
+        print("Skipping --yt-to-mp3 (offline mode).")
+    elif args.yt_to_mp3:
+        with timed("stage/yt-to-mp3"):
+            process_yt_to_mp3(items_to_process, remote_data, args.force, args.yt_concurrency)
 
     if args.mp3:
-        process_local_mp3(items_to_process, remote_data, args.force)
-        save_json(LOCAL_DATA_SOURCE, local_data)
+        with timed("stage/mp3"):
+            process_local_mp3(items_to_process, remote_data, args.force, args.download_concurrency)
 
     if args.image:
-        process_local_image(items_to_process, remote_data, args.force, args.max_width, args.compress)
-        save_json(LOCAL_DATA_SOURCE, local_data)
+        with timed("stage/image"):
+            process_local_image(items_to_process, remote_data, args.force, args.max_width, args.compress, args.jobs, args.download_concurrency, int(args.max_source_pixels * 1e6), args.oversize, args.quality_search, args.min_ssim)
+        # Every item of the year, whatever --limit
+        with timed("stage/atlas"):
+            process_thumbnail_atlas(local_data, args.force)
+
+    if args.audio_preview:
+        with timed("stage/audio-preview"):
+            process_audio_preview(items_to_process, args.force, args.preview_length, args.preview_jobs)
+
+    # Single commit of the run, the journal is only needed until then
+    close_journal()
+    save_json(LOCAL_DATA_SOURCE, local_data)
+    close_journal(remove=True)
 
     # Cleanup tmp
     if os.path.exists(TMP_DIR):
         shutil.rmtree(TMP_DIR)
 
+    return exit_code
+
 def process_reset(local_data, target):
     print(f"Resetting {target}...")
     sizes_config = get_image_sizes_config()
     image_fields = [size['id'] for size in sizes_config]
+    preview_fields = [preview['id'] for preview in PREVIEW_FORMATS]
 
     for item in local_data:
+        if target in ['preview', 'all']:
+            for field in preview_fields:
+                if item.get(field):
+                    file_path = get_local_path(item[field])
+                    if os.path.exists(file_path):
+                        os.remove(file_path)
+                        print(f"Deleted {file_path}")
+                    item[field] = ""
+
         if target in ['mp3', 'all']:
             if item.get('audio'):
                 # Construct file path relative to tools/
@@ -162,12 +814,30 @@ def process_reset(local_data, target):
                         print(f"Deleted {file_path}")
                     item[field] = ""
 
+            item.pop(IMAGE_PLACEHOLDER_FIELD, None)
+            item.pop(IMAGE_COLOR_FIELD, None)
+            for descriptor in (item.pop(IMAGE_SRCSET_FIELD, None) or {}).values():
+                for path in get_image_srcset_paths(descriptor):
+                    file_path = get_local_path(path)
+                    if os.path.exists(file_path):
+                        os.remove(file_path)
+                        print(f"Deleted {file_path}")
+
 def process_check(local_data, target):
     print(f"Checking {target}...")
     sizes_config = get_image_sizes_config()
     image_fields = [size['id'] for size in sizes_config]
+    preview_fields = [preview['id'] for preview in PREVIEW_FORMATS]
 
     for item in local_data:
+        if target in ['preview', 'all']:
+            for field in preview_fields:
+                if item.get(field):
+                    file_path = get_local_path(item[field])
+                    if not os.path.exists(file_path):
+                        print(f"Missing Preview: {file_path} (removing ref)")
+                        item[field] = ""
+
         if target in ['mp3', 'all']:
             if item.get('audio'):
                 file_path = item['audio'].replace("data/2026/", "../data/2026/")
@@ -183,11 +853,80 @@ def process_check(local_data, target):
                         print(f"Missing Image: {file_path} (removing ref)")
                         item[field] = ""
 
-def process_yt_to_mp3(local_data, remote_data, force=False):
+            for size_id, descriptor in list((item.get(IMAGE_SRCSET_FIELD) or {}).items()):
+                missing = [path for path in get_image_srcset_paths(descriptor) if not os.path.exists(get_local_path(path))]
+                if missing:
+                    print(f"Missing Image: {get_local_path(missing[0])} (removing {size_id} srcset)")
+                    set_image_srcset(item, size_id, None)
+
+def get_youtube_dl_class():
+    module_name, _, class_name = YT_DLP_CLASS.partition(':')
+    return getattr(importlib.import_module(module_name), class_name)
+
+def get_youtube_video_id(video_url):
+    # Archive key: watch?v=ID, youtu.be/ID, shorts/ID or embed/ID
+    parsed = urlparse(video_url)
+    video_id = parse_qs(parsed.query).get('v', [None])[0]
+    if not video_id:
+        match = re.search(r'(?:youtu\.be/|/shorts/|/embed/)([\w-]{11})', video_url)
+        video_id = match.group(1) if match else None
+    return video_id or video_url
+
+def load_yt_archive():
+    # {video_id: {"audio": data.json path, "title": video title}}
+    archive_path = os.path.join(_cache["dir"], YT_DLP_ARCHIVE)
+    if not os.path.exists(archive_path):
+        return {}
+    archive = load_json(archive_path)
+    return archive if isinstance(archive, dict) else {}
+
+def save_yt_archive(archive):
+    archive_path = os.path.join(_cache["dir"], YT_DLP_ARCHIVE)
+    os.makedirs(_cache["dir"], exist_ok=True)
+    with open(f"{archive_path}.tmp", 'w', encoding='utf-8') as f:
+        json.dump(archive, f, indent=4, ensure_ascii=False, sort_keys=True)
+    os.replace(f"{archive_path}.tmp", archive_path)
+
+def extract_youtube_audio(youtube_dl_class, item_id, video_url, item_name=None):
+    # One extractor per task (YoutubeDL instances are not shared between threads)
+    # The signature/player cache is kept between runs in YT_DLP_CACHE_DIR
+    options = {
+        'format':            'bestaudio/best',
+        'outtmpl':           f"{TMP_DIR}{item_id}___%(title)s.%(ext)s",
+        'restrictfilenames': True,
+        'windowsfilenames':  False,
+        'cachedir':          os.path.join(_cache["dir"], YT_DLP_CACHE_DIR),
+        'quiet':             True,
+        'no_warnings':       True,
+        'noprogress':        True,
+        'postprocessors':    [{'key': 'FFmpegExtractAudio', 'preferredcodec': 'mp3', 'preferredquality': '0'}],
+    }
+    with timed("extract", item_name, "audio", video_url) as record:
+        with youtube_dl_class(options) as ydl:
+            info = ydl.extract_info(video_url, download=True)
+
+        # The final path (after the mp3 conversion) comes back from the extractor
+        downloads = (info or {}).get('requested_downloads') or []
+        if not downloads or not downloads[0].get('filepath'):
+            raise RuntimeError("extractor returned no file")
+        if os.path.exists(downloads[0]['filepath']):
+            record["bytes_in"] = os.path.getsize(downloads[0]['filepath'])
+    return downloads[0]['filepath'], info.get('title', '')
+
+def process_yt_to_mp3(local_data, remote_data, force=False, concurrency=YT_CONCURRENCY):
     print("Processing YouTube to MP3...")
     # Create a map for faster lookup
     remote_map = {item['id']: item for item in remote_data if 'id' in item}
 
+    try:
+        youtube_dl_class = get_youtube_dl_class()
+    except (ImportError, AttributeError) as e:
+        print(f"yt-dlp not available ({YT_DLP_CLASS}): {e}. Please install it or set YT_DLP_CLASS env var.")
+        return # Stop processing if tool is missing
+
+    archive = load_yt_archive()
+    tasks = []
+
     for item in local_data:
         # Check if audio is empty or force is True
         if (not item.get('audio') or force) and item.get('id') in remote_map:
@@ -195,299 +934,935 @@ def process_yt_to_mp3(local_data, remote_data, force=False):
             video_url = remote_item.get('video_url')
 
             if video_url:
-                print(f"Extracting audio for {item.get('event_name', 'Unknown')} (ID: {item['id']})...")
-
-                # Construct command
-                output_template = f"{TMP_DIR}{item['id']}___%(title)s.%(ext)s"
-
-                cmd = [
-                    YT_DLP_BIN,
-                    "--audio-quality", "0",
-                    "--audio-format", "mp3",
-                    "--extract-audio",
-                    "--restrict-filenames",
-                    "--no-windows-filenames",
-                    "--rm-cache-dir",
-                    "--output", output_template,
-                    video_url
-                ]
-
-                try:
-                    subprocess.run(cmd, check=True)
-
-                    # Find the generated file
-                    # We look for files in TMP_DIR starting with the ID and ending with .mp3
-                    files = [f for f in os.listdir(TMP_DIR) if f.startswith(f"{item['id']}___") and f.endswith('.mp3')]
-
-                    if files:
-                        # We take the first mp3 found
-                        src_filename = files[0]
-                        src_file = os.path.join(TMP_DIR, src_filename)
-
-                        # Determine destination filename based on event name
-                        event_name = item.get('event_name')
-                        if event_name:
-                            dest_filename = f"{sanitize_filename(event_name)}.mp3"
-                        else:
-                            dest_filename = src_filename
-
-                        dest_path = os.path.join(MP3_DIR, dest_filename)
-
-                        # Move file
-                        shutil.move(src_file, dest_path)
-                        print(f"Moved to {dest_path}")
+                video_id = get_youtube_video_id(video_url)
+                archived = archive.get(video_id)
+
+                # Already extracted by a previous run and still on disk: skip it instantly
+                if not force and archived and os.path.exists(get_local_path(archived['audio'])):
+                    print(f"Already extracted {item.get('event_name', 'Unknown')} (video {video_id})")
+                    item['audio'] = archived['audio']
+                    journal_update(item, ['audio'])
+                    continue
 
-                        # Update local data with relative path
-                        item['audio'] = f"data/{YEAR}/mp3/{dest_filename}"
-                    else:
-                        print(f"No MP3 file found in {TMP_DIR} for ID {item['id']}")
+                tasks.append((item, video_url, video_id))
 
-                except subprocess.CalledProcessError as e:
-                    print(f"Failed to extract audio for {video_url}: {e}")
-                except FileNotFoundError:
-                    print(f"yt-dlp binary not found at {YT_DLP_BIN}. Please install it or set YT_DLP_BIN env var.")
-                    return # Stop processing if tool is missing
+    if not tasks:
+        return
 
-def process_local_mp3(local_data, remote_data, force=False):
+    concurrency = max(1, min(concurrency, len(tasks)))
+    results = {}
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = {}
+        for index, (item, video_url, video_id) in enumerate(tasks):
+            print(f"Extracting audio for {item.get('event_name', 'Unknown')} (ID: {item['id']})...")
+            futures[executor.submit(extract_youtube_audio, youtube_dl_class, item['id'], video_url, sanitize_filename(item.get('event_name') or str(item['id'])))] = index
+
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                results[index] = future.result()
+            except Exception as e:
+                print(f"Failed to extract audio for {tasks[index][1]}: {e}")
+
+    # Move the files and update the data in data order
+    for index, (item, video_url, video_id) in enumerate(tasks):
+        if index not in results:
+            continue
+
+        src_file, title = results[index]
+        if not os.path.exists(src_file):
+            print(f"No MP3 file found at {src_file} for ID {item['id']}")
+            continue
+
+        # Determine destination filename based on event name
+        event_name = item.get('event_name')
+        if event_name:
+            dest_filename = f"{sanitize_filename(event_name)}.mp3"
+        else:
+            dest_filename = os.path.basename(src_file)
+
+        dest_path = os.path.join(MP3_DIR, dest_filename)
+
+        # Move file
+        shutil.move(src_file, dest_path)
+        print(f"Moved to {dest_path}")
+
+        # Update local data with relative path
+        item['audio'] = f"data/{YEAR}/mp3/{dest_filename}"
+        archive[video_id] = {"audio": item['audio'], "title": title}
+        journal_update(item, ['audio'])
+
+    save_yt_archive(archive)
+
+def process_local_mp3(local_data, remote_data, force=False, concurrency=DOWNLOAD_CONCURRENCY):
     print("Processing Local MP3...")
     remote_map = {item['id']: item for item in remote_data if 'id' in item}
+    manifest = load_build_manifest()
+    report = {'audio': Counter()}
 
+    # Collect all the downloads first, then fetch them concurrently
+    # Items whose audio was produced by this stage (listed in the manifest) are checked for upstream changes
+    downloads = {}
+    pending = []
     for item in local_data:
-        if (not item.get('audio') or force) and item.get('id') in remote_map:
+        if (not item.get('audio') or force or item['audio'] in manifest) and item.get('id') in remote_map:
             remote_item = remote_map[item['id']]
             audio_url = remote_item.get('audio')
 
             if audio_url and isinstance(audio_url, str) and audio_url.startswith(('http://', 'https://')):
-                print(f"Downloading audio for {item.get('event_name', 'Unknown')} from {audio_url}...")
-
                 # Download to tmp first
                 tmp_filename = f"temp_{item['id']}.mp3"
-                tmp_path = os.path.join(TMP_DIR, tmp_filename)
-
-                try:
-                    subprocess.run([WGET_BIN, "-O", tmp_path, audio_url], check=True)
+                downloads[audio_url] = os.path.join(TMP_DIR, tmp_filename)
+                pending.append((item, audio_url))
+
+    results = download_files(downloads, concurrency)
+
+    # Same URL shared by several items: copy it, and only move it for the last one
+    remaining_uses = Counter(audio_url for _, audio_url in pending)
+
+    for item, audio_url in pending:
+        remaining_uses[audio_url] -= 1
+        tmp_path = results.get(audio_url)
+        if not tmp_path or not os.path.exists(tmp_path):
+            print(f"Failed to download audio for {item.get('event_name', 'Unknown')}")
+            report['audio']['failed'] += 1
+            continue
+
+        # Determine destination filename
+        event_name = item.get('event_name')
+        if event_name:
+            dest_filename = f"{sanitize_filename(event_name)}.mp3"
+        else:
+            # Fallback if no event name
+            dest_filename = f"{item['id']}.mp3"
+
+        output = f"data/{YEAR}/mp3/{dest_filename}"
+        inputs = get_build_inputs(audio_url, file_sha256(tmp_path))
+        if not force and item.get('audio') == output and is_output_up_to_date(manifest, output, inputs):
+            report['audio']['up to date'] += 1
+            if remaining_uses[audio_url] == 0:
+                os.remove(tmp_path)
+            continue
+
+        dest_path = os.path.join(MP3_DIR, dest_filename)
+        if remaining_uses[audio_url] > 0:
+            shutil.copy(tmp_path, dest_path)
+        else:
+            shutil.move(tmp_path, dest_path)
+        print(f"Downloaded audio for {item.get('event_name', 'Unknown')} to {dest_path}")
+
+        item['audio'] = output
+        record_output(manifest, output, inputs)
+        journal_update(item, ['audio'], manifest, [output])
+        report['audio']['rebuilt'] += 1
+
+    save_build_manifest(manifest)
+    print_build_summary(report)
+
+def process_audio_preview(local_data, force=False, length=PREVIEW_LENGTH, jobs=0):
+    print("Processing Audio Previews...")
+    os.makedirs(PREVIEW_DIR, exist_ok=True)
+    manifest = load_build_manifest()
+    report = {preview['id']: Counter() for preview in PREVIEW_FORMATS}
+
+    # Only transcode the clips whose inputs (source content, start, length, format) changed
+    tasks = []
+    for item in local_data:
+        source_path = get_local_path(item['audio']) if item.get('audio') else None
+        if not source_path or not os.path.exists(source_path):
+            continue
+
+        source_sha256 = file_sha256(source_path)
+        start = get_preview_start(item)
+        event_name = sanitize_filename(item.get('event_name') or str(item.get('id', 'unknown')))
+
+        for preview in PREVIEW_FORMATS:
+            output = f"data/{YEAR}/mp3/preview/{event_name}.preview.{preview['ext']}"
+            config = {"start": start, "length": length, "loudness": PREVIEW_LOUDNESS, "codec": preview['codec']}
+            inputs = get_build_inputs(item['audio'], source_sha256, config)
+            if not force and item.get(preview['id']) == output and is_output_up_to_date(manifest, output, inputs):
+                report[preview['id']]['up to date'] += 1
+                continue
+            tasks.append((item, preview, source_path, output, inputs, event_name))
+
+    # ffmpeg does the work in its own process, threads are enough to run them in parallel
+    # Each clip is merged (and journalled) as soon as it is done
+    jobs = get_jobs_count(jobs)
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = {
+            executor.submit(transcode_audio_preview, source_path, get_local_path(output), preview, inputs['config'], event_name): index
+            for index, (item, preview, source_path, output, inputs, event_name) in enumerate(tasks)
+        }
+        for future in as_completed(futures):
+            item, preview, source_path, output, inputs, _ = tasks[futures[future]]
+            if future.result():
+                item[preview['id']] = output
+                record_output(manifest, output, inputs)
+                journal_update(item, [preview['id']], manifest, [output])
+                report[preview['id']]['rebuilt'] += 1
+            else:
+                report[preview['id']]['failed'] += 1
+
+    save_build_manifest(manifest)
+    print_build_summary(report)
+
+def get_preview_start(item):
+    try:
+        return max(0.0, float(item.get('video_timestart') or 0))
+    except ValueError:
+        return 0.0
+
+def transcode_audio_preview(source_path, dest_path, preview, config, item_name=None):
+    # Written to a temporary file first, then moved in place
+    tmp_path = os.path.join(TMP_DIR, f"preview_{os.path.basename(dest_path)}")
+    fade_out = max(0.0, config['length'] - 1.5)
+    filters = f"loudnorm={config['loudness']},afade=t=in:d=0.5,afade=t=out:st={fade_out}:d=1.5"
+    cmd = [
+        FFMPEG_BIN, "-hide_banner", "-loglevel", "error", "-y",
+        "-ss", str(config['start']), "-t", str(config['length']),
+        "-i", source_path,
+        "-vn", "-map_metadata", "-1",
+        "-af", filters,
+    ] + config['codec'] + [tmp_path]
 
-                    if os.path.exists(tmp_path):
-                        # Determine destination filename
-                        event_name = item.get('event_name')
-                        if event_name:
-                            dest_filename = f"{sanitize_filename(event_name)}.mp3"
-                        else:
-                            # Fallback if no event name
-                            dest_filename = f"{item['id']}.mp3"
-
-                        dest_path = os.path.join(MP3_DIR, dest_filename)
-                        shutil.move(tmp_path, dest_path)
-                        print(f"Downloaded to {dest_path}")
-
-                        item['audio'] = f"data/{YEAR}/mp3/{dest_filename}"
-                    else:
-                        print(f"File not found after wget: {tmp_path}")
-                except subprocess.CalledProcessError as e:
-                    print(f"Failed to download audio: {e}")
-                except FileNotFoundError:
-                    print(f"wget binary not found at {WGET_BIN}")
-
-def process_local_image(local_data, remote_data, force=False, override_max_width=None, override_quality=None):
+    try:
+        # ffmpeg runs in its own process: the CPU time of the record is only the waiting thread's
+        with timed("transcode", item_name, preview['id'], os.path.basename(dest_path)) as record:
+            subprocess.run(cmd, check=True)
+            shutil.move(tmp_path, dest_path)
+            record.update(bytes_in=os.path.getsize(source_path), bytes_out=os.path.getsize(dest_path))
+        print(f"Transcoded {dest_path}")
+        return True
+    except subprocess.CalledProcessError as e:
+        print(f"Failed to transcode {dest_path}: {e}")
+    except FileNotFoundError:
+        print(f"ffmpeg binary not found at {FFMPEG_BIN}. Please install it or set FFMPEG_BIN env var.")
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    return False
+
+def get_jobs_count(jobs):
+    # 0 or negative means "one worker per core"
+    if not jobs or jobs < 1:
+        return os.cpu_count() or 1
+    return jobs
+
+def process_local_image(local_data, remote_data, force=False, override_max_width=None, override_quality=None, jobs=1, download_concurrency=DOWNLOAD_CONCURRENCY, max_pixels=MAX_SOURCE_PIXELS, oversize=OVERSIZE_POLICY, quality_search=False, override_min_ssim=None):
     print("Processing Local Images...")
     remote_map = {item['id']: item for item in remote_data if 'id' in item}
-    sizes_config = get_image_sizes_config()
-
-    for item in local_data:
-        if item.get('id') in remote_map:
-            remote_item = remote_map[item['id']]
-            event_name = sanitize_filename(item.get('event_name', 'unknown'))
-
-            # Check if we need to process this item (if any target field is missing or force is True)
-            needs_processing = force
-            if not needs_processing:
-                for size_conf in sizes_config:
-                    if not item.get(size_conf['id']):
-                        needs_processing = True
-                        break
+    sizes_config = [get_effective_size_config(size_conf, override_max_width, override_quality, quality_search, override_min_ssim) for size_conf in get_image_sizes_config()]
+    if not features.check('avif') and any('avif' in str(size_conf.get('format')) for size_conf in get_image_sizes_config()):
+        print("Warning: this Pillow build has no AVIF support, AVIF outputs are skipped.")
+    if np is None:
+        print("Warning: NumPy is not installed, the dominant colours (image_color) are not computed.")
+    manifest = load_build_manifest()
+    report = {size_conf['id']: Counter() for size_conf in sizes_config}
+    report['placeholder'] = Counter()
+
+    # Collect the items to process (the order of local_data is kept for the merge)
+    tasks = [(item, remote_map[item['id']]) for item in local_data if item.get('id') in remote_map]
+    if not tasks:
+        return
 
-            if not needs_processing:
+    # Download every source once (shared between the variants and the items), concurrently
+    # Unchanged sources are served by the download cache. Without it (--no-cache), a source whose
+    # outputs are all up to date for the content it had at their last build is not downloaded
+    # again: a new image behind the same URL then needs --force
+    trust_recorded = not force and not _cache["enabled"]
+    downloads = {}
+    task_sources = []
+    for item, remote_item in tasks:
+        event_name = sanitize_filename(item.get('event_name', 'unknown'))
+        sources = {}
+        for size_conf in sizes_config:
+            source_url = get_image_source_url(remote_item, size_conf)
+            if not source_url:
+                continue
+            sources[size_conf['id']] = source_url
+            output = get_image_output(event_name, size_conf)
+            if not trust_recorded or not is_image_up_to_date(manifest, item, size_conf['id'], output, get_recorded_inputs(manifest.get(output), source_url, size_conf)):
+                downloads[source_url] = get_image_tmp_path(source_url)
+        source_url = sources.get(IMAGE_PLACEHOLDER_SOURCE)
+        if source_url and (not trust_recorded or not is_placeholder_up_to_date(manifest, item, get_recorded_inputs(manifest.get(get_placeholder_key(item)), source_url, get_placeholder_config()))):
+            downloads[source_url] = get_image_tmp_path(source_url)
+        task_sources.append(sources)
+
+    downloaded = download_files(downloads, download_concurrency)
+    source_hashes = {url: file_sha256(path) for url, path in downloaded.items() if path}
+
+    # Only keep the variants whose inputs (source content, size config, tool version) changed
+    builds = []
+    for (item, remote_item), sources in zip(tasks, task_sources):
+        event_name = sanitize_filename(item.get('event_name', 'unknown'))
+        to_build = []
+        source_paths = {}
+        for size_conf in sizes_config:
+            source_url = sources.get(size_conf['id'])
+            if not source_url:
+                continue
+            if source_url not in downloads:
+                report[size_conf['id']]['up to date'] += 1
+                continue
+            if not downloaded.get(source_url):
+                report[size_conf['id']]['failed'] += 1
                 continue
 
-            print(f"Processing images for {item.get('event_name', 'Unknown')}...")
-
-            # Identify the master image URL (default fallback)
-            master_url = remote_item.get('image')
-
-            # To avoid downloading the same file multiple times, we can cache downloaded files by URL
-            # Key: URL, Value: local path in TMP_DIR
-            downloaded_files = {}
-
-            # Generate each size
-            for size_conf in sizes_config:
-
-                # Determine source URL for this specific size variant
-                # Priority:
-                # 1. remote_item[size_conf['id']] (e.g. 'image_thumbnail')
-                # 2. master_url ('image')
-
-                source_url = remote_item.get(size_conf['id'])
-                if not source_url or not isinstance(source_url, str) or not source_url.startswith(('http://', 'https://')):
-                    source_url = master_url
+            output = get_image_output(event_name, size_conf)
+            inputs = get_build_inputs(source_url, source_hashes[source_url], size_conf)
+            if not force and is_image_up_to_date(manifest, item, size_conf['id'], output, inputs):
+                report[size_conf['id']]['up to date'] += 1
+                continue
 
-                if not source_url or not isinstance(source_url, str) or not source_url.startswith(('http://', 'https://')):
-                    # No source available for this variant
-                    print(f"  No source image found for {size_conf['id']}, skipping.")
-                    continue
+            to_build.append((size_conf, inputs))
+            source_paths[size_conf['id']] = downloaded[source_url]
+
+        # The placeholder only depends on its source content (a source decoded for it alone if needed)
+        placeholder = None
+        source_url = sources.get(IMAGE_PLACEHOLDER_SOURCE)
+        if source_url and source_url not in downloads:
+            report['placeholder']['up to date'] += 1
+        elif source_url and downloaded.get(source_url):
+            inputs = get_build_inputs(source_url, source_hashes[source_url], get_placeholder_config())
+            if force or not is_placeholder_up_to_date(manifest, item, inputs):
+                placeholder = inputs
+                source_paths[IMAGE_PLACEHOLDER_SOURCE] = downloaded[source_url]
+            else:
+                report['placeholder']['up to date'] += 1
+
+        if to_build or placeholder:
+            builds.append((item, source_paths, to_build, placeholder))
+
+    # Each item is merged (and journalled) as soon as it is done: an interrupted run resumes from there
+    jobs = get_jobs_count(jobs)
+
+    if jobs == 1 or len(builds) <= 1:
+        for item, source_paths, to_build, placeholder in builds:
+            try:
+                result = process_image_item(item, source_paths, [size_conf for size_conf, _ in to_build], max_pixels, oversize, placeholder is not None)
+            except Exception as e:
+                print(f"  Failed to process images for {item.get('event_name', 'Unknown')}: {e}")
+                result = ({}, [])
+            merge_image_item(item, to_build, placeholder, result, manifest, report)
+    else:
+        # With the decoded cache, threads (Pillow releases the GIL while decoding, resizing and
+        # encoding): worker processes would not share it. The timings need the processes.
+        in_process = _decoded["cache"] is not None and not _timings["enabled"]
+        print(f"Using {jobs} worker {'threads' if in_process else 'processes'} for {len(builds)} items.")
+        executor = ThreadPoolExecutor(max_workers=jobs) if in_process else ProcessPoolExecutor(max_workers=jobs, initializer=configure_timings, initargs=(_timings["enabled"],))
+        with executor:
+            futures = {
+                executor.submit(process_image_item, item, source_paths, [size_conf for size_conf, _ in to_build], max_pixels, oversize, placeholder is not None): index
+                for index, (item, source_paths, to_build, placeholder) in enumerate(builds)
+            }
+            for future in as_completed(futures):
+                item, source_paths, to_build, placeholder = builds[futures[future]]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # A crashed worker must not kill the batch
+                    print(f"  Failed to process images for {item.get('event_name', 'Unknown')}: {e}")
+                    result = ({}, [])
+                merge_image_item(item, to_build, placeholder, result, manifest, report)
+
+    save_build_manifest(manifest)
+    print_build_summary(report)
+
+    # Cleanup downloaded files
+    for tmp_path in downloaded.values():
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def merge_image_item(item, to_build, placeholder, result, manifest, report):
+    # Applies the result of process_image_item to the item and the build manifest, and journals them
+    updates, timing_records = result
+    _timings["records"].extend(timing_records)
+    outputs = []
+    fields = [size_conf['id'] for size_conf, _ in to_build] + [IMAGE_SRCSET_FIELD]
+
+    if placeholder is not None:
+        if 'placeholder' in updates:
+            item[IMAGE_PLACEHOLDER_FIELD] = updates['placeholder']['placeholder']
+            if updates['placeholder']['color']:
+                item[IMAGE_COLOR_FIELD] = updates['placeholder']['color']
+            else:
+                item.pop(IMAGE_COLOR_FIELD, None)
+            manifest[get_placeholder_key(item)] = placeholder
+            outputs.append(get_placeholder_key(item))
+            fields += [IMAGE_PLACEHOLDER_FIELD, IMAGE_COLOR_FIELD]
+            report['placeholder']['rebuilt'] += 1
+        else:
+            report['placeholder']['failed'] += 1
+    for size_conf, inputs in to_build:
+        size_id = size_conf['id']
+        if size_id not in updates:
+            report[size_id]['failed'] += 1
+            continue
+
+        update = updates[size_id]
+        # Files of the previous build which are not generated anymore (e.g. a removed srcset width)
+        previous_files = set(manifest.get(item.get(size_id), {}).get('files', {})) | {item.get(size_id)}
+        for path in previous_files - set(update['files']) - {update['path'], None, ""}:
+            if os.path.exists(get_local_path(path)):
+                os.remove(get_local_path(path))
+        item[size_id] = update['path']
+        set_image_srcset(item, size_id, update['srcset'])
+        record_output(manifest, update['path'], inputs, update['files'])
+        manifest[update['path']]['encodings'] = update['encodings']
+        outputs.append(update['path'])
+        report[size_id]['rebuilt'] += 1
+        for encoding in update['encodings'].values():
+            report[size_id].update(files=1, bytes=encoding['bytes'], quality=encoding['quality'])
+            if 'ssim' in encoding:
+                report[size_id].update({"ssim files": 1, "ssim": encoding['ssim']})
+
+    if outputs:
+        journal_update(item, fields, manifest, outputs)
+
+def get_placeholder_config():
+    return {"size": PLACEHOLDER_SIZE, "quality": PLACEHOLDER_QUALITY, "sample": PLACEHOLDER_SAMPLE, "bins": PLACEHOLDER_COLOR_BINS, "color": np is not None}
+
+def get_placeholder_key(item):
+    # Build manifest entry of the placeholder (not a file: keyed by item id)
+    return f"placeholder:{item.get('id')}"
+
+def is_placeholder_up_to_date(manifest, item, inputs):
+    return bool(item.get(IMAGE_PLACEHOLDER_FIELD)) and manifest.get(get_placeholder_key(item)) == inputs
+
+def process_thumbnail_atlas(local_data, force=False):
+    print("Packing the thumbnail atlas...")
+    manifest = load_build_manifest()
+    report = {'atlas': Counter()}
+
+    # Members in id order (deterministic), identified by the content of their thumbnail
+    members = {}
+    for item in sorted(local_data, key=lambda item: str(item.get('id'))):
+        path = item.get(ATLAS_SIZE_ID)
+        if path and not path.startswith(('http://', 'https://')) and os.path.exists(get_local_path(path)):
+            members[str(item['id'])] = (path, file_sha256(get_local_path(path)))
+    if not members:
+        print("  No thumbnails to pack.")
+        return
 
-                # Download logic (with caching per item)
-                if source_url not in downloaded_files:
-                    ext = os.path.splitext(source_url.split("?")[0])[1]
-                    if not ext: ext = ".jpg" # fallback
-
-                    # Create a unique temp name hash or just use counter to avoid collisions if URLs are different but same ext
-                    # Simple approach: use hash of URL
-                    import hashlib
-                    url_hash = hashlib.md5(source_url.encode('utf-8')).hexdigest()
-                    tmp_path = os.path.join(TMP_DIR, f"src_{item['id']}_{url_hash}{ext}")
-
-                    try:
-                        subprocess.run([WGET_BIN, "-O", tmp_path, source_url], check=True)
-                        if os.path.exists(tmp_path):
-                            downloaded_files[source_url] = tmp_path
-                        else:
-                            print(f"  Failed to download {source_url}")
-                            continue
-                    except subprocess.CalledProcessError as e:
-                        print(f"  Failed to download {source_url}: {e}")
-                        continue
-
-                source_tmp_path = downloaded_files.get(source_url)
-                if not source_tmp_path:
-                    continue
+    inputs = {
+        "members": {item_id: sha256 for item_id, (_, sha256) in members.items()},
+        "config": {"quality": ATLAS_QUALITY, "method": ATLAS_METHOD},
+        "tool_version": TOOL_VERSION,
+    }
+    if not force and is_output_up_to_date(manifest, ATLAS_IMAGE_PATH, inputs):
+        report['atlas']['up to date'] += 1
+        print_build_summary(report)
+        return
 
-                # Determine compression
-                quality = int(size_conf.get('compress', COMPRESS_WEBP))
-                if override_quality:
-                    quality = override_quality
+    try:
+        tiles = {}
+        for item_id, (path, _) in members.items():
+            with Image.open(get_local_path(path)) as tile:
+                tiles[item_id] = tile.convert('RGBA' if tile.has_transparency_data else 'RGB')
+
+        # Grid of cells as large as the largest thumbnail (all the same size with a cropped variant)
+        cell_width = max(tile.width for tile in tiles.values())
+        cell_height = max(tile.height for tile in tiles.values())
+        columns = math.ceil(math.sqrt(len(tiles)))
+        rows = math.ceil(len(tiles) / columns)
+        mode = 'RGBA' if any(tile.mode == 'RGBA' for tile in tiles.values()) else 'RGB'
+        atlas = Image.new(mode, (columns * cell_width, rows * cell_height))
+        items = {}
+        for index, (item_id, tile) in enumerate(tiles.items()):
+            x, y = (index % columns) * cell_width, (index // columns) * cell_height
+            atlas.paste(tile, (x, y))
+            items[item_id] = [x, y, tile.width, tile.height]
+
+        buffer = io.BytesIO()
+        atlas.save(buffer, 'WEBP', quality=ATLAS_QUALITY, method=ATLAS_METHOD)
+        data = buffer.getvalue()
+        with open(get_local_path(ATLAS_IMAGE_PATH), 'wb') as f:
+            f.write(data)
+        # The content hash in the URL: the browsers refetch the atlas only when it changed
+        save_json(get_local_path(ATLAS_MAP_PATH), {
+            "image": f"{ATLAS_IMAGE_PATH}?{hashlib.sha256(data).hexdigest()[:16]}",
+            "width": atlas.width,
+            "height": atlas.height,
+            "items": items,
+        })
+    except Exception as e:
+        print(f"  Failed to pack the thumbnail atlas: {e}")
+        report['atlas']['failed'] += 1
+        print_build_summary(report)
+        return
 
-                # Determine suffix
-                suffix = ""
-                if size_conf['id'] == 'image':
-                    suffix = ".webp"
+    record_output(manifest, ATLAS_IMAGE_PATH, inputs, [ATLAS_MAP_PATH])
+    save_build_manifest(manifest)
+    report['atlas'].update(rebuilt=1, files=1, bytes=len(data), quality=ATLAS_QUALITY)
+    print(f"  {len(items)} thumbnails packed in {atlas.width}x{atlas.height}.")
+    print_build_summary(report)
+
+def get_effective_size_config(size_conf, override_max_width=None, override_quality=None, quality_search=False, override_min_ssim=None):
+    # Apply the command line overrides, the result is what gets recorded in the build manifest
+    # (formats included: outputs skipped for lack of AVIF support are rebuilt once it is available)
+    size_conf = dict(size_conf)
+    size_conf['format'] = get_image_formats(size_conf)
+    if override_max_width:
+        size_conf['max-width'] = str(override_max_width)
+    if override_quality:
+        size_conf['compress'] = str(override_quality)
+    if quality_search:
+        size_conf['quality-search'] = {
+            "min-ssim":     float(override_min_ssim if override_min_ssim is not None else size_conf.get('min-ssim', MIN_SSIM)),
+            "max-bytes":    int(size_conf['max-bytes']) if size_conf.get('max-bytes') else None,
+            "compress-min": int(size_conf.get('compress-min', QUALITY_SEARCH_MIN)),
+            "compress-max": int(size_conf['compress-max']) if size_conf.get('compress-max') else None,
+        }
+    return size_conf
+
+def get_image_formats(size_conf):
+    # "format" is a format name or a list by order of preference, e.g. ["avif", "webp"]
+    # The last one is the fallback, written in the size field itself
+    formats = size_conf.get('format') or 'webp'
+    if isinstance(formats, str):
+        formats = [formats]
+    formats = [fmt.lower() for fmt in formats if fmt.lower() in IMAGE_FORMATS]
+    formats = [fmt for fmt in formats if fmt != 'avif' or features.check('avif')]
+    return formats or ['webp']
+
+def get_image_quality(size_conf, fmt):
+    # The quality scales differ between encoders: "compress-avif" (etc.) overrides "compress"
+    return int(size_conf.get(f'compress-{fmt}', size_conf.get('compress', COMPRESS_WEBP)))
+
+def get_image_srcset_widths(size_conf, size):
+    # Extra widths of the "srcset" list, only the ones below the variant width (no upscaling)
+    widths = {int(width) for width in size_conf.get('srcset', []) if str(width).isdigit()}
+    return sorted((width for width in widths if width < size[0]), reverse=True)
+
+def get_image_dest_filename(event_name, size_id, fmt='webp', width=None):
+    # Determine suffix
+    if size_id == 'image':
+        suffix = ""
+    else:
+        # e.g. image_thumbnail -> .thumbnail.webp
+        suffix = "." + size_id.replace("image_", "")
+    if width:
+        # e.g. srcset width of image_mobile -> .mobile.480w.avif
+        suffix += f".{width}w"
+    return f"{event_name}{suffix}{IMAGE_FORMATS[fmt][1]}"
+
+def get_image_srcset_descriptor(size_conf, files):
+    # <picture> descriptor: one source per format (by order of preference) listing every width
+    # files: [(format, width, data path)], None when there is nothing to choose from
+    if len(files) <= 1:
+        return None
+    sources = []
+    for fmt in get_image_formats(size_conf):
+        candidates = sorted((width, path) for file_fmt, width, path in files if file_fmt == fmt)
+        sources.append({
+            "type":   IMAGE_FORMATS[fmt][2],
+            "srcset": ", ".join(f"{path} {width}w" for width, path in candidates),
+        })
+    return {"sizes": size_conf.get('sizes', '100vw'), "sources": sources}
+
+def get_image_srcset_paths(descriptor):
+    return [candidate.split()[0] for source in descriptor.get('sources', []) for candidate in source['srcset'].split(',') if candidate.strip()]
+
+def set_image_srcset(item, size_id, descriptor):
+    srcset = dict(item.get(IMAGE_SRCSET_FIELD) or {})
+    if descriptor:
+        srcset[size_id] = descriptor
+    else:
+        srcset.pop(size_id, None)
+    if srcset:
+        item[IMAGE_SRCSET_FIELD] = srcset
+    else:
+        item.pop(IMAGE_SRCSET_FIELD, None)
+
+def get_image_output(event_name, size_conf):
+    # data.json path of a variant: its last format (the fallback of the <picture>)
+    return f"data/{YEAR}/images/{get_image_dest_filename(event_name, size_conf['id'], get_image_formats(size_conf)[-1])}"
+
+def get_recorded_inputs(entry, source_url, config):
+    # The inputs of an output, assuming its source content did not change since its last build
+    return get_build_inputs(source_url, (entry or {}).get('source_sha256'), config)
+
+def is_image_up_to_date(manifest, item, size_id, output, inputs):
+    if item.get(size_id) != output or not is_output_up_to_date(manifest, output, inputs):
+        return False
+    # The descriptor is in data.json only when the build produced secondary files
+    return (size_id in (item.get(IMAGE_SRCSET_FIELD) or {})) == bool(manifest[output].get('files'))
+
+def get_image_source_url(remote_item, size_conf):
+    # Determine source URL for this specific size variant
+    # Priority:
+    # 1. remote_item[size_conf['id']] (e.g. 'image_thumbnail')
+    # 2. master image ('image')
+    for source_url in [remote_item.get(size_conf['id']), remote_item.get('image')]:
+        if source_url and isinstance(source_url, str) and source_url.startswith(('http://', 'https://')):
+            return source_url
+    return None
+
+def get_image_tmp_path(source_url):
+    ext = os.path.splitext(source_url.split("?")[0])[1]
+    if not ext: ext = ".jpg" # fallback
+
+    # Use a hash of the URL to avoid collisions between different URLs with the same name
+    url_hash = hashlib.md5(source_url.encode('utf-8')).hexdigest()
+    return os.path.join(TMP_DIR, f"src_{url_hash}{ext}")
+
+def plan_image_variant(width, height, size_conf):
+    # Geometry only: returns the resize target (or None) and the crop box (or None)
+    # for a source of width x height, so every variant of a source can be planned together
+    actions = size_conf.get('action', [])
+    resize = None
+    crop = None
+
+    # Convert strings to int if necessary, handle "auto"
+    # Logic:
+    # If 'crop' is NOT in action, we just resize to fit within max boundaries
+    # If 'crop' IS in action, we resize to cover the target dimensions first, then center crop
+    req_w = req_h = 0
+    if 'crop' in actions:
+        req_w = int(size_conf.get('width', 0))
+        req_h = int(size_conf.get('height', 0))
+
+    # 1. Resize
+    if 'resize' in actions:
+        if 'crop' in actions:
+            # Resize for Crop (Cover strategy)
+            if req_w > 0 and req_h > 0:
+                ratio_img = width / height
+                ratio_req = req_w / req_h
+
+                # If image is wider than target ratio, height is the constraint
+                if ratio_img > ratio_req:
+                    resize = (int(req_h * ratio_img), req_h)
                 else:
-                    # e.g. image_thumbnail -> .thumbnail.webp
-                    suffix = "." + size_conf['id'].replace("image_", "") + ".webp"
-
-                dest_filename = f"{event_name}{suffix}"
+                    resize = (req_w, int(req_w / ratio_img))
+
+        else:
+            # Standard Resize (Contain strategy), mostly driven by max-width
+            max_width_conf = size_conf.get('max-width')
+            mw = None
+            if max_width_conf and str(max_width_conf).lower() != 'auto':
+                mw = int(max_width_conf)
+
+            # Exact Width (if provided instead of max)
+            ew = None
+            if 'width' in size_conf and str(size_conf['width']).lower() != 'auto':
+                ew = int(size_conf['width'])
+
+            if mw and width > mw:
+                resize = (mw, int(mw * height / width))
+            elif ew and width != ew:
+                resize = (ew, int(ew * height / width))
+
+    # 2. Crop
+    if 'crop' in actions and req_w > 0 and req_h > 0:
+        # Center crop by default (crop_x / crop_y are "center" in the current config)
+        curr_w, curr_h = resize or (width, height)
+        crop = ((curr_w - req_w) / 2, (curr_h - req_h) / 2, (curr_w + req_w) / 2, (curr_h + req_h) / 2)
+
+    return {"resize": resize, "crop": crop}
+
+def get_required_source_size(width, height, sizes_config):
+    # Largest width and height any variant is rendered from (resize target, or the source itself)
+    needs = [plan_image_variant(width, height, size_conf)['resize'] or (width, height) for size_conf in sizes_config]
+    return max(need[0] for need in needs), max(need[1] for need in needs)
+
+# Decoded sources kept in memory between the runs of a long-lived process (build.py --watch)
+_decoded = {"cache": None, "lock": threading.Lock()}
+
+def configure_decoded_cache(cache):
+    # cache: dict owned by the caller ({} to start, None to disable), least recently used entries first
+    _decoded["cache"] = cache
+
+def open_source_image(source_path, sizes_config, max_pixels=MAX_SOURCE_PIXELS, oversize=OVERSIZE_POLICY):
+    # The caller owns the returned image (a copy when it comes from the decoded cache)
+    cache = _decoded["cache"]
+    if cache is None:
+        return decode_source_image(source_path, sizes_config, max_pixels, oversize)
+
+    # Same content decoded at the same scale: same pixels as a cold decode (only the header is read here)
+    with Image.open(source_path) as img:
+        required = get_required_source_size(img.width, img.height, sizes_config)
+    key = (file_sha256(source_path), required, max_pixels, oversize)
+    with _decoded["lock"]:
+        img = cache.pop(key, None)
+        if img is not None:
+            cache[key] = img
+    if img is None:
+        img = decode_source_image(source_path, sizes_config, max_pixels, oversize)
+        with _decoded["lock"]:
+            cache[key] = img
+            while len(cache) > DECODED_CACHE_SIZE:
+                cache.pop(next(iter(cache))).close()
+    return img.copy()
+
+def decode_source_image(source_path, sizes_config, max_pixels=MAX_SOURCE_PIXELS, oversize=OVERSIZE_POLICY):
+    # Decode at the smallest scale still covering every variant: JPEG sources use draft mode
+    # (DCT scaling by 1/2, 1/4 or 1/8 while decoding), other formats are reduced right after loading
+    # Sources above max_pixels are refused, or decoded downsampled to fit the budget
+    img = Image.open(source_path)
+    width, height = img.size
+    required = get_required_source_size(width, height, sizes_config)
+    is_jpeg = img.format == 'JPEG'
+
+    if max_pixels and width * height > max_pixels:
+        megapixels = f"{width}x{height} ({width * height / 1e6:.1f} MP, budget {max_pixels / 1e6:.1f} MP)"
+        if oversize == 'refuse' or not is_jpeg:
+            # Without draft mode the whole image would have to be decoded first
+            img.close()
+            raise ValueError(f"source image too large: {megapixels}")
+
+        # Smallest power-of-two reduction that fits the budget (draft mode goes down to 1/8)
+        scale = 1
+        while scale < 8 and (width // scale) * (height // scale) > max_pixels:
+            scale *= 2
+        fit = (width // scale, height // scale)
+        required = (min(required[0], fit[0]), min(required[1], fit[1]))
+        print(f"  Downsampling oversized source {megapixels}")
+
+    if is_jpeg and required != (width, height):
+        img.draft(img.mode, required)
+
+    img.load()
+
+    # Box reduce while at least twice the required size (keeps LANCZOS a good margin to work with)
+    factor = min(img.width // (2 * required[0]), img.height // (2 * required[1]))
+    if max_pixels and img.width * img.height > max_pixels:
+        factor = max(factor, math.ceil(math.sqrt(img.width * img.height / max_pixels)))
+    if factor >= 2:
+        reduced = img.reduce(factor)
+        img.close()
+        img = reduced
+
+    return img
+
+def process_image_item(item, source_paths, sizes_config, max_pixels=MAX_SOURCE_PIXELS, oversize=OVERSIZE_POLICY, placeholder=False):
+    # Runs in a worker process: only returns the new values and the timing records,
+    # data.json is merged by the caller
+    # source_paths: {size_id: downloaded source file}
+    # placeholder: also compute the placeholder, from the source of IMAGE_PLACEHOLDER_SOURCE
+    updates = {}
+    event_name = sanitize_filename(item.get('event_name', 'unknown'))
+    timings_start = len(_timings["records"])
+
+    print(f"Processing images for {item.get('event_name', 'Unknown')}...")
+
+    # Group the variants by source, so each source is decoded only once
+    variants_by_source = {}
+    for size_conf in sizes_config:
+        source_tmp_path = source_paths.get(size_conf['id'])
+        if not source_tmp_path or not os.path.exists(source_tmp_path):
+            # No source available (or download failed) for this variant
+            print(f"  No source image found for {size_conf['id']}, skipping.")
+            continue
+        variants_by_source.setdefault(source_tmp_path, []).append(size_conf)
+
+    placeholder_path = source_paths.get(IMAGE_PLACEHOLDER_SOURCE) if placeholder else None
+    if placeholder_path and os.path.exists(placeholder_path):
+        variants_by_source.setdefault(placeholder_path, [])
+
+    for source_tmp_path, source_sizes in variants_by_source.items():
+        # The placeholder sample is small enough to never require a larger decode
+        decode_sizes = source_sizes + ([{"action": ["resize"], "max-width": PLACEHOLDER_SAMPLE}] if source_tmp_path == placeholder_path else [])
+        try:
+            with timed("decode", event_name, detail=",".join(size_conf.get('id', 'placeholder') for size_conf in decode_sizes)) as record:
+                record["bytes_in"] = os.path.getsize(source_tmp_path)
+                master = open_source_image(source_tmp_path, decode_sizes, max_pixels, oversize)
+            with master:
+                updates.update(render_image_variants(master, source_sizes, event_name))
+                if source_tmp_path == placeholder_path:
+                    with timed("placeholder", event_name):
+                        updates['placeholder'] = get_image_placeholder(master)
+        except Exception as e:
+            print(f"  Failed to process {', '.join(size_conf.get('id', 'placeholder') for size_conf in decode_sizes)}: {e}")
+
+    return updates, pop_timing_records(timings_start)
+
+def render_image_variants(master, sizes_config, event_name):
+    # Cascaded downscaling: the renditions are rendered from the largest to the smallest, each one
+    # resized from the smallest already resized image that still covers it (1920 -> 768 -> 320 -> 128)
+    # A rendition is a variant at its own size or at one of its smaller "srcset" widths, encoded in
+    # every format of the variant
+    # Renditions giving the same pixels, quality and format (e.g. source smaller than every max-width)
+    # are encoded once and copied
+    renditions = []
+    for size_conf in sizes_config:
+        plan = plan_image_variant(master.width, master.height, size_conf)
+        target = plan['resize'] or master.size
+        renditions.append((size_conf, None, target, plan['crop']))
+        if not plan['crop']:
+            # Cropped variants have a fixed size, srcset widths only apply to the resized ones
+            for width in get_image_srcset_widths(size_conf, target):
+                renditions.append((size_conf, width, (width, max(1, round(width * target[1] / target[0]))), None))
+    renditions.sort(key=lambda rendition: rendition[2][0], reverse=True)
+
+    resized = {master.size: master}
+    encoded = {}
+    outputs = {}
+    failed = set()
+
+    for size_conf, width, target, crop in renditions:
+        size_id = size_conf['id']
+        if size_id in failed:
+            continue
+
+        try:
+            if target not in resized:
+                # Smallest intermediate covering the target in both dimensions
+                base = min(
+                    (img for size, img in resized.items() if size[0] >= target[0] and size[1] >= target[1]),
+                    key=lambda img: img.width,
+                    default=master
+                )
+                with timed("resize", event_name, size_id, f"{base.width}x{base.height} -> {target[0]}x{target[1]}"):
+                    resized[target] = base.resize(target, Image.Resampling.LANCZOS)
+
+            img = resized[target]
+            if crop:
+                with timed("crop", event_name, size_id):
+                    img = img.crop(crop)
+            search = size_conf.get('quality-search')
+            for fmt in get_image_formats(size_conf):
+                quality = get_image_quality(size_conf, fmt)
+                dest_filename = get_image_dest_filename(event_name, size_id, fmt, width)
                 dest_path = os.path.join(IMAGES_DIR, dest_filename)
 
-                try:
-                    with Image.open(source_tmp_path) as img:
-                        # Apply Actions
-                        actions = size_conf.get('action', [])
-
-                        # 1. Resize
-                        if 'resize' in actions:
-                            target_width = size_conf.get('width')
-                            target_height = size_conf.get('height')
-                            max_width_conf = size_conf.get('max-width')
-                            max_height_conf = size_conf.get('max-height')
-
-                            # Override logic
-                            if override_max_width:
-                                max_width_conf = override_max_width
-
-                            # Convert strings to int/float if necessary, handle "auto"
-                            # Logic:
-                            # If 'crop' is NOT in action, we just resize to fit within max boundaries (thumbnail behavior usually implies crop, but here we separate)
-                            # If 'crop' IS in action, we usually resize to cover the target dimensions first.
-
-                            new_w, new_h = img.width, img.height
-
-                            if 'crop' in actions:
-                                # Resize for Crop (Cover strategy)
-                                # We need to ensure the image covers the target width/height
-                                # Assuming width/height are set for crop
-                                req_w = int(size_conf.get('width', 0))
-                                req_h = int(size_conf.get('height', 0))
-
-                                if req_w > 0 and req_h > 0:
-                                    ratio_img = img.width / img.height
-                                    ratio_req = req_w / req_h
-
-                                    # If image is wider than target ratio, height is the constraint
-                                    if ratio_img > ratio_req:
-                                        resize_h = req_h
-                                        resize_w = int(resize_h * ratio_img)
-                                    else:
-                                        resize_w = req_w
-                                        resize_h = int(resize_w / ratio_img)
-
-                                    img = img.resize((resize_w, resize_h), Image.Resampling.LANCZOS)
-                                    # print(f"  Resized for crop to {resize_w}x{resize_h}")
-
-                            else:
-                                # Standard Resize (Contain strategy)
-                                # Respect max-width / max-height
-
-                                # Max Width
-                                mw = None
-                                if max_width_conf and str(max_width_conf).lower() != 'auto':
-                                    mw = int(max_width_conf)
-
-                                # Max Height
-                                mh = None
-                                if max_height_conf and str(max_height_conf).lower() != 'auto':
-                                    mh = int(max_height_conf)
-
-                                # Exact Width/Height (if provided instead of max)
-                                ew = None
-                                if 'width' in size_conf and str(size_conf['width']).lower() != 'auto':
-                                    ew = int(size_conf['width'])
-
-                                # Logic: mostly we use max-width.
-
-                                if mw and img.width > mw:
-                                    ratio = img.height / img.width
-                                    new_h = int(mw * ratio)
-                                    img = img.resize((mw, new_h), Image.Resampling.LANCZOS)
-                                    # print(f"  Resized (max-width) to {mw}x{new_h}")
-                                elif ew and img.width != ew:
-                                        ratio = img.height / img.width
-                                        new_h = int(ew * ratio)
-                                        img = img.resize((ew, new_h), Image.Resampling.LANCZOS)
-
-
-                        # 2. Crop
-                        if 'crop' in actions:
-                            req_w = int(size_conf.get('width', 0))
-                            req_h = int(size_conf.get('height', 0))
-
-                            if req_w > 0 and req_h > 0:
-                                # Center crop by default (or read crop_x, crop_y)
-                                # Current config says "center", "center"
-                                # We can assume center for now as logic for custom x/y percentages is complex without data
-
-                                curr_w, curr_h = img.width, img.height
-
-                                left = (curr_w - req_w) / 2
-                                top = (curr_h - req_h) / 2
-                                right = (curr_w + req_w) / 2
-                                bottom = (curr_h + req_h) / 2
-
-                                img = img.crop((left, top, right, bottom))
-                                # print(f"  Cropped to {req_w}x{req_h}")
-
-                        img.save(dest_path, "WEBP", quality=quality)
-
-                    # Update local data
-                    item[size_conf['id']] = f"data/{YEAR}/images/{dest_filename}"
-                    # print(f"  Saved {dest_filename} ({quality}%)")
-
-                except Exception as e:
-                    print(f"  Failed to process {size_conf['id']}: {e}")
-
-            # Cleanup downloaded files for this item
-            for tmp_path in downloaded_files.values():
-                if os.path.exists(tmp_path):
-                    os.remove(tmp_path)
-
+                alias_key = (target, crop, quality, fmt, json.dumps(search, sort_keys=True))
+                if alias_key in encoded:
+                    with timed("save", event_name, size_id, dest_filename) as record:
+                        shutil.copyfile(encoded[alias_key][0], dest_path)
+                        record["bytes_out"] = encoded[alias_key][1]['bytes']
+                else:
+                    with timed("encode", event_name, size_id, dest_filename) as record:
+                        if search:
+                            quality, data, ssim = search_image_quality(img, fmt, search['compress-max'] or quality, search)
+                            encoding = {"quality": quality, "ssim": round(ssim, 4), "bytes": len(data)}
+                        else:
+                            data = encode_image(img, fmt, quality)
+                            encoding = {"quality": quality, "bytes": len(data)}
+                        record["bytes_out"] = len(data)
+                    with timed("save", event_name, size_id, dest_filename) as record:
+                        with open(dest_path, 'wb') as f:
+                            f.write(data)
+                        record["bytes_out"] = len(data)
+                    encoded[alias_key] = (dest_path, encoding)
+
+                outputs.setdefault(size_id, []).append((fmt, img.width, width is None, f"data/{YEAR}/images/{dest_filename}", encoded[alias_key][1]))
+
+        except Exception as e:
+            print(f"  Failed to process {size_id}: {e}")
+            failed.add(size_id)
+
+    # Update local data (merged by the caller): the main file (fallback format, own size) goes in
+    # the size field, the other files are listed in the srcset descriptor
+    updates = {}
+    for size_conf in sizes_config:
+        size_id = size_conf['id']
+        if size_id in failed or size_id not in outputs:
+            continue
+        fallback = get_image_formats(size_conf)[-1]
+        main_path = next(path for fmt, _, is_main, path, _ in outputs[size_id] if is_main and fmt == fallback)
+        updates[size_id] = {
+            "path":      main_path,
+            "files":     sorted(path for _, _, _, path, _ in outputs[size_id] if path != main_path),
+            "srcset":    get_image_srcset_descriptor(size_conf, [(fmt, img_width, path) for fmt, img_width, _, path, _ in outputs[size_id]]),
+            "encodings": {path: encoding for _, _, _, path, encoding in outputs[size_id]},
+        }
+
+    return updates
+
+def get_image_placeholder(master):
+    # {"placeholder": tiny WebP data URI, "color": dominant colour "#rrggbb" (None without NumPy)}
+    sample = master.convert('RGBA' if master.has_transparency_data else 'RGB')
+    sample = sample.resize((PLACEHOLDER_SAMPLE, max(1, round(PLACEHOLDER_SAMPLE * master.height / master.width))), Image.Resampling.BOX)
+
+    scale = PLACEHOLDER_SIZE / max(sample.size)
+    tiny = sample.resize((max(1, round(sample.width * scale)), max(1, round(sample.height * scale))), Image.Resampling.LANCZOS)
+    placeholder = "data:image/webp;base64," + base64.b64encode(encode_image(tiny, 'webp', PLACEHOLDER_QUALITY)).decode('ascii')
+
+    color = None
+    if np is not None:
+        color = "#{:02x}{:02x}{:02x}".format(*get_dominant_color(np.asarray(sample.convert('RGB')).reshape(-1, 3)))
+    return {"placeholder": placeholder, "color": color}
+
+def get_dominant_color(pixels, bins=PLACEHOLDER_COLOR_BINS):
+    # Mean colour of the most populated cell of a bins^3 RGB histogram (pixels: N x 3 uint8 array)
+    cells = pixels.astype(np.int32) * bins // 256
+    index = (cells[:, 0] * bins + cells[:, 1]) * bins + cells[:, 2]
+    top = np.bincount(index, minlength=bins ** 3).argmax()
+    return [int(value) for value in pixels[index == top].mean(axis=0).round()]
+
+def encode_image(img, fmt, quality):
+    pil_format = IMAGE_FORMATS[fmt][0]
+    # The AVIF and JPEG encoders only take RGB(A) / RGB images (palette or grayscale sources)
+    if pil_format != 'WEBP' and img.mode not in ('RGB', 'RGBA'):
+        img = img.convert('RGBA' if img.has_transparency_data else 'RGB')
+    if pil_format == 'JPEG' and img.mode == 'RGBA':
+        img = img.convert('RGB')
+    buffer = io.BytesIO()
+    img.save(buffer, pil_format, quality=quality)
+    return buffer.getvalue()
+
+def search_image_quality(img, fmt, max_quality, search):
+    # Binary search of the lowest quality whose SSIM against the rendered image reaches the floor
+    # (assumes the SSIM grows with the quality), lowered further while the file is above max-bytes
+    # Returns (quality, encoded bytes, SSIM); max_quality is used when the floor is out of reach
+    reference = get_luma_array(img)
+    tries = {}
+
+    def encode(quality):
+        if quality not in tries:
+            data = encode_image(img, fmt, quality)
+            with Image.open(io.BytesIO(data)) as decoded:
+                tries[quality] = (data, compute_ssim(reference, get_luma_array(decoded)))
+        return tries[quality]
+
+    min_quality = min(search['compress-min'], max_quality)
+    low, high = min_quality, max_quality
+    if search['min-ssim']:
+        while low < high:
+            middle = (low + high) // 2
+            if encode(middle)[1] >= search['min-ssim']:
+                high = middle
+            else:
+                low = middle + 1
+    quality = high
+
+    # Byte ceiling: highest quality fitting, below the floor if needed (min_quality at worst)
+    if search['max-bytes'] and len(encode(quality)[0]) > search['max-bytes']:
+        low, high = min_quality, quality
+        while low < high:
+            middle = (low + high + 1) // 2
+            if len(encode(middle)[0]) <= search['max-bytes']:
+                low = middle
+            else:
+                high = middle - 1
+        quality = low
+
+    data, ssim = encode(quality)
+    return quality, data, ssim
+
+def get_luma_array(img):
+    return np.asarray(img.convert('L'), dtype=np.float64)
+
+def get_window_means(values, window):
+    # Mean of every window x window block (valid positions), from a summed-area table
+    table = np.pad(values, ((1, 0), (1, 0))).cumsum(axis=0).cumsum(axis=1)
+    return (table[window:, window:] - table[:-window, window:] - table[window:, :-window] + table[:-window, :-window]) / (window * window)
+
+def compute_ssim(reference, candidate, window=SSIM_WINDOW):
+    # Mean structural similarity of two luma arrays (uniform window, standard constants for 8 bits)
+    window = min(window, *reference.shape)
+    c1 = (0.01 * 255) ** 2
+    c2 = (0.03 * 255) ** 2
+
+    mean_x = get_window_means(reference, window)
+    mean_y = get_window_means(candidate, window)
+    var_x = get_window_means(reference * reference, window) - mean_x * mean_x
+    var_y = get_window_means(candidate * candidate, window) - mean_y * mean_y
+    covariance = get_window_means(reference * candidate, window) - mean_x * mean_y
+
+    ssim = ((2 * mean_x * mean_y + c1) * (2 * covariance + c2)) / ((mean_x * mean_x + mean_y * mean_y + c1) * (var_x + var_y + c2))
+    return float(ssim.mean())
 
 if __name__ == "__main__":
     main()
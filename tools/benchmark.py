@@ -0,0 +1,410 @@
+import argparse
+import contextlib
+import functools
+import importlib.util
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import PIL
+from PIL import Image, ImageDraw, ImageFilter
+
+import assets
+
+# Offline benchmark of the asset pipeline: synthetic sources, a local HTTP origin standing in for
+# the remote data.json and media server, and a fake yt-dlp extractor
+# Timings are machine specific: compare against a baseline recorded on the same machine
+
+# Configuration
+RESOLUTIONS        = [(800, 800), (1920, 1080), (3000, 2000), (6000, 4000)]
+QUICK_RESOLUTIONS  = [(800, 800), (3000, 2000)]
+ITEMS_COUNT        = 8
+REPEAT             = 3
+LATENCY            = 50 # milliseconds per request of the local origin (and per fake extraction)
+FAKE_AUDIO_SIZE    = 2 * 1024 * 1024
+SCREENSHOTS_COUNT  = 8 # captures queued on the encoder pool per measure
+THRESHOLD          = 0.20 # slowdown ratio above which a result is a regression
+NOISE_FLOOR        = 0.005 # seconds, differences below are never reported
+RESULTS_PATH       = "benchmark-results.json"
+BASELINE_PATH      = "benchmark-baseline.json"
+STAGES             = ["download", "decode", "resize", "encode", "e2e", "icon", "screenshot"]
+
+TOOLS_DIR          = Path(__file__).resolve().parent
+PROJECT_ROOT       = TOOLS_DIR.parent
+ICON_SVG           = TOOLS_DIR / "tinals-2026-icon-pochette-noire-texte-externe.svg"
+
+_options = {"verbose": False}
+
+class FakeYoutubeDL:
+    # Stands in for yt_dlp.YoutubeDL (see assets.YT_DLP_CLASS): waits like a remote extraction and
+    # writes a random audio file where yt-dlp would
+    latency = 0
+
+    def __init__(self, options):
+        self.options = options
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def extract_info(self, url, download=True):
+        time.sleep(FakeYoutubeDL.latency)
+        video_id = assets.get_youtube_video_id(url)
+        filepath = self.options['outtmpl'].replace('%(title)s', f"fake_{video_id}").replace('%(ext)s', 'mp3')
+        with open(filepath, 'wb') as f:
+            f.write(os.urandom(FAKE_AUDIO_SIZE))
+        return {"id": video_id, "title": f"Fake {video_id}", "requested_downloads": [{"filepath": filepath}]}
+
+class LatencyRequestHandler(SimpleHTTPRequestHandler):
+    # Static file server answering every request after a fixed delay (the remote origin round trip)
+    latency = 0
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        super().do_GET()
+
+    def log_message(self, format, *args):
+        pass
+
+def start_origin(directory, latency):
+    handler = type("OriginHandler", (LatencyRequestHandler,), {"latency": latency})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(handler, directory=str(directory)))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+def make_source_image(width, height, seed):
+    # Photo-like content: two gradients, shapes with blurred edges, and grain
+    rng = random.Random(seed)
+    gradient = Image.linear_gradient('L')
+    red = gradient.resize((width, height))
+    green = gradient.rotate(90).resize((width, height))
+    blue = Image.new('L', (width, height), rng.randrange(256))
+    img = Image.merge('RGB', (red, green, blue))
+
+    draw = ImageDraw.Draw(img)
+    for _ in range(40):
+        x, y = rng.randrange(width), rng.randrange(height)
+        radius = rng.randrange(min(width, height) // 20, min(width, height) // 4)
+        color = (rng.randrange(256), rng.randrange(256), rng.randrange(256))
+        shape = draw.ellipse if rng.random() < 0.5 else draw.rectangle
+        shape((x - radius, y - radius, x + radius, y + radius), fill=color)
+    img = img.filter(ImageFilter.GaussianBlur(2))
+
+    grain_size = (max(1, width // 2), max(1, height // 2))
+    grain = Image.frombytes('L', grain_size, rng.randbytes(grain_size[0] * grain_size[1])).resize((width, height))
+    return Image.blend(img, Image.merge('RGB', (grain, grain, grain)), 0.12)
+
+def get_resolution_key(resolution):
+    return f"{resolution[0]}x{resolution[1]}"
+
+def create_sandbox(sandbox, base_url, resolutions, items_count):
+    # sandbox/root is a minimal project (config + data.json), the pipeline runs from sandbox/root/tools
+    # sandbox/origin is served by the local origin
+    root = sandbox / "root"
+    origin = sandbox / "origin"
+    (root / "config").mkdir(parents=True)
+    (root / "tools").mkdir()
+    (root / "data" / assets.YEAR).mkdir(parents=True)
+    origin.mkdir()
+    shutil.copy(PROJECT_ROOT / "config" / "config.json", root / "config" / "config.json")
+
+    print(f"Generating {len(resolutions)} source images...")
+    sources = {}
+    for index, resolution in enumerate(resolutions):
+        filename = f"source-{get_resolution_key(resolution)}.jpg"
+        make_source_image(*resolution, seed=index).save(origin / filename, "JPEG", quality=90)
+        sources[resolution] = filename
+
+    # One image (cycling the resolutions) and one audio file per artist, each behind its own URL
+    local_data = []
+    remote_data = []
+    for index in range(items_count):
+        resolution = resolutions[index % len(resolutions)]
+        shutil.copy(origin / sources[resolution], origin / f"image-{index}.jpg")
+        (origin / f"audio-{index}.mp3").write_bytes(random.Random(index).randbytes(FAKE_AUDIO_SIZE))
+
+        local_data.append({"id": index + 1, "event_name": f"Artist {index + 1}", "audio": "", "image": "", "image_mobile": "", "image_thumbnail": "", "image_artist": ""})
+        remote_data.append({
+            "id":        index + 1,
+            "image":     f"{base_url}/image-{index}.jpg",
+            "audio":     f"{base_url}/audio-{index}.mp3",
+            "video_url": f"https://www.youtube.com/watch?v=fake{index:07d}",
+        })
+
+    (origin / "data.json").write_text(json.dumps(remote_data), encoding="utf-8")
+    return root, local_data, sources
+
+def reset_sandbox(root, local_data):
+    # Back to a cold state: initial data.json, no output, no manifest, empty caches
+    data_dir = root / "data" / assets.YEAR
+    for name in ["images", "mp3"]:
+        shutil.rmtree(data_dir / name, ignore_errors=True)
+    for path in [data_dir / "build-manifest.json", data_dir / "data.json.journal", root / "tools" / "cache", root / "tools" / "tmp"]:
+        if path.is_dir():
+            shutil.rmtree(path)
+        elif path.exists():
+            path.unlink()
+    (data_dir / "data.json").write_text(json.dumps(local_data, indent=4), encoding="utf-8")
+    assets.ensure_dirs()
+
+def measure(results, key, func, repeat, setup=None):
+    # Median wall time of repeat runs; func may return a dict such as {"bytes": n} (kept in the result)
+    runs = []
+    extra = None
+    for _ in range(repeat):
+        with quiet():
+            if setup:
+                setup()
+            start = time.perf_counter()
+            extra = func()
+            runs.append(time.perf_counter() - start)
+    results[key] = dict({"seconds": round(statistics.median(runs), 4), "runs": [round(run, 4) for run in runs]}, **(extra if isinstance(extra, dict) else {}))
+    print(f"  {key:<48} {results[key]['seconds']:>9.3f} s")
+
+def quiet():
+    # The pipeline logs every file, only the timings are printed (unless --verbose)
+    return contextlib.nullcontext() if _options["verbose"] else contextlib.redirect_stdout(io.StringIO())
+
+def bench_download(results, base_url, sources, repeat):
+    print("Download:")
+    assets.configure_cache(enabled=False)
+    os.makedirs(assets.TMP_DIR, exist_ok=True)
+
+    for resolution, filename in sources.items():
+        url = f"{base_url}/{filename}"
+        dest_path = os.path.join(assets.TMP_DIR, filename)
+
+        def download():
+            if not assets.download_file(url, dest_path):
+                raise RuntimeError(f"download of {url} failed")
+            return {"bytes": os.path.getsize(dest_path)}
+
+        measure(results, f"download/{get_resolution_key(resolution)}", download, repeat)
+
+    downloads = {f"{base_url}/image-{index}.jpg": os.path.join(assets.TMP_DIR, f"image-{index}.jpg") for index in range(ITEMS_COUNT)}
+    measure(results, "download/concurrent", lambda: {"bytes": sum(os.path.getsize(path) for path in assets.download_files(downloads).values() if path)}, repeat)
+    shutil.rmtree(assets.TMP_DIR)
+
+def bench_images(results, origin, sources, sizes_config, stages, repeat):
+    # Decode, resize and encode, per source resolution and per size config (and format)
+    for resolution, filename in sources.items():
+        resolution_key = get_resolution_key(resolution)
+        source_path = str(origin / filename)
+        print(f"Images {resolution_key}:")
+
+        if "decode" in stages:
+            measure(results, f"decode/{resolution_key}", lambda: assets.open_source_image(source_path, sizes_config).close(), repeat)
+
+        if not ({"resize", "encode"} & set(stages)):
+            continue
+
+        with assets.open_source_image(source_path, sizes_config) as master:
+            for size_conf in sizes_config:
+                plan = assets.plan_image_variant(master.width, master.height, size_conf)
+                target = plan['resize'] or master.size
+
+                def resize():
+                    img = master.resize(target, Image.Resampling.LANCZOS) if target != master.size else master
+                    return img.crop(plan['crop']) if plan['crop'] else img
+
+                if "resize" in stages:
+                    measure(results, f"resize/{size_conf['id']}/{resolution_key}", resize, repeat)
+
+                if "encode" in stages:
+                    img = resize()
+                    for fmt in assets.get_image_formats(size_conf):
+                        quality = assets.get_image_quality(size_conf, fmt)
+                        measure(results, f"encode/{size_conf['id']}/{fmt}/{resolution_key}", lambda: {"bytes": len(assets.encode_image(img, fmt, quality))}, repeat)
+
+def get_output_bytes(root):
+    data_dir = root / "data" / assets.YEAR
+    return {"bytes": sum(path.stat().st_size for name in ["images", "mp3"] for path in (data_dir / name).glob("*") if path.is_file())}
+
+def run_assets(root, *arguments):
+    # assets.py main() with its command line, returns the bytes of the generated files
+    sys.argv = ["assets.py", *arguments]
+    try:
+        assets.main()
+    except SystemExit as e:
+        if e.code:
+            raise RuntimeError(f"assets.py {' '.join(arguments)} exited with code {e.code}")
+    return get_output_bytes(root)
+
+def bench_end_to_end(results, root, local_data, jobs, repeat):
+    print("End to end:")
+    reset = functools.partial(reset_sandbox, root, local_data)
+    image_arguments = ["--image", "--jobs", str(jobs)]
+
+    measure(results, "e2e/image", functools.partial(run_assets, root, *image_arguments), repeat, reset)
+    # Incremental run: every variant is up to date, the sources come from the download cache
+    measure(results, "e2e/image-up-to-date", functools.partial(run_assets, root, *image_arguments), repeat)
+    measure(results, "e2e/mp3", functools.partial(run_assets, root, "--mp3"), repeat, reset)
+    measure(results, "e2e/yt-to-mp3", functools.partial(run_assets, root, "--yt-to-mp3"), repeat, reset)
+
+def bench_icons(results, sandbox, repeat):
+    print("Icons:")
+    import icon
+    if icon.Tree is None:
+        print("  Skipped: cairosvg is not installed.")
+        return
+
+    dest_dir = sandbox / "icons"
+    dest_dir.mkdir(exist_ok=True)
+    theme_color, _ = icon.load_config_colors(PROJECT_ROOT)
+    # Every icon of the set, rendered again (no up-to-date check, no renderings kept between the runs)
+    measure(results, "icon/all", lambda: icon.generate_icons(ICON_SVG, dest_dir, theme_color, force=True), repeat)
+
+def bench_screenshots(results, repeat):
+    # Only the capture post-processing of generate_screenshots.py: a fake page returns a synthetic
+    # viewport sized PNG where the browser would, encoded to WebP on the encoder pool, then saved
+    print("Screenshots:")
+    if not importlib.util.find_spec("playwright"):
+        print("  Skipped: playwright is not installed.")
+        return
+
+    import generate_screenshots
+    png = io.BytesIO()
+    make_source_image(generate_screenshots.VIEWPORT["width"], generate_screenshots.VIEWPORT["height"], seed=0).save(png, "PNG")
+
+    class FakePage:
+        def screenshot(self, type="png"):
+            return png.getvalue()
+
+    def capture():
+        captures = []
+        with ThreadPoolExecutor(max_workers=generate_screenshots.ENCODERS) as encoder:
+            generate_screenshots._encoder["pool"] = encoder
+            for _ in range(SCREENSHOTS_COUNT):
+                generate_screenshots.take_screenshot(FakePage(), "benchmark", captures)
+            for seq, screenshot in enumerate(captures):
+                generate_screenshots.save_screenshot(screenshot, "fr", seq, {}, None)
+        generate_screenshots._encoder["pool"] = None
+
+    os.makedirs(generate_screenshots.OUTPUT_DIR, exist_ok=True)
+    measure(results, f"screenshot/capture-{SCREENSHOTS_COUNT}", capture, repeat)
+    shutil.rmtree(generate_screenshots.OUTPUT_DIR)
+
+def compare_results(results, meta, baseline, threshold):
+    # Returns the regressions: slower than the baseline by more than threshold (and NOISE_FLOOR)
+    regressions = []
+    print(f"Comparison with the baseline ({baseline['meta'].get('date', 'unknown date')}):")
+    for key in ["python", "pillow", "platform", "cpu_count", "latency_ms", "items", "resolutions", "tool_version"]:
+        if baseline['meta'].get(key) != meta.get(key):
+            print(f"  Note: {key} differs ({baseline['meta'].get(key)} -> {meta.get(key)})")
+
+    for key, result in results.items():
+        reference = baseline['results'].get(key)
+        if not reference:
+            print(f"  {key:<48} {result['seconds']:>9.3f} s   (new)")
+            continue
+
+        ratio = result['seconds'] / reference['seconds'] if reference['seconds'] else 1
+        regressed = ratio > 1 + threshold and result['seconds'] - reference['seconds'] > NOISE_FLOOR
+        if regressed:
+            regressions.append(key)
+        print(f"  {key:<48} {reference['seconds']:>9.3f} s -> {result['seconds']:>9.3f} s   {(ratio - 1) * 100:>+7.1f}%{'   REGRESSION' if regressed else ''}")
+
+    missing = baseline['results'].keys() - results.keys()
+    if missing:
+        print(f"  {len(missing)} baseline results not measured in this run")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark of the asset pipeline (assets.py, icon.py, generate_screenshots.py)")
+    parser.add_argument("--stages",    nargs="+", choices=STAGES, default=STAGES,            help="Stages to run")
+    parser.add_argument("--quick",     action="store_true",                                  help=f"Only {', '.join(map(get_resolution_key, QUICK_RESOLUTIONS))} and a single run")
+    parser.add_argument("--repeat",    type=int, default=REPEAT,                             help="Runs per measure (the median is kept)")
+    parser.add_argument("--latency",   type=float, default=LATENCY,                          help="Latency of the local origin and of the fake extractor, in milliseconds")
+    parser.add_argument("--jobs",      type=int, default=0,                                  help="--jobs of the end to end image runs (0 = one per CPU core)")
+    parser.add_argument("--output",    default=RESULTS_PATH,                                 help="Results file (JSON)")
+    parser.add_argument("--baseline",  default=BASELINE_PATH,                                help="Baseline results to compare with")
+    parser.add_argument("--save-baseline", action="store_true",                              help="Store the results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,                        help="Slowdown ratio reported as a regression (0.2 = 20%% slower)")
+    parser.add_argument("--verbose",   action="store_true",                                  help="Show the pipeline logs")
+
+    args = parser.parse_args()
+
+    resolutions = QUICK_RESOLUTIONS if args.quick else RESOLUTIONS
+    repeat = 1 if args.quick else max(1, args.repeat)
+    output_path = Path(args.output).resolve()
+    baseline_path = Path(args.baseline).resolve()
+    cwd = os.getcwd()
+    _options["verbose"] = args.verbose
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="tinals-benchmark-") as tmp:
+        sandbox = Path(tmp)
+        server, base_url = start_origin(sandbox / "origin", args.latency / 1000)
+        FakeYoutubeDL.latency = args.latency / 1000
+        assets.REMOTE_DATA_SOURCE = f"{base_url}/data.json"
+        assets.YT_DLP_CLASS = f"{__name__}:FakeYoutubeDL"
+
+        try:
+            root, local_data, sources = create_sandbox(sandbox, base_url, resolutions, ITEMS_COUNT)
+            os.chdir(root / "tools")
+            reset_sandbox(root, local_data)
+            sizes_config = [assets.get_effective_size_config(size_conf) for size_conf in assets.get_image_sizes_config()]
+
+            if "download" in args.stages:
+                bench_download(results, base_url, sources, repeat)
+            if {"decode", "resize", "encode"} & set(args.stages):
+                bench_images(results, sandbox / "origin", sources, sizes_config, args.stages, repeat)
+            if "e2e" in args.stages:
+                bench_end_to_end(results, root, local_data, args.jobs, repeat)
+            if "icon" in args.stages:
+                bench_icons(results, sandbox, repeat)
+            if "screenshot" in args.stages:
+                bench_screenshots(results, repeat)
+        finally:
+            os.chdir(cwd)
+            server.shutdown()
+
+    report = {
+        "meta": {
+            "date":         datetime.now().isoformat(timespec="seconds"),
+            "python":       platform.python_version(),
+            "pillow":       PIL.__version__,
+            "platform":     platform.platform(),
+            "cpu_count":    os.cpu_count(),
+            "repeat":       repeat,
+            "latency_ms":   args.latency,
+            "items":        ITEMS_COUNT,
+            "resolutions":  [get_resolution_key(resolution) for resolution in resolutions],
+            "tool_version": assets.TOOL_VERSION,
+        },
+        "results": results,
+    }
+    output_path.write_text(json.dumps(report, indent=4), encoding="utf-8")
+    print(f"Results saved to {output_path}")
+
+    if args.save_baseline:
+        shutil.copyfile(output_path, baseline_path)
+        print(f"Baseline saved to {baseline_path}")
+        return
+
+    if not baseline_path.exists():
+        print(f"No baseline at {baseline_path} (run with --save-baseline to record one).")
+        return
+
+    regressions = compare_results(results, report['meta'], json.loads(baseline_path.read_text(encoding="utf-8")), args.threshold)
+    if regressions:
+        print(f"{len(regressions)} regression(s) above {args.threshold * 100:.0f}%: {', '.join(regressions)}")
+        sys.exit(1)
+    print("No regression.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+import argparse
+import functools
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from datetime import datetime
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlparse
+
+from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
+
+from build_critical_css import CPU_SLOWDOWN, NETWORK_PROFILE, USER_AGENT
+from build_dist import DIST_DIR
+from generate_screenshots import VIEWPORT
+
+# Cold-load benchmark of the player: what a first visit costs on a phone (bytes, requests, time to
+# #home, first video card, largest contentful paint, service worker install), median of N runs
+
+# Configuration
+RUNS           = 5
+RESULTS_PATH   = "benchmark-load-results.json"
+LOAD_TIMEOUT   = 60000 # ms
+SW_TIMEOUT     = 60000 # ms, the service worker install downloads the whole critical set
+CHUNK_SIZE     = 16 * 1024 # bytes sent at once on the throttled link
+
+# Medians above these fail the run (slow 4G profile; milliseconds and bytes)
+BUDGETS = {
+    "home_visible":     5000,
+    "first_card_paint": 6000,
+    "lcp":              6000,
+    "sw_install":       20000,
+    "requests":         60,
+    "bytes":            2 * 1024 * 1024,
+}
+
+# Third-party hosts are never fetched: YouTube gets a stub of its iframe API, the others
+# (Google Fonts) an empty response
+YOUTUBE_HOSTS = ("youtube.com", "youtube-nocookie.com", "ytimg.com", "googlevideo.com")
+YOUTUBE_STUB  = """window.YT = {
+    PlayerState: { UNSTARTED: -1, ENDED: 0, PLAYING: 1, PAUSED: 2, BUFFERING: 3, CUED: 5 },
+    Player: function( id, options ) {
+        // Every method is a no-op returning 0, onReady is called as the real player does
+        const player = new Proxy( {}, { get: ( target, name ) => ( name === 'then' )  ?  undefined  :  () => 0 } );
+        setTimeout( () => options && options.events && options.events.onReady && options.events.onReady( { target: player } ) );
+        return player;
+    }
+};"""
+STUB_TYPES = {"stylesheet": "text/css", "script": "application/javascript", "font": "font/woff2"}
+
+# Installed before the page scripts: the marks the navigation and paint timings do not give
+MARKS_JS = """(() => {
+    const marks = window.__benchmark = {};
+    performance.setResourceTimingBufferSize( 1000 );
+
+    new PerformanceObserver( ( list ) => {
+        const entries = list.getEntries();
+        marks.lcp = entries[ entries.length - 1 ].startTime;
+    } ).observe( { type: 'largest-contentful-paint', buffered: true } );
+
+    if( 'serviceWorker' in navigator ) {
+        const register = navigator.serviceWorker.register.bind( navigator.serviceWorker );
+        navigator.serviceWorker.register = ( ...args ) => {
+            marks.swRegister = performance.now();
+            return register( ...args );
+        };
+        navigator.serviceWorker.ready.then( () => { marks.swReady = performance.now(); } );
+    }
+
+    // Checked before every frame: an element found here is painted in that frame
+    const isShown = ( el ) => {
+        if( !el ) return false;
+        const r = el.getBoundingClientRect();
+        return r.width > 0 && r.height > 0 && getComputedStyle( el ).visibility !== 'hidden';
+    };
+    const check = ( now ) => {
+        if( !marks.home && isShown( document.getElementById( 'home' ) ) ) marks.home = now;
+        if( !marks.firstCard && isShown( document.querySelector( '.video-card' ) ) ) marks.firstCard = now;
+        if( !marks.home || !marks.firstCard ) requestAnimationFrame( check );
+    };
+    requestAnimationFrame( check );
+})();"""
+
+COLLECT_JS = """() => {
+    const marks     = window.__benchmark;
+    const nav       = performance.getEntriesByType( 'navigation' )[0];
+    const resources = performance.getEntriesByType( 'resource' );
+    const local     = resources.filter( r => new URL( r.name ).origin === location.origin );
+    const fcp       = performance.getEntriesByName( 'first-contentful-paint' )[0];
+    return {
+        ttfb:               nav.responseStart,
+        dom_content_loaded: nav.domContentLoadedEventEnd,
+        load:               nav.loadEventEnd,
+        fcp:                fcp  ?  fcp.startTime  :  null,
+        lcp:                marks.lcp ?? null,
+        home_visible:       marks.home ?? null,
+        first_card_paint:   marks.firstCard ?? null,
+        sw_install:         ( marks.swReady !== undefined && marks.swRegister !== undefined )  ?  marks.swReady - marks.swRegister  :  null,
+        sw_ready:           marks.swReady ?? null,
+        requests:           1 + local.length,
+        bytes:              nav.transferSize + local.reduce( ( sum, r ) => sum + r.transferSize, 0 ),
+        decoded_bytes:      nav.decodedBodySize + local.reduce( ( sum, r ) => sum + r.decodedBodySize, 0 ),
+        stubbed_requests:   resources.length - local.length,
+    };
+}"""
+
+METRICS = ["ttfb", "fcp", "home_visible", "first_card_paint", "lcp", "dom_content_loaded", "load", "sw_install", "sw_ready", "requests", "bytes", "decoded_bytes", "stubbed_requests"]
+
+def get_project_root():
+    # Assuming script is in tools/
+    return Path(__file__).parent.parent
+
+class ThrottledLink:
+    # One shared link: the parallel responses split its bandwidth, as on a phone
+    def __init__(self, throughput):
+        self.throughput = throughput # bytes per second
+        self.lock = threading.Lock()
+        self.free_at = 0.0
+
+    def send(self, source, output):
+        while chunk := source.read(CHUNK_SIZE):
+            with self.lock:
+                self.free_at = max(time.monotonic(), self.free_at) + len(chunk) / self.throughput
+                done_at = self.free_at
+            time.sleep(max(0.0, done_at - time.monotonic()))
+            output.write(chunk)
+
+class BenchmarkHandler(SimpleHTTPRequestHandler):
+    # Static server with the precompressed .br / .gz copies of build_dist.py, and the latency and
+    # bandwidth of the network profile (the service worker fetches included)
+    link = None
+    latency = 0.0
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        super().do_GET()
+
+    def send_head(self):
+        path = self.translate_path(self.path)
+        accepted = self.headers.get("Accept-Encoding", "")
+        for encoding, suffix in (("br", ".br"), ("gzip", ".gz")):
+            if encoding in accepted and os.path.isfile(path + suffix):
+                f = open(path + suffix, "rb")
+                self.send_response(200)
+                self.send_header("Content-Type", self.guess_type(path))
+                self.send_header("Content-Encoding", encoding)
+                self.send_header("Content-Length", str(os.fstat(f.fileno()).st_size))
+                self.send_header("Vary", "Accept-Encoding")
+                self.end_headers()
+                return f
+        return super().send_head()
+
+    def copyfile(self, source, outputfile):
+        if self.link:
+            self.link.send(source, outputfile)
+        else:
+            super().copyfile(source, outputfile)
+
+    def log_message(self, format, *args):
+        pass
+
+def serve_directory(directory, throttle):
+    handler = type("Handler", (BenchmarkHandler,), {
+        "link": ThrottledLink(NETWORK_PROFILE["downloadThroughput"]) if throttle else None,
+        "latency": NETWORK_PROFILE["latency"] / 1000 if throttle else 0.0,
+    })
+    server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(handler, directory=str(directory)))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+def stub_third_party(route, host):
+    request = route.request
+    request_host = urlparse(request.url).netloc
+    if request_host == host:
+        route.continue_()
+    elif request_host.endswith(YOUTUBE_HOSTS) and urlparse(request.url).path == "/iframe_api":
+        route.fulfill(status=200, content_type="application/javascript", body=YOUTUBE_STUB)
+    else:
+        route.fulfill(status=200, content_type=STUB_TYPES.get(request.resource_type, "text/plain"), body="")
+
+def measure_cold_load(browser, base_url, throttle):
+    # New context: empty HTTP cache, no service worker yet
+    context = browser.new_context(viewport=VIEWPORT, user_agent=USER_AGENT)
+    host = urlparse(base_url).netloc
+    context.route("**/*", lambda route: stub_third_party(route, host))
+    context.add_init_script(MARKS_JS)
+    page = context.new_page()
+    try:
+        if throttle:
+            cdp = context.new_cdp_session(page)
+            cdp.send("Emulation.setCPUThrottlingRate", {"rate": CPU_SLOWDOWN})
+        page.goto(f"{base_url}/", wait_until="load", timeout=LOAD_TIMEOUT)
+        page.wait_for_function("window.__benchmark.home && window.__benchmark.firstCard", timeout=LOAD_TIMEOUT)
+        try:
+            page.wait_for_function("window.__benchmark.swReady !== undefined", timeout=SW_TIMEOUT)
+        except PlaywrightTimeoutError:
+            print("  Service worker not ready in time.")
+        return page.evaluate(COLLECT_JS)
+    finally:
+        context.close()
+
+def summarize(runs):
+    summary = {}
+    for metric in METRICS:
+        values = [run[metric] for run in runs if run.get(metric) is not None]
+        if values:
+            summary[metric] = {"median": statistics.median(values), "min": min(values), "max": max(values)}
+    return summary
+
+def check_budgets(summary, budgets):
+    # Returns the exceeded budgets: {metric: (median, budget)}; a metric never measured fails
+    exceeded = {}
+    for metric, budget in budgets.items():
+        median = summary.get(metric, {}).get("median")
+        if median is None or median > budget:
+            exceeded[metric] = (median, budget)
+    return exceeded
+
+def format_value(metric, value):
+    if value is None:
+        return "-"
+    if metric in ("bytes", "decoded_bytes"):
+        return f"{value / 1024:.1f} KB"
+    if metric in ("requests", "stubbed_requests"):
+        return f"{value:.0f}"
+    return f"{value:.0f} ms"
+
+def print_summary(summary, budgets, exceeded):
+    print(f"  {'metric':<20} {'median':>12} {'min':>12} {'max':>12} {'budget':>12}")
+    for metric in METRICS:
+        values = summary.get(metric, {})
+        budget = budgets.get(metric)
+        print(f"  {metric:<20} " + " ".join(f"{format_value(metric, values.get(key)):>12}" for key in ("median", "min", "max"))
+              + f" {format_value(metric, budget) if budget is not None else '':>12}{'   OVER BUDGET' if metric in exceeded else ''}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-load benchmark of the player in headless Chromium at the mobile viewport (third-party requests stubbed), with budgets.")
+    parser.add_argument("--runs",      type=int, default=RUNS,          help="Cold loads (the median is kept)")
+    parser.add_argument("--dist",      action="store_true",             help=f"Serve the {DIST_DIR}/ build (minified, precompressed) instead of the source tree")
+    parser.add_argument("--no-throttle", action="store_true",           help="No slow 4G network nor CPU slowdown")
+    parser.add_argument("--output",    default=RESULTS_PATH,            help="Results file (JSON)")
+    parser.add_argument("--budgets",   default=None,                    help="JSON file of {metric: maximum median} replacing the default budgets")
+
+    args = parser.parse_args()
+
+    root = get_project_root()
+    directory = root / DIST_DIR if args.dist else root
+    throttle = not args.no_throttle
+    if not (directory / "index.html").exists():
+        print(f"Error: {directory / 'index.html'} not found{', run python build_dist.py first' if args.dist else ''}.")
+        sys.exit(1)
+    budgets = BUDGETS
+    if args.budgets:
+        with open(args.budgets, "r", encoding="utf-8") as f:
+            budgets = json.load(f)
+
+    runs = []
+    server, base_url = serve_directory(directory, throttle)
+    try:
+        with sync_playwright() as p:
+            browser = p.chromium.launch()
+            try:
+                for index in range(max(1, args.runs)):
+                    runs.append(measure_cold_load(browser, base_url, throttle))
+                    print(f"Run {index + 1}: #home {format_value('home_visible', runs[-1]['home_visible'])}, "
+                          f"{format_value('requests', runs[-1]['requests'])} requests, {format_value('bytes', runs[-1]['bytes'])}")
+            finally:
+                browser.close()
+    finally:
+        server.shutdown()
+
+    summary = summarize(runs)
+    exceeded = check_budgets(summary, budgets)
+    report = {
+        "meta": {
+            "date":     datetime.now().isoformat(timespec="seconds"),
+            "tree":     DIST_DIR if args.dist else "source",
+            "runs":     len(runs),
+            "viewport": VIEWPORT,
+            "network":  dict(NETWORK_PROFILE, cpu_slowdown=CPU_SLOWDOWN) if throttle else None,
+        },
+        "budgets": budgets,
+        "summary": summary,
+        "exceeded": {metric: {"median": median, "budget": budget} for metric, (median, budget) in exceeded.items()},
+        "runs": runs,
+    }
+    output_path = Path(args.output).resolve()
+    output_path.write_text(json.dumps(report, indent=4), encoding="utf-8")
+
+    print(f"Cold load of the {'dist/' if args.dist else 'source'} tree, {len(runs)} runs{', slow 4G and CPU x' + str(CPU_SLOWDOWN) if throttle else ''}:")
+    print_summary(summary, budgets, exceeded)
+    print(f"Results saved to {output_path}")
+    if exceeded:
+        print(f"{len(exceeded)} budget(s) exceeded: {', '.join(exceeded)}")
+        sys.exit(1)
+    print("All budgets met.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+import build_data
+import build_dist
+import icon
+import precache
+
+# Configuration
+YEAR            = "2026"
+STATE_FILENAME  = ".build-state.json" # at the project root: the fingerprints of the last successful run of each step
+ICON_SVG        = "tools/tinals-2026-icon-pochette-noire-texte-externe.svg"
+FAVICON_DIR     = "assets/favicon"
+CONFIG_FILE     = "config/config.json"
+DATA_FILE       = f"data/{YEAR}/data.json"
+DEFAULT_TARGETS = ["precache"]
+WATCH_INTERVAL  = 1.0 # seconds between two checks of the inputs in --watch mode
+
+# Kept between the builds of a --watch session
+_fingerprints = {} # path: (size, mtime, sha256), a file is only hashed again when it changed on disk
+_warm = {"config": None, "rasters": {}, "decoded": None} # config.json (sha256, content), icon renderings (see icon.py), decoded image sources (see assets.py, --watch only)
+_watched = {} # step: its inputs, as last listed
+
+def get_project_root():
+    # Assuming script is in tools/
+    return Path(__file__).parent.parent
+
+def fingerprint(root, path):
+    # sha256 of the file content, None when it does not exist
+    try:
+        stat = (root / path).stat()
+    except OSError:
+        _fingerprints.pop(path, None)
+        return None
+    cached = _fingerprints.get(path)
+    if cached and cached[:2] == (stat.st_size, stat.st_mtime_ns):
+        return cached[2]
+    sha256 = hashlib.sha256((root / path).read_bytes()).hexdigest()
+    _fingerprints[path] = (stat.st_size, stat.st_mtime_ns, sha256)
+    return sha256
+
+def get_fingerprints(root, paths):
+    return {path: fingerprint(root, path) for path in sorted(set(paths))}
+
+def has_changed(root, path):
+    # Cheap check of a file already fingerprinted (size and modification time only)
+    cached = _fingerprints.get(path)
+    try:
+        stat = (root / path).stat()
+    except OSError:
+        return cached is not None
+    return not cached or cached[:2] != (stat.st_size, stat.st_mtime_ns)
+
+def get_config(root):
+    # Parsed again only when config.json changed
+    sha256 = fingerprint(root, CONFIG_FILE)
+    if not _warm["config"] or _warm["config"][0] != sha256:
+        with open(root / CONFIG_FILE, "r", encoding="utf-8") as f:
+            _warm["config"] = (sha256, json.load(f))
+    return _warm["config"][1]
+
+# Steps: the files they read (their own script included) and write, relative to the project root
+
+def get_images_inputs(root):
+    return ["tools/assets.py", CONFIG_FILE, DATA_FILE]
+
+def get_images_outputs(root):
+    return [DATA_FILE]
+
+def run_images(root, jobs):
+    # Network stage (sources downloaded from data_source): run as its own process, from tools/
+    if _warm["decoded"] is None:
+        subprocess.run([sys.executable, "assets.py", "--image", "--jobs", str(jobs)], cwd=root / "tools", check=True)
+        return
+    # --watch: in this process (already in tools/, see main), the decoded sources are kept between the builds
+    import assets
+    assets.configure_decoded_cache(_warm["decoded"])
+    try:
+        assets.main(["--image", "--jobs", str(jobs)])
+    except SystemExit as e:
+        if e.code:
+            raise RuntimeError(f"assets.py --image failed (exit code {e.code})")
+
+def get_icons_inputs(root):
+    return ["tools/icon.py", ICON_SVG, CONFIG_FILE]
+
+def get_icons_outputs(root):
+    return [f"{FAVICON_DIR}/{icon_def['name']}" for icon_def in icon.ICONS_CONFIG]
+
+def run_icons(root, jobs):
+    # Straight into assets/favicon: the names referenced by index.html, manifest.json and app.js are
+    # fixed, only the files change (icon.py --update rewrites those references for a new set)
+    site = get_config(root).get("site", {})
+    icon.generate_icons(root / ICON_SVG, root / FAVICON_DIR, site.get("theme_color", icon.THEME_COLOR), jobs, rasters=_warm["rasters"])
+
+def get_data_inputs(root):
+    return ["tools/build_data.py", DATA_FILE]
+
+def get_data_outputs(root):
+    data_dir = f"data/{YEAR}"
+    filenames = [build_data.RUNTIME_FILENAME] + [build_data.DESCRIPTIONS_FILE.format(lang=lang) for lang in build_data.LANGUAGES]
+    return [f"{data_dir}/{name}{suffix}" for name in filenames for suffix in [""] + [f".{encoding}" for encoding in build_data.get_sidecar_encodings()]]
+
+def run_data(root, jobs):
+    build_data.write_outputs(root)
+
+def get_precache_inputs(root):
+    # Every precached file, read again after the steps above (new images, new icons)
+    return ["tools/precache.py", CONFIG_FILE, DATA_FILE, "index.html"] + precache.CRITICAL_ASSETS + precache.get_media_assets(root)
+
+def get_precache_outputs(root):
+    return [precache.MANIFEST_FILENAME]
+
+def run_precache(root, jobs):
+    precache.write_precache_manifest(root)
+
+def get_dist_inputs(root):
+    return ["tools/build_dist.py"] + [path.as_posix() for path in build_dist.get_dist_files(root)]
+
+def get_dist_outputs(root):
+    # dist/index.html and dist/precache-manifest.js are left to the critical-css step, which rewrites them
+    dist = root / build_dist.DIST_DIR
+    inlined = set(get_critical_css_outputs(root))
+    return [path.relative_to(root).as_posix() for path in dist.rglob("*") if path.is_file() and path.relative_to(root).as_posix() not in inlined] if dist.exists() else []
+
+def run_dist(root, jobs):
+    index_path = root / build_dist.DIST_DIR / "index.html"
+    inlined = index_path.exists() and 'id="critical-css"' in index_path.read_text(encoding="utf-8")
+    build_dist.build_dist(root, root / build_dist.DIST_DIR)
+    if inlined:
+        print(f"Warning: {build_dist.DIST_DIR}/index.html rebuilt without its critical CSS, build the critical-css step to inline it again.")
+
+def get_critical_css_inputs(root):
+    # The rendered first screen depends on every deployed file (markup, styles, scripts, data)
+    return ["tools/build_critical_css.py"] + get_dist_inputs(root)
+
+def get_critical_css_outputs(root):
+    # The inlined page, and the precache manifest listing its revision
+    suffixes = [""] + [f".{encoding}" for encoding in build_data.get_sidecar_encodings()]
+    return [f"{build_dist.DIST_DIR}/{name}{suffix}" for name in ["index.html", precache.MANIFEST_FILENAME] for suffix in suffixes]
+
+def run_critical_css(root, jobs):
+    # Imported here: Playwright (and its Chromium) is only needed by this step
+    import build_critical_css
+    build_critical_css.build_critical_css(root, root / build_dist.DIST_DIR)
+
+# deps: built with the step, before it (a failure skips it), after: run before it only when also built
+# Nothing depends on images (network), icons (cairosvg), dist and critical-css (Playwright): they only run when given as targets
+STEPS = {
+    "images":       {"inputs": get_images_inputs,       "outputs": get_images_outputs,       "run": run_images,       "deps": [],           "after": []},
+    "icons":        {"inputs": get_icons_inputs,        "outputs": get_icons_outputs,        "run": run_icons,        "deps": [],           "after": []},
+    "data":         {"inputs": get_data_inputs,         "outputs": get_data_outputs,         "run": run_data,         "deps": [],           "after": ["images"]},
+    "precache":     {"inputs": get_precache_inputs,     "outputs": get_precache_outputs,     "run": run_precache,     "deps": ["data"],     "after": ["images", "icons"]},
+    "dist":         {"inputs": get_dist_inputs,         "outputs": get_dist_outputs,         "run": run_dist,         "deps": ["precache"], "after": []},
+    "critical-css": {"inputs": get_critical_css_inputs, "outputs": get_critical_css_outputs, "run": run_critical_css, "deps": ["dist"],     "after": []},
+}
+
+def select_steps(targets):
+    # The targets and the steps they depend on
+    selected = set()
+    def add(name):
+        if name not in selected:
+            selected.add(name)
+            for dep in STEPS[name]["deps"]:
+                add(dep)
+    for target in targets:
+        add(target)
+    return [name for name in STEPS if name in selected]
+
+def load_state(root):
+    try:
+        with open(root / STATE_FILENAME, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+def save_state(root, state):
+    with open(root / f"{STATE_FILENAME}.tmp", "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=4, sort_keys=True)
+    os.replace(root / f"{STATE_FILENAME}.tmp", root / STATE_FILENAME)
+
+def is_step_up_to_date(root, step, entry, inputs):
+    if not entry or entry.get("inputs") != inputs:
+        return False
+    # Outputs deleted or edited by hand since the last run
+    outputs = get_fingerprints(root, step["outputs"](root))
+    return all(outputs.values()) and outputs == entry.get("outputs")
+
+def run_step(root, name, state, jobs, force):
+    step = STEPS[name]
+    start = time.perf_counter()
+    try:
+        inputs = get_fingerprints(root, step["inputs"](root))
+        if not force and is_step_up_to_date(root, step, state.get(name), inputs):
+            print(f"[{name}] up to date")
+            return "up to date"
+        print(f"[{name}] building...")
+        step["run"](root, jobs)
+        # Fingerprinted after the run: a step may update its own inputs (assets.py writes data.json)
+        state[name] = {
+            "inputs": get_fingerprints(root, step["inputs"](root)),
+            "outputs": get_fingerprints(root, step["outputs"](root)),
+        }
+    except Exception as e:
+        print(f"[{name}] failed: {e}")
+        state.pop(name, None)
+        return "failed"
+    print(f"[{name}] built in {time.perf_counter() - start:.1f}s")
+    return "built"
+
+def build(root, targets, state, jobs, force=False):
+    # Each step starts as soon as the steps before it are done, independent steps run in parallel
+    steps = select_steps(targets)
+    results = {}
+    pending = list(steps)
+    running = {}
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        while pending or running:
+            ready = []
+            for name in list(pending):
+                step = STEPS[name]
+                if any(dep in steps and dep not in results for dep in step["deps"] + step["after"]):
+                    continue
+                pending.remove(name)
+                if any(results[dep] in ("failed", "skipped") for dep in step["deps"]):
+                    print(f"[{name}] skipped (a step it depends on failed)")
+                    results[name] = "skipped"
+                    continue
+                ready.append(name)
+            # The workers are shared between the steps running at the same time (not jobs each)
+            share = max(1, jobs // (len(running) + len(ready))) if ready else jobs
+            for name in ready:
+                running[executor.submit(run_step, root, name, state, share, force)] = name
+            if running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    results[running.pop(future)] = future.result()
+                save_state(root, state)
+    return results
+
+def print_results(results, elapsed):
+    print(f"Build done in {elapsed:.1f}s: " + ", ".join(f"{name} {result}" for name, result in results.items()))
+
+def get_watched_inputs(root, targets):
+    # The current inputs of every selected step, built or not: fixing the input of a failed step rebuilds it
+    watched = set()
+    for name in select_steps(targets):
+        try:
+            _watched[name] = STEPS[name]["inputs"](root)
+        except Exception:
+            pass # listed from a file being edited (data.json): the previous list until it is valid again
+        watched.update(_watched.get(name, []))
+    return sorted(watched)
+
+def watch(root, targets, state, jobs):
+    # Polls the inputs of the selected steps (their fingerprints stay in memory) and rebuilds the
+    # steps whose inputs changed, the others are up to date
+    print(f"Watching the inputs of {', '.join(select_steps(targets))} (Ctrl+C to stop)...")
+    get_fingerprints(root, get_watched_inputs(root, targets))
+    while True:
+        time.sleep(WATCH_INTERVAL)
+        # Listed again at each check: the inputs of a step can change (new images, new files in dist)
+        watched = get_watched_inputs(root, targets)
+        changed = [path for path in watched if has_changed(root, path)]
+        get_fingerprints(root, changed)
+        if not changed:
+            continue
+        print(f"Changed: {', '.join(changed[:5])}{f' and {len(changed) - 5} more' if len(changed) > 5 else ''}")
+        start = time.perf_counter()
+        print_results(build(root, targets, state, jobs), time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the generated files of the project (icons, runtime data, precache manifest...), skipping the steps whose inputs did not change.")
+    parser.add_argument("targets", nargs="*", default=DEFAULT_TARGETS, help=f"Steps to build with the steps they depend on: {', '.join(STEPS)} (default: {' '.join(DEFAULT_TARGETS)}; images, icons, dist and critical-css only run when given)")
+    parser.add_argument("--jobs", type=int, default=0, help="Number of workers, shared between the steps running at the same time (0 = one per CPU core)")
+    parser.add_argument("--force", action="store_true", help="Run the steps even if they are up to date (e.g. the remote data of the images step changed)")
+    parser.add_argument("--watch", action="store_true", help="After the build, rebuild the affected steps whenever one of their inputs changes")
+
+    args = parser.parse_args()
+
+    unknown = [target for target in args.targets if target not in STEPS]
+    if unknown:
+        print(f"Error: unknown step {', '.join(unknown)} (steps: {', '.join(STEPS)})")
+        sys.exit(1)
+
+    root = get_project_root().resolve()
+    jobs = args.jobs or os.cpu_count() or 1
+    state = load_state(root)
+    if args.watch:
+        # The images step runs in this process to keep its decoded sources: from tools/, like assets.py
+        _warm["decoded"] = {}
+        os.chdir(root / "tools")
+
+    start = time.perf_counter()
+    results = build(root, args.targets, state, jobs, args.force)
+    print_results(results, time.perf_counter() - start)
+
+    if args.watch:
+        try:
+            watch(root, args.targets, state, jobs)
+        except KeyboardInterrupt:
+            print("Stopped.")
+    elif "failed" in results.values():
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+import argparse
+import functools
+import re
+import statistics
+import sys
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlparse
+
+from playwright.sync_api import sync_playwright
+
+import precache
+from build_data import compress, get_sidecar_encodings, write_if_changed
+from build_dist import DIST_DIR, get_project_root, minify_css, minify_html, minify_js
+from generate_screenshots import VIEWPORT
+
+# Configuration
+STYLESHEET      = "assets/css/style.css"
+USER_AGENT      = "Mozilla/5.0 (iPhone; CPU iPhone OS 14_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.0 Mobile/15E148 Safari/604.1"
+LOAD_TIMEOUT    = 30000 # ms
+MEASURE_RUNS    = 5 # cold loads per variant, the median first paint is reported
+
+# Cold mobile load (close to the Lighthouse mobile profile): slow 4G and a 4x slower CPU
+NETWORK_PROFILE = {"offline": False, "latency": 150, "downloadThroughput": 1.6 * 1024 * 1024 / 8, "uploadThroughput": 750 * 1024 / 8}
+CPU_SLOWDOWN    = 4
+
+# Rules matching an element outside of the first screen are still needed when they hide or move
+# it: without them, the closed drawers and modals would be displayed until the stylesheet loads
+LAYOUT_PROPERTIES = ["display", "visibility", "position", "transform", "opacity", "top", "right", "bottom", "left", "inset", "z-index", "overflow"]
+
+# Runs in the page: the rules of the stylesheet needed by the elements displayed on the first
+# screen (the loader, then #home), or by the first video card (the next screen)
+COLLECT_RULES_JS = """([stylesheet, layoutProperties]) => {
+    const sheet = [ ...document.styleSheets ].find( s => s.href && s.href.includes( stylesheet ) );
+    if( !sheet ) return null;
+
+    const firstCard = document.querySelector( '.video-card' );
+    const isCritical = ( el ) => {
+        if( firstCard && firstCard.contains( el ) ) return true;
+        const r = el.getBoundingClientRect();
+        return ( r.width > 0 || r.height > 0 ) && r.bottom > 0 && r.top < innerHeight && r.right > 0 && r.left < innerWidth;
+    };
+
+    // User action states and pseudo-elements are ignored for the matching (".a:hover::after" is needed if ".a" is)
+    const dynamic = '::?(hover|focus-visible|focus-within|focus|active|visited|before|after|placeholder|selection|first-line|first-letter|marker|-webkit-[\\w-]+|-moz-[\\w-]+)(?![\\w-])(\\([^)]*\\))?';
+    const getStaticSelector = ( selector ) => selector
+        .replace( new RegExp( '(^|[\\s>+~,])' + dynamic, 'g' ), '$1*' ) // ":hover" alone: "*:hover"
+        .replace( new RegExp( dynamic, 'g' ), '' );
+    const isNeeded = ( rule ) => {
+        let elements;
+        try {
+            elements = [ ...document.querySelectorAll( getStaticSelector( rule.selectorText ) ) ];
+        } catch( e ) {
+            return false;
+        }
+        if( elements.some( isCritical ) ) return true;
+        return elements.length > 0 && layoutProperties.some( p => rule.style.getPropertyValue( p ) !== '' );
+    };
+
+    // [rule index, nested rule index or null, CSS text]; @media / @supports blocks are walked one level down
+    const needed = [];
+    const keyframes = {};
+    [ ...sheet.cssRules ].forEach( ( rule, index ) => {
+        if( rule instanceof CSSStyleRule ) {
+            if( isNeeded( rule ) ) needed.push( [ index, null, rule.cssText ] );
+        } else if( rule instanceof CSSKeyframesRule ) {
+            keyframes[ rule.name ] = [ index, null, rule.cssText ];
+        } else if( rule instanceof CSSFontFaceRule || rule instanceof CSSImportRule ) {
+            needed.push( [ index, null, rule.cssText ] );
+        } else if( rule.cssRules ) {
+            [ ...rule.cssRules ].forEach( ( nested, nestedIndex ) => {
+                if( nested instanceof CSSStyleRule && isNeeded( nested ) ) {
+                    needed.push( [ index, nestedIndex, nested.cssText, rule.cssText.slice( 0, rule.cssText.indexOf( '{' ) ).trim() ] );
+                }
+            } );
+        }
+    } );
+    return { needed, keyframes };
+}"""
+
+def serve_directory(directory):
+    # Local static server on a free port (the built tree, not the sources)
+    class QuietHandler(SimpleHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(QuietHandler, directory=str(directory)))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+def new_page(browser, base_url, throttle=False):
+    # Cold load: new context (empty HTTP cache), no service worker, third-party requests (YouTube,
+    # Google Fonts) aborted so that only the local files are timed
+    context = browser.new_context(viewport=VIEWPORT, user_agent=USER_AGENT, service_workers="block")
+    host = urlparse(base_url).netloc
+    context.route("**/*", lambda route: route.continue_() if urlparse(route.request.url).netloc == host else route.abort())
+    page = context.new_page()
+    if throttle:
+        cdp = context.new_cdp_session(page)
+        cdp.send("Network.enable")
+        cdp.send("Network.emulateNetworkConditions", NETWORK_PROFILE)
+        cdp.send("Emulation.setCPUThrottlingRate", {"rate": CPU_SLOWDOWN})
+    return context, page
+
+def collect_critical_rules(browser, base_url):
+    context, page = new_page(browser, base_url)
+    try:
+        needed = {}
+        page.goto(f"{base_url}/", wait_until="domcontentloaded", timeout=LOAD_TIMEOUT)
+        page.wait_for_load_state("load", timeout=LOAD_TIMEOUT)
+        # First paint: the loader
+        first = page.evaluate(COLLECT_RULES_JS, [STYLESHEET, LAYOUT_PROPERTIES])
+        if first is None:
+            raise RuntimeError(f"{STYLESHEET} is not loaded by index.html")
+
+        # Then the home and the first video card, once the data is rendered
+        page.wait_for_selector("#home", state="visible", timeout=LOAD_TIMEOUT)
+        page.wait_for_selector(".video-card", state="attached", timeout=LOAD_TIMEOUT)
+        second = page.evaluate(COLLECT_RULES_JS, [STYLESHEET, LAYOUT_PROPERTIES])
+
+        for entry in first["needed"] + second["needed"]:
+            needed[(entry[0], -1 if entry[1] is None else entry[1])] = entry
+        return [needed[key] for key in sorted(needed)], second["keyframes"]
+    finally:
+        context.close()
+
+def render_critical_css(rules, keyframes):
+    # Stylesheet order, the nested rules grouped again under their @media / @supports
+    parts = []
+    group = None
+    for entry in rules:
+        index, nested, css = entry[:3]
+        if nested is None:
+            if group is not None:
+                parts.append("}")
+                group = None
+            parts.append(css)
+            continue
+        if group != index:
+            if group is not None:
+                parts.append("}")
+            parts.append(entry[3] + "{")
+            group = index
+        parts.append(css)
+    if group is not None:
+        parts.append("}")
+
+    css = "\n".join(parts)
+    # Only the animations used by these rules
+    used = [frames for name, frames in keyframes.items() if re.search(rf"\b{re.escape(name)}\b", css)]
+    return minify_css("\n".join([css] + [frames[2] for frames in used]))
+
+def inline_critical_css(html, critical_css):
+    # The critical rules inline, the whole stylesheet loaded without blocking the rendering
+    link = re.search(rf'<link[^>]*href="({re.escape(STYLESHEET)}[^"]*)"[^>]*>', html)
+    if not link:
+        raise RuntimeError(f"No <link> to {STYLESHEET} in index.html")
+    href = link.group(1)
+    replacement = (
+        f'<style id="critical-css">{critical_css}</style>\n'
+        f'<link rel="preload" href="{href}" as="style" onload="this.onload=null;this.rel=\'stylesheet\'" />\n'
+        f'<noscript><link rel="stylesheet" href="{href}" /></noscript>'
+    )
+    return html[:link.start()] + replacement + html[link.end():]
+
+def write_with_sidecars(path, content):
+    changed = write_if_changed(path, content)
+    for encoding in get_sidecar_encodings():
+        changed = write_if_changed(path.with_name(f"{path.name}.{encoding}"), compress(content, encoding)) or changed
+    return changed
+
+def update_precache_manifest(dist):
+    # The precached index.html is the inlined one: its revision follows the critical CSS, not only
+    # the source page
+    path = dist / precache.MANIFEST_FILENAME
+    manifest = precache.parse_precache_manifest(path.read_text(encoding="utf-8"))
+    precache.update_entries(manifest, dist, ["index.html"])
+    write_with_sidecars(path, minify_js(precache.render_precache_manifest(manifest)).encode("utf-8"))
+
+def measure_first_paint(browser, base_url, runs):
+    timings = []
+    for _ in range(runs):
+        context, page = new_page(browser, base_url, throttle=True)
+        try:
+            page.goto(f"{base_url}/", wait_until="commit", timeout=LOAD_TIMEOUT)
+            page.wait_for_function("performance.getEntriesByName( 'first-contentful-paint' ).length > 0", timeout=LOAD_TIMEOUT)
+            timings.append(page.evaluate("performance.getEntriesByName( 'first-contentful-paint' )[0].startTime"))
+        finally:
+            context.close()
+    return statistics.median(timings)
+
+def build_critical_css(root, dist, runs=0):
+    # Returns the number of critical rules, the critical CSS and the median first paints before
+    # and after (None when runs is 0)
+    index_path = dist / "index.html"
+    if not (dist / STYLESHEET).exists():
+        raise RuntimeError(f"{dist / STYLESHEET} not found, run 'python build_dist.py' first")
+
+    # Always from the source page: a rerun does not extract from an already inlined page
+    original = minify_html((root / "index.html").read_text(encoding="utf-8"))
+
+    server, base_url = serve_directory(dist)
+    try:
+        with sync_playwright() as p:
+            browser = p.chromium.launch()
+            try:
+                write_with_sidecars(index_path, original.encode("utf-8"))
+                rules, keyframes = collect_critical_rules(browser, base_url)
+                critical_css = render_critical_css(rules, keyframes)
+                before = measure_first_paint(browser, base_url, runs) if runs > 0 else None
+
+                html = inline_critical_css(original, critical_css)
+                write_with_sidecars(index_path, html.encode("utf-8"))
+                update_precache_manifest(dist)
+                after = measure_first_paint(browser, base_url, runs) if runs > 0 else None
+            finally:
+                browser.close()
+    finally:
+        server.shutdown()
+    return len(rules), critical_css, before, after
+
+def main():
+    parser = argparse.ArgumentParser(description="Inline the critical CSS of the first screen into dist/index.html (the rest of the stylesheet is loaded asynchronously). Run build_dist.py first.")
+    parser.add_argument("--output", default=None, help=f"Built tree (default: {DIST_DIR}/ at the project root)")
+    parser.add_argument("--runs", type=int, default=MEASURE_RUNS, help="Throttled cold loads per variant for the first paint measure (0 to skip it)")
+
+    args = parser.parse_args()
+
+    root = get_project_root()
+    dist = Path(args.output).resolve() if args.output else root / DIST_DIR
+    index_path = dist / "index.html"
+    if not (dist / STYLESHEET).exists():
+        print(f"Error: {dist / STYLESHEET} not found, run 'python build_dist.py' first.")
+        sys.exit(1)
+
+    rules_count, critical_css, before, after = build_critical_css(root, dist, args.runs)
+
+    stylesheet_size = len(minify_css((root / STYLESHEET).read_text(encoding="utf-8")).encode("utf-8"))
+    print(f"Updated {index_path.relative_to(dist.parent)}")
+    print(f"  critical CSS: {rules_count} rules, {len(critical_css.encode('utf-8')) / 1024:.1f} KB inlined ({stylesheet_size / 1024:.1f} KB for the whole {STYLESHEET}, now loaded asynchronously)")
+    if before is not None:
+        print(f"  first contentful paint (median of {args.runs} cold loads, {VIEWPORT['width']}x{VIEWPORT['height']}, slow 4G, CPU x{CPU_SLOWDOWN}):")
+        print(f"    before: {before:>7.0f} ms")
+        print(f"    after:  {after:>7.0f} ms ({after - before:+.0f} ms, {(after - before) / before * 100:+.1f}%)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+import argparse
+import gzip
+import json
+import sys
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:
+    brotli = None # .br sidecars are skipped without it (pip install brotli)
+
+# Configuration
+YEAR              = "2026"
+DATA_FILENAME     = "data.json"
+RUNTIME_FILENAME  = "data.min.json"
+DESCRIPTIONS_FILE = "descriptions.{lang}.json"
+LANGUAGES         = {"fr": ["description"], "en": ["descriptionEN", "description"]} # fields by priority
+
+# Fields read by the player (assets/js/app.js, assets/js/video-manager.js), the others stay in data.json
+RUNTIME_FIELDS = [
+    "id",
+    "event_name", "event_link", "event_ticket", "event_status", "event_session", "event_place", "event_tags",
+    "event_start_date", "event_start_time", "event_end_time",
+    "video_url", "video_title", "video_timestart", "video_zoom",
+    "audio",
+    "image", "image_artist", "image_mobile", "image_thumbnail", "image_x", "image_y", "image_srcset",
+    "image_placeholder", "image_color",
+    "performer_website", "performer_youtube", "performer_facebook", "performer_instagram", "performer_pinterest",
+    "performer_tiktok", "performer_deezer", "performer_spotify", "performer_soundcloud",
+]
+
+# Items skipped by the player (see the validation in app.js) are not shipped
+REQUIRED_FIELDS = ["event_name", "image", "description"]
+
+GZIP_LEVEL   = 9
+BROTLI_LEVEL = 11
+
+def get_project_root():
+    # Assuming script is in tools/
+    return Path(__file__).parent.parent
+
+def get_data_dir(root):
+    return root / "data" / YEAR
+
+def is_valid_item(item):
+    return all(isinstance(item.get(field), str) and item[field].strip() for field in REQUIRED_FIELDS)
+
+def get_description(item, lang):
+    return next((item[field] for field in LANGUAGES[lang] if item.get(field)), "")
+
+def build_outputs(data):
+    # {filename: content}: the runtime payload and one lazily loaded descriptions file per language
+    items = [item for item in data if is_valid_item(item)]
+    for item in data:
+        if not is_valid_item(item):
+            print(f"Warning: {item.get('event_name') or item.get('id')} has no name, image or description, not shipped.")
+
+    runtime = [{field: item[field] for field in RUNTIME_FIELDS if field in item} for item in items]
+    outputs = {RUNTIME_FILENAME: runtime}
+    for lang in LANGUAGES:
+        outputs[DESCRIPTIONS_FILE.format(lang=lang)] = {str(item["id"]): get_description(item, lang) for item in items}
+
+    return {filename: json.dumps(content, ensure_ascii=False, separators=(",", ":")) for filename, content in outputs.items()}
+
+def compress(content, encoding):
+    if encoding == "gz":
+        # mtime=0: the same content always gives the same file
+        return gzip.compress(content, compresslevel=GZIP_LEVEL, mtime=0)
+    return brotli.compress(content, quality=BROTLI_LEVEL)
+
+def get_sidecar_encodings():
+    return ["gz", "br"] if brotli is not None else ["gz"]
+
+def write_if_changed(path, content):
+    if path.exists() and path.read_bytes() == content:
+        return False
+    path.write_bytes(content)
+    return True
+
+def write_outputs(root):
+    data_dir = get_data_dir(root)
+    with open(data_dir / DATA_FILENAME, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    if brotli is None:
+        print("Warning: brotli is not installed (pip install brotli), .br files are not generated.")
+
+    source_size = (data_dir / DATA_FILENAME).stat().st_size
+    print(f"  {DATA_FILENAME:<24} {source_size / 1024:>9.1f} KB")
+
+    for filename, text in build_outputs(data).items():
+        content = text.encode("utf-8")
+        changed = write_if_changed(data_dir / filename, content)
+        sizes = f"{len(content) / 1024:>9.1f} KB"
+        for encoding in get_sidecar_encodings():
+            compressed = compress(content, encoding)
+            changed = write_if_changed(data_dir / f"{filename}.{encoding}", compressed) or changed
+            sizes += f" {len(compressed) / 1024:>9.1f} KB .{encoding}"
+        print(f"  {filename:<24} {sizes}   {'updated' if changed else 'up to date'}")
+
+def check_outputs(root):
+    data_dir = get_data_dir(root)
+    with open(data_dir / DATA_FILENAME, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    outdated = []
+    for filename, text in build_outputs(data).items():
+        path = data_dir / filename
+        if not path.exists() or path.read_text(encoding="utf-8") != text:
+            outdated.append(filename)
+    return outdated
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the runtime data of the player (minified data.json without the descriptions, descriptions by language, .gz/.br sidecars).")
+    parser.add_argument("--check", action="store_true", help="Only check that the runtime data is up to date (exit code 1 if not)")
+
+    args = parser.parse_args()
+
+    root = get_project_root()
+
+    if args.check:
+        outdated = check_outputs(root)
+        if outdated:
+            print(f"{', '.join(outdated)} out of date, run 'python build_data.py'")
+            sys.exit(1)
+        print("Runtime data is up to date")
+        return
+
+    write_outputs(root)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+import argparse
+import json
+import os
+import re
+import shutil
+from pathlib import Path
+
+from build_data import check_outputs, compress, get_sidecar_encodings, write_if_changed
+
+# Configuration
+YEAR     = "2026"
+DIST_DIR = "dist"
+
+# What is deployed (files or directories, relative to the project root)
+DIST_SOURCES = [
+    "index.html",
+    "manifest.json",
+    "service-worker.js",
+    "precache-manifest.js",
+    "humans.txt",
+    "VERSION",
+    "assets",
+    "config",
+    f"data/{YEAR}",
+]
+DIST_EXCLUDE = [
+    "*.gz", "*.br",           # regenerated for every text file
+    "*.journal", "*.tmp",     # tools/assets.py working files
+    "build-manifest.json",
+    "config.local*.json",     # per-deployment configuration
+]
+
+# Text files are minified and get .gz / .br copies, the others are copied as is
+MINIFIERS = {
+    ".css":  "minify_css",
+    ".js":   "minify_js",
+    ".json": "minify_json",
+    ".svg":  "minify_svg",
+    ".html": "minify_html",
+}
+COMPRESSED_EXTENSIONS = {".css", ".js", ".json", ".svg", ".html", ".txt", ".xml", ".ico"}
+MIN_COMPRESS_SIZE     = 1024 # bytes, smaller files are not worth a compressed copy
+
+def get_project_root():
+    # Assuming script is in tools/
+    return Path(__file__).parent.parent
+
+def is_excluded(path):
+    return path.name.startswith(".") or any(path.match(pattern) for pattern in DIST_EXCLUDE)
+
+def get_dist_files(root):
+    files = []
+    for source in DIST_SOURCES:
+        path = root / source
+        if path.is_file():
+            files.append(Path(source))
+        elif path.is_dir():
+            files.extend(
+                file.relative_to(root) for file in sorted(path.rglob("*"))
+                if file.is_file() and not is_excluded(file)
+            )
+        else:
+            print(f"Warning: {source} not found, not deployed.")
+    return files
+
+# Minifiers: whitespace and comments only, never a rewrite of the code itself
+
+CSS_TOKENS = re.compile(r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'|/\*.*?\*/|[^"\'/]+|/', re.S)
+
+def minify_css_code(code):
+    code = re.sub(r"\s+", " ", code)
+    # No space around the block / declaration / selector list separators, nor after ":"
+    # (a space before ":" is a descendant combinator: ".a :hover" is kept)
+    code = re.sub(r" ?([{};,>]) ?", r"\1", code)
+    return re.sub(r": ", ":", code)
+
+def minify_css(text):
+    # The code between two strings is minified as a whole, once its comments are removed
+    parts, code = [], []
+    for token in CSS_TOKENS.findall(text):
+        if token.startswith("/*"):
+            continue
+        if token[0] in "\"'":
+            parts.extend([minify_css_code("".join(code)), token])
+            code = []
+        else:
+            code.append(token)
+    parts.append(minify_css_code("".join(code)))
+    return re.sub(r";}", "}", "".join(parts)).strip()
+
+# After one of these, a "/" starts a regular expression rather than a division
+JS_REGEX_PRECEDERS = set("(,=:[!&|?{};+-*%<>~^")
+JS_REGEX_KEYWORDS  = {"return", "typeof", "case", "else", "in", "of", "void", "delete", "new", "throw", "yield", "await"}
+
+def minify_js(text):
+    # Removes the comments, the indentation and the blank lines, and collapses the other whitespace
+    # runs. Line breaks are kept (automatic semicolon insertion); strings, template literals and
+    # regular expressions are copied verbatim.
+    out = []
+    i, n = 0, len(text)
+    braces = [] # for each open "${" of a template literal, the depth of the braces opened since
+
+    def last_significant():
+        for chunk in reversed(out):
+            stripped = chunk.rstrip()
+            if stripped:
+                return stripped
+        return ""
+
+    def add_space(newline):
+        if not out:
+            return
+        if newline:
+            if out[-1].endswith(" "):
+                out[-1] = out[-1].rstrip(" ")
+            if not out[-1].endswith("\n"):
+                out.append("\n")
+        elif not out[-1].endswith((" ", "\n")):
+            out.append(" ")
+
+    def read_template(i):
+        # From after a "`" (or the "}" closing a substitution) to the closing "`" or the next "${"
+        start = i
+        while i < n:
+            if text[i] == "\\":
+                i += 2
+            elif text[i] == "`":
+                return text[start:i + 1], i + 1, False
+            elif text.startswith("${", i):
+                return text[start:i + 2], i + 2, True
+            else:
+                i += 1
+        raise ValueError("unterminated template literal")
+
+    while i < n:
+        c = text[i]
+        if c in " \t\r\n":
+            j = i
+            while j < n and text[j] in " \t\r\n":
+                j += 1
+            add_space("\n" in text[i:j])
+            i = j
+        elif text.startswith("//", i):
+            j = text.find("\n", i)
+            i = n if j == -1 else j
+        elif text.startswith("/*", i):
+            j = text.find("*/", i + 2)
+            if j == -1:
+                raise ValueError("unterminated comment")
+            # A comment containing a line break counts as one for the semicolon insertion
+            add_space("\n" in text[i:j])
+            i = j + 2
+        elif c in "\"'":
+            j = i + 1
+            while j < n and text[j] != c:
+                if text[j] == "\n":
+                    raise ValueError("unterminated string")
+                j += 2 if text[j] == "\\" else 1
+            out.append(text[i:j + 1])
+            i = j + 1
+        elif c == "`":
+            chunk, i, substitution = read_template(i + 1)
+            out.append("`" + chunk)
+            if substitution:
+                braces.append(0)
+        elif c == "/":
+            previous = last_significant()
+            word = re.search(r"[\w$]+$", previous)
+            if not previous or previous[-1] in JS_REGEX_PRECEDERS or (word and word.group() in JS_REGEX_KEYWORDS):
+                j, in_class = i + 1, False
+                while j < n and (in_class or text[j] != "/"):
+                    if text[j] == "\n":
+                        raise ValueError("unterminated regular expression")
+                    if text[j] == "\\":
+                        j += 1
+                    elif text[j] == "[":
+                        in_class = True
+                    elif text[j] == "]":
+                        in_class = False
+                    j += 1
+                j += 1
+                while j < n and (text[j].isalnum() or text[j] == "_"):
+                    j += 1 # flags
+                out.append(text[i:j])
+                i = j
+            else:
+                out.append(c)
+                i += 1
+        elif c == "{" and braces:
+            braces[-1] += 1
+            out.append(c)
+            i += 1
+        elif c == "}" and braces:
+            if braces[-1] == 0:
+                braces.pop()
+                chunk, i, substitution = read_template(i + 1)
+                out.append("}" + chunk)
+                if substitution:
+                    braces.append(0)
+            else:
+                braces[-1] -= 1
+                out.append(c)
+                i += 1
+        else:
+            j = i
+            while j < n and text[j] not in " \t\r\n\"'`/{}":
+                j += 1
+            out.append(text[i:max(j, i + 1)])
+            i = max(j, i + 1)
+
+    return "".join(out).strip() + "\n"
+
+def minify_json(text):
+    return json.dumps(json.loads(text), ensure_ascii=False, separators=(",", ":"))
+
+def minify_svg(text):
+    text = re.sub(r"<!--.*?-->", "", text, flags=re.S)
+    if "<text" in text:
+        # Whitespace between the tags is displayed by <text>: only collapsed
+        return re.sub(r"\s+", " ", text).strip()
+    return re.sub(r">\s+<", "><", re.sub(r"\s+", " ", text)).strip()
+
+HTML_VERBATIM   = re.compile(r"(<(pre|textarea|script|style)\b.*?</\2>)", re.S | re.I)
+HTML_TAG        = re.compile(r"<[a-zA-Z/][^>]*>")
+HTML_TAG_SPACES = re.compile(r"(\"[^\"]*\"|'[^']*')|\s+")
+
+def minify_html(text):
+    # Comments (but conditional ones) removed, lines stripped: a line break stays between the
+    # elements, so the inline layout is unchanged. <pre>, <textarea>, <script>, <style> are kept as is.
+    parts = HTML_VERBATIM.split(text)
+    out = []
+    for index in range(0, len(parts), 3):
+        chunk = re.sub(r"<!--(?!\[if).*?-->", "", parts[index], flags=re.S)
+        chunk = re.sub(r"[ \t]*\n\s*", "\n", chunk)
+        # Inside the tags, one space between the attributes
+        chunk = HTML_TAG.sub(lambda tag: HTML_TAG_SPACES.sub(lambda m: m.group(1) or " ", tag.group()), chunk)
+        out.append(chunk)
+        if index + 1 < len(parts):
+            out.append(parts[index + 1])
+    return "".join(out).strip() + "\n"
+
+def build_file(root, dist, path):
+    source = root / path
+    dest = dist / path
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    stats = {"path": path.as_posix(), "source": source.stat().st_size}
+
+    minifier = MINIFIERS.get(path.suffix)
+    if minifier:
+        text = source.read_text(encoding="utf-8")
+        try:
+            content = globals()[minifier](text).encode("utf-8")
+        except ValueError as e:
+            print(f"Warning: {path} not minified ({e}).")
+            content = source.read_bytes()
+        # Never ship a minified file bigger than its source
+        if len(content) > stats["source"]:
+            content = source.read_bytes()
+        write_if_changed(dest, content)
+    else:
+        # Binary files: only copied when changed (same size and modification time otherwise)
+        if not dest.exists() or dest.stat().st_size != stats["source"] or dest.stat().st_mtime != source.stat().st_mtime:
+            shutil.copy2(source, dest)
+        content = None
+
+    stats["dist"] = dest.stat().st_size
+    if path.suffix in COMPRESSED_EXTENSIONS and stats["dist"] >= MIN_COMPRESS_SIZE:
+        content = content if content is not None else dest.read_bytes()
+        for encoding in get_sidecar_encodings():
+            compressed = compress(content, encoding)
+            sidecar = dest.with_name(f"{dest.name}.{encoding}")
+            if len(compressed) < len(content):
+                write_if_changed(sidecar, compressed)
+                stats[encoding] = len(compressed)
+            elif sidecar.exists():
+                sidecar.unlink()
+    return stats
+
+def remove_stale_files(dist, expected):
+    for path in sorted(dist.rglob("*"), reverse=True):
+        if path.is_file() and path not in expected:
+            path.unlink()
+        elif path.is_dir() and not any(path.iterdir()):
+            path.rmdir()
+
+def print_report(stats, verbose=False):
+    print(f"  {'file':<52} {'source':>10} {'minified':>10} {'gzip':>10} {'brotli':>10}")
+    text_stats = [entry for entry in stats if "gz" in entry or entry["dist"] != entry["source"]]
+    for entry in (stats if verbose else text_stats):
+        columns = [entry["source"], entry["dist"], entry.get("gz"), entry.get("br")]
+        print(f"  {entry['path']:<52} " + " ".join(f"{size / 1024:>7.1f} KB" if size is not None else f"{'-':>10}" for size in columns))
+
+    source = sum(entry["source"] for entry in text_stats)
+    dist = sum(entry["dist"] for entry in text_stats)
+    best = sum(min(entry["dist"], entry.get("gz", entry["dist"]), entry.get("br", entry["dist"])) for entry in text_stats)
+    print(f"  {len(text_stats)} text files: {source / 1024:.1f} KB -> {dist / 1024:.1f} KB minified, {best / 1024:.1f} KB compressed")
+    print(f"  {len(stats) - len(text_stats)} other files copied ({sum(entry['dist'] for entry in stats if entry not in text_stats) / 1024 / 1024:.1f} MB)")
+
+def build_dist(root, dist, verbose=False):
+    outdated = check_outputs(root)
+    if outdated:
+        print(f"Warning: {', '.join(outdated)} out of date, run 'python build_data.py' first.")
+
+    stats = []
+    expected = set()
+    for path in get_dist_files(root):
+        entry = build_file(root, dist, path)
+        stats.append(entry)
+        expected.add(dist / path)
+        expected.update(dist / f"{path}.{encoding}" for encoding in ("gz", "br") if encoding in entry)
+
+    remove_stale_files(dist, expected)
+    print(f"Built {os.path.relpath(dist)}/")
+    print_report(stats, verbose)
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the deployable dist/ tree: minified CSS/JS/JSON/SVG/HTML with .gz/.br copies (the source tree is not modified).")
+    parser.add_argument("--output", default=None, help=f"Output directory (default: {DIST_DIR}/ at the project root)")
+    parser.add_argument("--verbose", action="store_true", help="Also list the files copied as is")
+
+    args = parser.parse_args()
+
+    root = get_project_root()
+    dist = Path(args.output).resolve() if args.output else root / DIST_DIR
+    build_dist(root, dist, args.verbose)
+
+if __name__ == "__main__":
+    main()
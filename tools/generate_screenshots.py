@@ -1,10 +1,15 @@
-import time
+import argparse
+import io
 import json
 import os
+import queue
 import re
+import sys
+import time
 import unicodedata
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from playwright.sync_api import sync_playwright
+from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
 from PIL import Image
 
 # Configuration
@@ -12,6 +17,53 @@ BASE_URL = "http://localhost:8080"
 OUTPUT_DIR = "screenshots"
 VIEWPORT = {"width": 360, "height": 772}
 DATA_FILE = "data/2026/data.json"
+USER_AGENT = "Mozilla/5.0 (iPhone; CPU iPhone OS 14_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.0 Mobile/15E148 Safari/604.1"
+LANGUAGES = ["fr", "en"]
+WORKERS = 4 # browsers run in parallel (one thread and one Playwright instance each)
+SHARDS = 3 # slices of the artist list per language, each captured in its own browser context
+SETTLE_TIMEOUT = 5000 # ms, longest wait for the screen to settle before a capture
+ENCODERS = 4 # WebP encoding threads (Pillow releases the GIL while encoding)
+WEBP_QUALITY = 80
+HASH_SIZE = 16 # difference hash of HASH_SIZE x HASH_SIZE bits
+DEDUPE_DISTANCE = 6 # bits: a screen this close to the previous capture is unchanged (video frames, encoding noise)
+
+# LANG-NNN-context-YYYY-MM-DD-HHMM.webp
+SCREENSHOT_NAME = re.compile(r"^([A-Z]+-\d{3}-.+)-(\d{4}-\d{2}-\d{2}-\d{4})\.webp$")
+
+# Runs in the page: resolves once the screen stops changing. The CSS transitions and animations
+# (the ones transitionend / animationend would signal, the infinite loaders aside) are finished,
+# the images on screen are loaded and the element followed (smooth scrolls) does not move anymore.
+SETTLE_JS = """async ( [ selector, timeout ] ) => {
+    const frame = () => new Promise( r => requestAnimationFrame( () => r() ) );
+    const isOnScreen = ( el ) => {
+        const r = el.getBoundingClientRect();
+        return r.width > 0 && r.height > 0 && r.bottom > 0 && r.top < innerHeight && r.right > 0 && r.left < innerWidth;
+    };
+    const settle = async () => {
+        for( ;; ) {
+            const running = document.getAnimations().filter( a => a.playState === 'running' && a.effect && a.effect.getComputedTiming().endTime !== Infinity );
+            const loading = [ ...document.images ].filter( img => !img.complete && isOnScreen( img ) );
+            const el      = selector  ?  document.querySelector( selector )  :  null;
+            const top     = el  ?  el.getBoundingClientRect().top  :  null;
+
+            await Promise.all( [
+                ...running.map( a => a.finished.catch( () => null ) ),
+                ...loading.map( img => new Promise( r => {
+                    img.addEventListener( 'load',  r, { once: true } );
+                    img.addEventListener( 'error', r, { once: true } );
+                } ) ),
+            ] );
+            await frame();
+            await frame();
+
+            // Settled when nothing was running and nothing moved during the last two frames
+            if( !running.length && !loading.length && ( !el || el.getBoundingClientRect().top === top ) ) {
+                return;
+            }
+        }
+    };
+    await Promise.race( [ settle(), new Promise( r => setTimeout( r, timeout ) ) ] );
+}"""
 
 def get_slug(text):
     text = text.lower()
@@ -20,213 +72,340 @@ def get_slug(text):
     text = re.sub(r'[^a-z0-9]+', '-', text)
     return text.strip('-')
 
-def take_screenshot(page, context, lang, sequence_num):
+def settle(page, selector=None):
+    page.evaluate(SETTLE_JS, [selector, SETTLE_TIMEOUT])
+
+_encoder = {"pool": None}
+
+def get_perceptual_hash(im):
+    # Difference hash: the brightness gradients of a small grayscale copy, insensitive to the
+    # encoding noise and to small moving details
+    pixels = im.convert("L").resize((HASH_SIZE + 1, HASH_SIZE), Image.LANCZOS).tobytes()
+    value = 0
+    for y in range(HASH_SIZE):
+        row = pixels[y * (HASH_SIZE + 1):(y + 1) * (HASH_SIZE + 1)]
+        for x in range(HASH_SIZE):
+            value = value << 1 | (row[x] > row[x + 1])
+    return value
+
+def encode_screenshot(png):
+    # On the encoder threads: (WebP bytes, perceptual hash)
+    with Image.open(io.BytesIO(png)) as im:
+        buffer = io.BytesIO()
+        im.save(buffer, "WEBP", quality=WEBP_QUALITY)
+        return buffer.getvalue(), get_perceptual_hash(im)
+
+def hash_screenshot(path):
+    with Image.open(path) as im:
+        return get_perceptual_hash(im)
+
+def get_previous_screenshots():
+    # {LANG-NNN-context: the hash of its latest capture (future)}, hashed while the browsers run
+    latest = {}
+    for filename in sorted(os.listdir(OUTPUT_DIR)):
+        match = SCREENSHOT_NAME.match(filename)
+        if match and (match.group(1) not in latest or match.group(2) > latest[match.group(1)][0]):
+            latest[match.group(1)] = (match.group(2), filename)
+    return {prefix: (filename, _encoder["pool"].submit(hash_screenshot, os.path.join(OUTPUT_DIR, filename))) for prefix, (_, filename) in latest.items()}
+
+def take_screenshot(page, context, captures):
+    # The browser only waits for the capture: the encoding is queued. The files are numbered once
+    # every part of the language is captured. No captures: the steps are only replayed.
+    if captures is None:
+        return
+    png = page.screenshot(type="png")
+    captures.append({"context": context, "time": datetime.now(), "encoded": _encoder["pool"].submit(encode_screenshot, png)})
+
+def save_screenshot(capture, lang, sequence_num, previous, dedupe_distance):
     # Format: LANG-NNN-context-YYYY-MM-DD_HH-mm.webp
-    timestamp     = datetime.now().strftime("%Y-%m-%d-%H%M")
-    filename_base = f"{lang.upper()}-{str(sequence_num).zfill(3)}-{context}-{timestamp}"
-    png_path      = os.path.join(OUTPUT_DIR, f"{filename_base}.png")
+    prefix        = f"{lang.upper()}-{str(sequence_num).zfill(3)}-{capture['context']}"
+    timestamp     = capture["time"].strftime("%Y-%m-%d-%H%M")
+    filename_base = f"{prefix}-{timestamp}"
     webp_path     = os.path.join(OUTPUT_DIR, f"{filename_base}.webp")
 
-    # Capture PNG
-    page.screenshot(path=png_path, type="png")
-
-    # Convert to WEBP
     try:
-        with Image.open(png_path) as im:
-            im.save(webp_path, "WEBP", quality=80)
-        os.remove(png_path)
-        print(f"Captured: {filename_base}.webp")
+        webp, image_hash = capture["encoded"].result()
     except Exception as e:
         print(f"Error converting {filename_base}: {e}")
+        return False
+
+    # Same screen as the previous run: no new file
+    if dedupe_distance is not None and prefix in previous:
+        previous_file, previous_hash = previous[prefix]
+        try:
+            distance = (image_hash ^ previous_hash.result()).bit_count()
+        except Exception as e:
+            print(f"Error reading {previous_file}: {e}")
+            distance = None
+        if distance is not None and distance <= dedupe_distance:
+            print(f"Unchanged: {previous_file}")
+            return False
+
+    with open(webp_path, "wb") as f:
+        f.write(webp)
+    print(f"Captured: {filename_base}.webp")
+    return True
+
+def load_app(browser, lang):
+    # A context per part: the parts of a language are captured from the same starting state
+    context = browser.new_context(viewport=VIEWPORT, user_agent=USER_AGENT)
+    page = context.new_page()
+
+    # Load App
+    url = f"{BASE_URL}?lang={lang}"
+    print(f"Loading {url}...")
+    page.goto(url)
+
+    # Inject CSS to hide error overlay
+    page.add_style_tag(content=".video-error-overlay { display: none !important; }")
+
+    # Wait for home
+    page.wait_for_selector("#home", state="visible", timeout=10000)
+    try:
+        page.wait_for_load_state("networkidle", timeout=10000)
+    except PlaywrightTimeoutError:
+        pass # the players may keep streaming, the screen is settled below anyway
+    settle(page)
+    return context, page
+
+def click_and_wait(page, click_selector, state_selector, state="visible"):
+    page.click(click_selector)
+    page.wait_for_selector(state_selector, state=state)
+    settle(page)
+
+def capture_screens(page, captures):
+    # 000 - Home
+    take_screenshot(page, "home", captures)
+
+    # 001 - Menu
+    click_and_wait(page, ".main-menu-icon", "#main-menu-drawer.active")
+    take_screenshot(page, "menu", captures)
+
+    # 002 - About Modal
+    # Click 'A propos'. Note: This opens modal ON TOP of menu.
+    click_and_wait(page, "#menu-txt-about", "#about-modal.active")
+    take_screenshot(page, "modal-about", captures)
+
+    # Close About Modal (menu should still be open)
+    click_and_wait(page, "#about-modal .btn-close-drawer", "#about-modal:not(.active)", "attached")
+
+    # 003 - Share Modal
+    # Click Share in Menu. Note: This CLOSES menu and opens Share.
+    click_and_wait(page, "#menu-txt-share", "#share-box-modal.active")
+    take_screenshot(page, "modal-share", captures)
+
+    # Close Share Modal
+    click_and_wait(page, "#btn-close-share", "#share-box-modal:not(.active)", "attached")
+
+    # 004 - Features Modal (Try via JS)
+    page.evaluate("openFeaturesModal()")
+    try:
+        page.wait_for_selector("#features-modal.active", timeout=2000)
+        settle(page)
+        take_screenshot(page, "modal-features", captures)
+        page.evaluate("closeFeaturesModal()")
+        page.wait_for_selector("#features-modal:not(.active)", state="attached")
+        settle(page)
+    except PlaywrightTimeoutError:
+        print("Features modal did not open via JS. Skipping.")
+
+    # 005 - Favorites Drawer (Empty)
+    # Ensure menu is closed (handleMenuAction('share') closed it)
+    if page.evaluate("document.getElementById('main-menu-drawer').classList.contains('active')"):
+        page.evaluate("closeMainMenu()")
+        page.wait_for_selector("#main-menu-drawer:not(.active)", state="attached")
+        settle(page)
+
+    click_and_wait(page, "#btn-drawer-favorites", "#fav-timeline-drawer.active")
+    take_screenshot(page, "drawer-favorites", captures)
+
+    # Close Drawer
+    click_and_wait(page, "#fav-timeline-drawer .btn-close-drawer", "#fav-timeline-drawer:not(.active)", "attached")
+
+    # 006 - At A Glance (Program)
+    click_and_wait(page, "#btn-at-a-glance", "#at-a-glance-drawer.active")
+    take_screenshot(page, "drawer-at-a-glance", captures)
+
+    # 007 - Filter Day 1 (in At A Glance)
+    try:
+        sep_selector = '#at-a-glance-list .program-separator[data-slug="day-1"]'
+        if page.query_selector(sep_selector):
+            click_and_wait(page, sep_selector, "body.tag-filtering", "attached")
+            take_screenshot(page, "filter-day-1", captures)
+        else:
+            print("Day 1 separator not found in drawer.")
+    except Exception as e:
+        print(f"Error filtering Day 1: {e}")
 
-    return sequence_num + 1
+    # 008 - Filter Day 2
+    # Cancel filters first
+    page.evaluate("cancelFilters()")
+    page.wait_for_selector("body:not(.tag-filtering)", state="attached")
+    settle(page)
 
-def run_process():
+    try:
+        sep_selector = '#at-a-glance-list .program-separator[data-slug="day-2"]'
+        page.wait_for_selector(sep_selector, state="visible", timeout=2000)
+        click_and_wait(page, sep_selector, "body.tag-filtering", "attached")
+        take_screenshot(page, "filter-day-2", captures)
+    except Exception as e:
+        print(f"Error filtering Day 2: {e}")
+
+    # Cancel filters and Close Drawer: the artists are captured from the list
+    page.evaluate("cancelFilters()")
+    click_and_wait(page, "#at-a-glance-drawer .btn-close-drawer", "#at-a-glance-drawer:not(.active)", "attached")
+
+def capture_artists(page, artists, captures):
+    for artist in artists:
+        artist_id = artist['id']
+        artist_slug = get_slug(artist['event_name'])
+        card_selector = f"#video-{artist_id}"
+
+        try:
+            if not page.query_selector(card_selector):
+                print(f"Card {artist_id} not found in DOM.")
+                continue
+
+            # Scroll to card, until it stops moving
+            page.locator(card_selector).scroll_into_view_if_needed()
+            settle(page, card_selector)
+
+            # Expand description: the avatar container toggles it
+            trigger_selector = f"{card_selector} .artist-avatar-container"
+            if not page.is_visible(trigger_selector):
+                page.wait_for_selector(f"{card_selector}.active", timeout=2000)
+
+            desc_selector = f"{card_selector} .artist-description"
+            click_and_wait(page, trigger_selector, f"{desc_selector}.expanded")
+            take_screenshot(page, artist_slug, captures)
+
+            # Close description
+            click_and_wait(page, trigger_selector, f"{desc_selector}:not(.expanded)", "attached")
+
+        except Exception as e:
+            print(f"Error capturing artist {artist_slug} ({artist_id}): {e}")
+
+def scroll_artists(page, artists):
+    # The scrolling of a sequential run over these cards: their images are loaded (lazily) too
+    for artist in artists:
+        card_selector = f"#video-{artist['id']}"
+        if page.query_selector(card_selector):
+            page.locator(card_selector).scroll_into_view_if_needed()
+            settle(page, card_selector)
+
+def capture_part(page, screens, artists, replayed):
+    # A shard starts where a sequential run would be, replayed without captures: the screens (menus
+    # and modals visited, filters cancelled), the cards before it scrolled, the last one toggled
+    captures = []
+    capture_screens(page, captures if screens else None)
+    if artists:
+        scroll_artists(page, replayed[:-1])
+        capture_artists(page, replayed[-1:], None)
+        capture_artists(page, artists, captures)
+    return captures
+
+def run_worker(tasks, results):
+    # Playwright objects belong to the thread which created them: a browser per worker thread
+    with sync_playwright() as p:
+        browser = p.chromium.launch()
+        try:
+            while True:
+                try:
+                    key, lang, screens, artists, replayed = tasks.get_nowait()
+                except queue.Empty:
+                    return
+                try:
+                    context, page = load_app(browser, lang)
+                except PlaywrightTimeoutError:
+                    print(f"Timeout waiting for #home ({lang.upper()}). Check server.")
+                    results[key] = []
+                    continue
+                try:
+                    results[key] = capture_part(page, screens, artists, replayed)
+                except Exception as e:
+                    print(f"Error capturing {lang.upper()}: {e}")
+                    results[key] = []
+                finally:
+                    context.close()
+        finally:
+            browser.close()
+
+def compare_with_sequential(lang, captures, sequential, distance):
+    # Perceptual hashes of the sharded captures against the ones of a single context
+    differences = [f"{len(captures)} captures, {len(sequential)} in sequence"] if len(captures) != len(sequential) else []
+    for seq, (capture, reference) in enumerate(zip(captures, sequential)):
+        try:
+            delta = (capture["encoded"].result()[1] ^ reference["encoded"].result()[1]).bit_count()
+        except Exception as e:
+            differences.append(f"{seq:03d} {capture['context']}: {e}")
+            continue
+        if capture["context"] != reference["context"] or delta > distance:
+            differences.append(f"{seq:03d} {capture['context']}: {reference['context']} in sequence, {delta} bits apart")
+
+    for difference in differences:
+        print(f"Differs from the sequential run ({lang.upper()}): {difference}")
+    print(f"{lang.upper()}: {len(captures) - len(differences)}/{len(captures)} captures match the sequential run")
+    return not differences
+
+def run_process(workers=WORKERS, shards=SHARDS, dedupe_distance=DEDUPE_DISTANCE, verify=False):
     if not os.path.exists(OUTPUT_DIR):
         os.makedirs(OUTPUT_DIR)
 
     with open(DATA_FILE, 'r') as f:
         artists_data = json.load(f)
 
-    with sync_playwright() as p:
-        # Launch browser
-        browser = p.chromium.launch()
-        # Use context to emulate mobile if needed, or just viewport
-        context = browser.new_context(viewport=VIEWPORT, user_agent="Mozilla/5.0 (iPhone; CPU iPhone OS 14_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.0 Mobile/15E148 Safari/604.1")
-        page = context.new_page()
-
-        # Iterate Languages
-        for lang in ['fr', 'en']:
-            print(f"--- Processing Language: {lang.upper()} ---")
-            seq = 0
-
-            # Load App
-            url = f"{BASE_URL}?lang={lang}"
-            print(f"Loading {url}...")
-            page.goto(url)
-
-            # Inject CSS to hide error overlay
-            page.add_style_tag(content=".video-error-overlay { display: none !important; }")
-
-            # Wait for home
-            try:
-                page.wait_for_selector("#home", state="visible", timeout=10000)
-            except:
-                print("Timeout waiting for #home. Check server.")
-                continue # Skip language if load fails
-
-            # Wait for animations
-            time.sleep(2)
-
-            # 000 - Home
-            seq = take_screenshot(page, "home", lang, seq)
-
-            # 001 - Menu
-            # Open Menu
-            page.click(".main-menu-icon")
-            page.wait_for_selector("#main-menu-drawer.active")
-            time.sleep(1)
-            seq = take_screenshot(page, "menu", lang, seq)
-
-            # 002 - About Modal
-            # Click 'A propos'. Note: This opens modal ON TOP of menu.
-            page.click("#menu-txt-about")
-            page.wait_for_selector("#about-modal.active")
-            time.sleep(1)
-            seq = take_screenshot(page, "modal-about", lang, seq)
-
-            # Close About Modal
-            page.click("#about-modal .btn-close-drawer")
-            time.sleep(0.5)
-            # Menu should still be open.
-
-            # 003 - Share Modal
-            # Click Share in Menu. Note: This CLOSES menu and opens Share.
-            page.click("#menu-txt-share")
-            page.wait_for_selector("#share-box-modal.active")
-            time.sleep(1)
-            seq = take_screenshot(page, "modal-share", lang, seq)
-
-            # Close Share Modal
-            page.click("#btn-close-share")
-            time.sleep(0.5)
-
-            # 004 - Features Modal (Try via JS)
-            page.evaluate("openFeaturesModal()")
-            time.sleep(0.5)
-            if page.evaluate("document.getElementById('features-modal').classList.contains('active')"):
-                seq = take_screenshot(page, "modal-features", lang, seq)
-                page.evaluate("closeFeaturesModal()")
-                time.sleep(0.5)
-            else:
-                print("Features modal did not open via JS. Skipping.")
-
-            # 005 - Favorites Drawer (Empty)
-            # Ensure menu is closed (handleMenuAction('share') closed it)
-            # Check just in case
-            if page.evaluate("document.getElementById('main-menu-drawer').classList.contains('active')"):
-                 page.evaluate("closeMainMenu()")
-                 time.sleep(0.5)
-
-            page.click("#btn-drawer-favorites")
-            page.wait_for_selector("#fav-timeline-drawer.active")
-            time.sleep(1)
-            seq = take_screenshot(page, "drawer-favorites", lang, seq)
-
-            # Close Drawer
-            page.click("#fav-timeline-drawer .btn-close-drawer")
-            time.sleep(0.5)
-
-            # 006 - At A Glance (Program)
-            # Open At A Glance
-            # Click bottom bar button
-            page.click("#btn-at-a-glance")
-            # Or use JS to be safe: page.evaluate("toggleAtAGlanceDrawer()")
-            page.wait_for_selector("#at-a-glance-drawer.active")
-            time.sleep(1)
-            seq = take_screenshot(page, "drawer-at-a-glance", lang, seq)
-
-            # 007 - Filter Day 1 (in At A Glance)
-            try:
-                # Selector: #at-a-glance-list .program-separator[data-slug="day-1"]
-                sep_selector = '#at-a-glance-list .program-separator[data-slug="day-1"]'
-                if page.query_selector(sep_selector):
-                    page.click(sep_selector)
-                    time.sleep(1)
-                    seq = take_screenshot(page, "filter-day-1", lang, seq)
-                else:
-                    print("Day 1 separator not found in drawer.")
-            except Exception as e:
-                print(f"Error filtering Day 1: {e}")
-
-            # 008 - Filter Day 2
-            # Cancel filters first
-            page.evaluate("cancelFilters()")
-            time.sleep(0.5)
-
-            try:
-                sep_selector = '#at-a-glance-list .program-separator[data-slug="day-2"]'
-                # Note: If Day 1 was active, Day 2 was hidden. But we cancelled filters.
-                # However, confirm cancellation worked.
-                page.wait_for_selector(sep_selector, state="visible", timeout=2000)
-
-                if page.is_visible(sep_selector):
-                    page.click(sep_selector)
-                    time.sleep(1)
-                    seq = take_screenshot(page, "filter-day-2", lang, seq)
-                else:
-                    print("Day 2 separator not visible.")
-            except Exception as e:
-                print(f"Error filtering Day 2: {e}")
-
-            # Cancel filters and Close Drawer
-            page.evaluate("cancelFilters()")
-            page.click("#at-a-glance-drawer .btn-close-drawer")
-            time.sleep(1)
-
-            # 009... Artists
-            for i, artist in enumerate(artists_data):
-                artist_id = artist['id']
-                artist_slug = get_slug(artist['event_name'])
-
-                # Scroll to card
-                card_selector = f"#video-{artist_id}"
-
-                try:
-                    # Check visibility
-                    if not page.query_selector(card_selector):
-                        print(f"Card {artist_id} not found in DOM.")
-                        continue
-
-                    page.locator(card_selector).scroll_into_view_if_needed()
-                    time.sleep(0.5)
-
-                    # Expand description
-                    # We click the avatar container to toggle description
-                    trigger_selector = f"{card_selector} .artist-avatar-container"
-
-                    # Ensure trigger is visible
-                    if not page.is_visible(trigger_selector):
-                         page.wait_for_selector(f"{card_selector}.active", timeout=2000)
-
-                    page.click(trigger_selector)
-
-                    # Wait for expanded class
-                    desc_selector = f"{card_selector} .artist-description"
-                    page.wait_for_selector(f"{desc_selector}.expanded", timeout=2000)
-                    time.sleep(0.5) # Animation
-
-                    # Screenshot
-                    seq = take_screenshot(page, artist_slug, lang, seq)
-
-                    # Close description
-                    page.click(trigger_selector)
-                    time.sleep(0.5)
-
-                except Exception as e:
-                    print(f"Error capturing artist {artist_slug} ({artist_id}): {e}")
-
-        browser.close()
+    # Per language: the screens (home, menu, modals, drawers), then the artist shards (contiguous
+    # slices), each replaying what precedes it. --verify: the whole language in one context too.
+    tasks = queue.Queue()
+    keys = []
+    for lang in LANGUAGES:
+        if verify:
+            tasks.put(((lang, "sequential"), lang, True, artists_data, []))
+        keys.append((lang, 0))
+        tasks.put(((lang, 0), lang, True, [], []))
+        for i in range(shards):
+            first, last = i * len(artists_data) // shards, (i + 1) * len(artists_data) // shards
+            if first < last:
+                keys.append((lang, i + 1))
+                tasks.put(((lang, i + 1), lang, False, artists_data[first:last], artists_data[:first]))
+
+    start = time.perf_counter()
+    results = {}
+    saved = 0
+    matched = True
+    workers = max(1, min(workers, tasks.qsize()))
+    with ThreadPoolExecutor(max_workers=ENCODERS) as encoder:
+        _encoder["pool"] = encoder
+        previous = get_previous_screenshots() if dedupe_distance is not None else {}
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for future in [executor.submit(run_worker, tasks, results) for _ in range(workers)]:
+                future.result()
+
+        # Numbered in the order of a sequential run: language, screens, then artists
+        for lang in LANGUAGES:
+            print(f"--- Language: {lang.upper()} ---")
+            captures = [capture for key in keys if key[0] == lang for capture in results.get(key, [])]
+            for seq, capture in enumerate(captures):
+                saved += save_screenshot(capture, lang, seq, previous, dedupe_distance)
+            if verify:
+                matched = compare_with_sequential(lang, captures, results.get((lang, "sequential"), []), DEDUPE_DISTANCE if dedupe_distance is None else dedupe_distance) and matched
+
+    total = sum(len(results.get(key, [])) for key in keys)
+    print(f"{total} screenshots in {time.perf_counter() - start:.1f}s ({workers} browsers, {shards} artist shards per language): {saved} new, {total - saved} unchanged or failed")
+    return matched
+
+def main():
+    parser = argparse.ArgumentParser(description=f"Capture the screenshots of the player (served at {BASE_URL}) in {OUTPUT_DIR}/.")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="Browsers run in parallel")
+    parser.add_argument("--shards", type=int, default=SHARDS, help="Slices of the artist list per language, captured concurrently")
+    parser.add_argument("--dedupe-distance", type=int, default=DEDUPE_DISTANCE, help="Largest perceptual hash distance (bits) to the previous capture of a screen for it to be skipped as unchanged")
+    parser.add_argument("--no-dedupe", action="store_true", help="Save every screenshot, even if unchanged since the previous run")
+    parser.add_argument("--verify", action="store_true", help="Also capture each language sequentially in a single context and compare the perceptual hashes with the sharded captures (exit code 1 if they differ)")
+
+    args = parser.parse_args()
+    if not run_process(args.workers, max(1, args.shards), None if args.no_dedupe else args.dedupe_distance, args.verify):
+        sys.exit(1)
 
 if __name__ == "__main__":
-    run_process()
+    main()
@@ -1,18 +1,29 @@
 import argparse
+import copy
+import hashlib
+import io
 import os
 import sys
 import shutil
 import re
 import json
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 try:
-    import cairosvg
     from PIL import Image
+    from build_data import write_if_changed
+    from precache import write_precache_manifest
 except ImportError:
     print("Error: Missing dependencies. Please run with 'uv run icon.py ...'")
     sys.exit(1)
 
+try:
+    from cairosvg.parser import Tree
+    from cairosvg.surface import PNGSurface
+except (ImportError, OSError): # OSError: cairosvg installed without the cairo library
+    Tree = PNGSurface = None # only needed to render: up-to-date icons are checked without it
+
 # Constants
 THEME_COLOR = "#e9552b" # Default, will try to read from config
 BACKGROUND_COLOR = "#000000"
@@ -27,6 +38,9 @@ ICONS_CONFIG = [
     {"name": "favicon.svg", "size": (512, 512), "type": "svg_copy"},
 ]
 
+MASKABLE_SCALE = 0.8 # safe zone of the maskable icons: the centre 80%, 10% padding on each side
+ICONS_MANIFEST = ".icons-manifest.json" # in the destination: the inputs of each generated icon
+
 def get_project_root():
     # Assuming script is in tools/
     return Path(__file__).parent.parent
@@ -43,55 +57,136 @@ def load_config_colors(root):
         print(f"Warning: Could not read config.json for colors: {e}")
     return THEME_COLOR, BACKGROUND_COLOR
 
-def generate_icon(svg_path, dest_dir, icon_def, theme_color, bg_color):
-    dest_path = dest_dir / icon_def["name"]
-    print(f"Generating {dest_path}...")
+def get_raster_sizes(icon_def):
+    # The renderings of the SVG an icon is made of
+    if icon_def["type"] == "ico":
+        return [tuple(size) for size in icon_def["size"]]
+    if icon_def["type"] == "png":
+        return [tuple(icon_def["size"])]
+    if icon_def["type"] == "maskable":
+        w, h = icon_def["size"]
+        return [(int(w * MASKABLE_SCALE), int(h * MASKABLE_SCALE))]
+    return []
 
-    if icon_def["type"] == "svg_copy":
-        shutil.copy(svg_path, dest_path)
+def get_icon_inputs(icon_def, svg_sha256, theme_color):
+    # Everything that can change an icon (the theme colour is only painted on the maskable ones)
+    inputs = {"svg_sha256": svg_sha256, "type": icon_def["type"], "size": icon_def["size"]}
+    if icon_def["type"] == "maskable":
+        inputs["theme_color"] = theme_color
+    return json.loads(json.dumps(inputs)) # tuples as lists, as read back from the manifest
+
+def load_icons_manifest(dest_dir):
+    try:
+        with open(dest_dir / ICONS_MANIFEST, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+def is_icon_up_to_date(manifest, dest_dir, icon_def, inputs):
+    entry = manifest.get(icon_def["name"])
+    dest_path = dest_dir / icon_def["name"]
+    if not entry or not dest_path.exists() or entry.get("inputs") != inputs:
+        return False
+    return entry.get("sha256") == hashlib.sha256(dest_path.read_bytes()).hexdigest()
+
+_svg = {"tree": None}
+
+def load_svg_tree(tree):
+    # Also the initializer of the worker processes: the tree is parsed once, in the main process
+    _svg["tree"] = tree
+
+def rasterize(size):
+    # cairosvg updates the nodes while drawing (masks, patterns, paths): each rendering draws a copy
+    output = io.BytesIO()
+    surface = PNGSurface(copy.deepcopy(_svg["tree"]), output, 96, output_width=size[0], output_height=size[1])
+    surface.finish()
+    return size, output.getvalue()
+
+def render_rasters(svg_data, svg_sha256, sizes, rasters, jobs):
+    # rasters: {(svg sha256, width, height): PNG bytes}, only the missing renderings are made,
+    # the largest first so that the longest ones start at once
+    missing = sorted({size for size in sizes if (svg_sha256, *size) not in rasters}, reverse=True)
+    if not missing:
         return
+    if Tree is None:
+        raise RuntimeError("cairosvg is not available, please run with 'uv run icon.py ...'")
+    tree = Tree(bytestring=svg_data)
+    workers = min(jobs, len(missing))
+    if workers <= 1:
+        load_svg_tree(tree)
+        results = map(rasterize, missing)
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=load_svg_tree, initargs=(tree,))
+        results = executor.map(rasterize, missing)
+    try:
+        for size, png in results:
+            print(f"  Rendered {size[0]}x{size[1]}")
+            rasters[(svg_sha256, *size)] = png
+    finally:
+        if workers > 1:
+            executor.shutdown()
+
+def build_icon(icon_def, svg_data, svg_sha256, rasters, theme_color):
+    # The icon file content, from the renderings in memory
+    if icon_def["type"] == "svg_copy":
+        return svg_data
+
+    pngs = [rasters[(svg_sha256, *size)] for size in get_raster_sizes(icon_def)]
+    if icon_def["type"] == "png":
+        return pngs[0]
+
+    images = [Image.open(io.BytesIO(png)) for png in pngs]
+    output = io.BytesIO()
 
     if icon_def["type"] == "ico":
-        # Generate multiple PNGs then combine
-        img_list = []
-        for size in icon_def["size"]:
-            png_data = cairosvg.svg2png(url=str(svg_path), output_width=size[0], output_height=size[1])
-            with open(dest_dir / f"tmp_{size[0]}.png", "wb") as f:
-                f.write(png_data)
-            img = Image.open(dest_dir / f"tmp_{size[0]}.png")
-            img_list.append(img)
-
-        # Save ICO
-        img_list[0].save(dest_path, format="ICO", sizes=[(i.width, i.height) for i in img_list], append_images=img_list[1:])
-
-        # Cleanup
-        for size in icon_def["size"]:
-            (dest_dir / f"tmp_{size[0]}.png").unlink()
-
-    elif icon_def["type"] == "png":
-        w, h = icon_def["size"]
-        cairosvg.svg2png(url=str(svg_path), write_to=str(dest_path), output_width=w, output_height=h)
+        # Pillow skips the sizes larger than the image saved: the largest one, the others appended
+        images.sort(key=lambda image: image.width, reverse=True)
+        images[0].save(output, format="ICO", sizes=[(i.width, i.height) for i in images], append_images=images[1:])
 
     elif icon_def["type"] == "maskable":
         w, h = icon_def["size"]
-        # Maskable: 10% padding (safe zone is center 80%, so 10% each side)
-        # We render SVG at 80% size
-        icon_w, icon_h = int(w * 0.8), int(h * 0.8)
+        foreground = images[0].convert("RGBA")
+
+        # Theme colour background, the icon in the centre
+        background = Image.new('RGBA', (w, h), theme_color)
+        offset = ((w - foreground.width) // 2, (h - foreground.height) // 2)
+        background.paste(foreground, offset, foreground)
+        background.save(output, format="PNG")
 
-        tmp_png = dest_dir / f"tmp_mask_{w}.png"
-        cairosvg.svg2png(url=str(svg_path), write_to=str(tmp_png), output_width=icon_w, output_height=icon_h)
+    return output.getvalue()
 
-        foreground = Image.open(tmp_png).convert("RGBA")
+def generate_icons(svg_path, dest_dir, theme_color, jobs=1, force=False, rasters=None):
+    # rasters: renderings kept from a previous call (build.py --watch), those of another SVG are dropped
+    svg_data = svg_path.read_bytes()
+    svg_sha256 = hashlib.sha256(svg_data).hexdigest()
+    rasters = {} if rasters is None else rasters
+    for key in [key for key in rasters if key[0] != svg_sha256]:
+        del rasters[key]
+    manifest = load_icons_manifest(dest_dir)
 
-        # Create background
-        background = Image.new('RGBA', (w, h), theme_color)
+    outdated = []
+    for icon_def in ICONS_CONFIG:
+        inputs = get_icon_inputs(icon_def, svg_sha256, theme_color)
+        if not force and is_icon_up_to_date(manifest, dest_dir, icon_def, inputs):
+            print(f"{dest_dir / icon_def['name']} is up to date")
+        else:
+            outdated.append((icon_def, inputs))
+    if not outdated:
+        return
 
-        # Paste foreground in center
-        offset = ((w - icon_w) // 2, (h - icon_h) // 2)
-        background.paste(foreground, offset, foreground)
+    # One rendering per distinct size, whatever the number of icons using it
+    sizes = [size for icon_def, _ in outdated for size in get_raster_sizes(icon_def)]
+    if sizes:
+        render_rasters(svg_data, svg_sha256, sizes, rasters, jobs)
 
-        background.save(dest_path)
-        tmp_png.unlink()
+    for icon_def, inputs in outdated:
+        dest_path = dest_dir / icon_def["name"]
+        content = build_icon(icon_def, svg_data, svg_sha256, rasters, theme_color)
+        print(f"{'Generated' if write_if_changed(dest_path, content) else 'Unchanged'} {dest_path}")
+        manifest[icon_def["name"]] = {"inputs": inputs, "sha256": hashlib.sha256(content).hexdigest()}
+
+    with open(dest_dir / ICONS_MANIFEST, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=4, sort_keys=True)
 
 def update_manifest_json(root):
     manifest_path = root / "manifest.json"
@@ -117,47 +212,8 @@ def update_manifest_json(root):
     print("Updated manifest.json")
 
 def update_service_worker(root):
-    sw_path = root / "service-worker.js"
-    if not sw_path.exists():
-        return
-
-    content = sw_path.read_text(encoding="utf-8")
-
-    new_assets = [
-        "    './assets/favicon/favicon.ico',",
-        "    './assets/favicon/apple-touch-icon.png',",
-        "    './assets/favicon/android-chrome-192x192.png',",
-        "    './assets/favicon/android-chrome-512x512.png',",
-        "    './assets/favicon/favicon-maskable-192x192.png',",
-        "    './assets/favicon/favicon-maskable-512x512.png',",
-        "    './assets/favicon/favicon.svg',"
-    ]
-
-    lines = content.splitlines()
-    new_lines = []
-    in_assets = False
-
-    for line in lines:
-        if "const STATIC_ASSETS = [" in line:
-            in_assets = True
-
-        if in_assets and "];" in line:
-            in_assets = False
-            # Insert our new assets before closing
-            for asset in new_assets:
-                new_lines.append(asset)
-            new_lines.append(line)
-            continue
-
-        if in_assets:
-            if "assets/favicon" in line:
-                continue # Skip existing favicon lines
-            new_lines.append(line)
-        else:
-            new_lines.append(line)
-
-    sw_path.write_text("\n".join(new_lines), encoding="utf-8")
-    print("Updated service-worker.js")
+    # The service worker precache list is generated from the files (new icons get new revisions)
+    write_precache_manifest(root)
 
 def update_index_html(root):
     index_path = root / "index.html"
@@ -230,6 +286,8 @@ def main():
     parser = argparse.ArgumentParser(description="Generate favicons and update project.")
     parser.add_argument("--destination", required=True, help="Directory name (destination folder)")
     parser.add_argument("--update", action="store_true", help="Update of the main project")
+    parser.add_argument("--jobs", type=int, default=0, help="Number of parallel rendering processes (0 = one per CPU core)")
+    parser.add_argument("--force", action="store_true", help="Regenerate the icons even if the SVG and the theme colour are unchanged")
     parser.add_argument("svg_filename", help="Input SVG filename")
 
     args = parser.parse_args()
@@ -249,8 +307,11 @@ def main():
     print(f"Using Theme Color: {theme_color}")
 
     # Generate Images
-    for icon_def in ICONS_CONFIG:
-        generate_icon(svg_path, dest_dir, icon_def, theme_color, bg_color)
+    try:
+        generate_icons(svg_path, dest_dir, theme_color, args.jobs or os.cpu_count() or 1, args.force)
+    except RuntimeError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
 
     if args.update:
         print("Updating project files...")
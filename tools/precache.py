@@ -0,0 +1,182 @@
+import argparse
+import hashlib
+import json
+import sys
+from pathlib import Path
+
+# Configuration
+YEAR              = "2026"
+MANIFEST_FILENAME = "precache-manifest.js"
+
+# Install-time set: everything needed to display the player offline
+CRITICAL_ASSETS = [
+    "index.html",
+    "manifest.json",
+
+    "assets/css/style.css",
+
+    "assets/images/background/tinals-2018-trame-342x342-noir.svg",
+    "assets/images/sprites/sprite.svg",
+
+    "assets/js/app.js",
+    "assets/js/control-bar.js",
+    "assets/js/audio-player.js",
+    "assets/js/video-manager.js",
+
+    "assets/favicon/android-chrome-192x192.png",
+    "assets/favicon/android-chrome-512x512.png",
+    "assets/favicon/favicon-maskable-192x192.png",
+    "assets/favicon/favicon-maskable-512x512.png",
+    "assets/favicon/apple-touch-icon.png",
+    "assets/favicon/favicon.ico",
+    "assets/favicon/favicon.svg",
+
+    "config/config_en.json",
+    "config/config_fr.json",
+
+    f"data/{YEAR}/data.min.json",
+    f"data/{YEAR}/descriptions.fr.json",
+    f"data/{YEAR}/descriptions.en.json",
+    f"data/{YEAR}/splash/affiche-tinals.webp",
+]
+
+# Thumbnail atlas of the drawer lists (tools/assets.py --image): precached instead of the
+# thumbnails it is made of
+ATLAS_SIZE_ID     = "image_thumbnail"
+ATLAS_IMAGE_PATH  = f"data/{YEAR}/images/thumbnails.webp"
+ATLAS_MAP_PATH    = f"data/{YEAR}/images/thumbnails.json"
+
+# Lazily filled set: static media, plus every artist image listed in data.json (see get_media_assets)
+MEDIA_ASSETS = [
+    "assets/images/peoples/olivier-loynet.jpg",
+
+    ATLAS_MAP_PATH,
+    ATLAS_IMAGE_PATH,
+]
+
+DEFAULT_IMAGE_FIELDS = ["image", "image_mobile", "image_thumbnail"]
+
+def get_project_root():
+    # Assuming script is in tools/
+    return Path(__file__).parent.parent
+
+def get_image_fields(root):
+    # The image variants are the ids of the "sizes" entries in config.json
+    try:
+        with open(root / "config" / "config.json", "r", encoding="utf-8") as f:
+            sizes = json.load(f).get("sizes", [])
+        return [size["id"] for size in sizes] or DEFAULT_IMAGE_FIELDS
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"Warning: Could not read config.json sizes: {e}")
+        return DEFAULT_IMAGE_FIELDS
+
+def get_preferred_image(item, field):
+    # With a <picture> descriptor (tools/assets.py --image), the file the browser picks: the first
+    # format (AVIF) at full width, not the WebP fallback of the field
+    descriptor = (item.get("image_srcset") or {}).get(field)
+    if descriptor and descriptor.get("sources"):
+        candidates = [candidate.split()[0] for candidate in descriptor["sources"][0]["srcset"].split(",") if candidate.strip()]
+        if candidates:
+            return candidates[-1] # sorted by width
+    return item.get(field)
+
+def get_media_assets(root):
+    with open(root / "data" / YEAR / "data.json", "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    fields = get_image_fields(root)
+    if (root / ATLAS_IMAGE_PATH).is_file():
+        fields = [field for field in fields if field != ATLAS_SIZE_ID]
+
+    assets = list(MEDIA_ASSETS)
+    for item in data:
+        for field in fields:
+            path = get_preferred_image(item, field)
+            if path and not path.startswith(("http://", "https://")) and path not in assets:
+                assets.append(path)
+    return assets
+
+def build_entry(root, path, url=None):
+    content = (root / path).read_bytes()
+    return {
+        "url":      url or f"./{path}",
+        "revision": hashlib.sha256(content).hexdigest()[:16],
+        "size":     len(content),
+    }
+
+def build_entries(root, paths):
+    entries = []
+    for path in paths:
+        if not (root / path).is_file():
+            print(f"Warning: {path} not found, not precached.")
+            continue
+        entries.append(build_entry(root, path))
+    return entries
+
+def build_precache_manifest(root):
+    critical = [build_entry(root, "index.html", "./")] + build_entries(root, CRITICAL_ASSETS)
+    media = build_entries(root, get_media_assets(root))
+    return {"version": get_manifest_version(critical + media), "critical": critical, "media": media}
+
+def get_manifest_version(entries):
+    # Names the runtime cache of the service worker: a new release drops the files cached at runtime
+    return hashlib.sha256(json.dumps([[entry["url"], entry["revision"]] for entry in entries]).encode("utf-8")).hexdigest()[:16]
+
+def parse_precache_manifest(text):
+    # Back from render_precache_manifest (or from its minified copy in dist/)
+    return json.loads(text[text.index("{"):text.rindex("}") + 1])
+
+def update_entries(manifest, directory, paths):
+    # Revisions of files rewritten after the manifest was generated (dist/index.html and its
+    # inlined critical CSS), read from directory
+    for entry in manifest["critical"] + manifest["media"]:
+        path = "index.html" if entry["url"] == "./" else entry["url"].removeprefix("./")
+        if path in paths:
+            entry.update(build_entry(directory, path, entry["url"]))
+    manifest["version"] = get_manifest_version(manifest["critical"] + manifest["media"])
+
+def render_precache_manifest(manifest):
+    return (
+        f"// Generated by tools/precache.py - do not edit\n"
+        f"// Each entry is cached under its revision (content hash): the service worker only\n"
+        f"// refetches the files whose content changed\n"
+        f"self.PRECACHE_MANIFEST = {json.dumps(manifest, indent=4)};\n"
+    )
+
+def write_precache_manifest(root):
+    manifest = build_precache_manifest(root)
+    content = render_precache_manifest(manifest)
+    manifest_path = root / MANIFEST_FILENAME
+
+    if manifest_path.exists() and manifest_path.read_text(encoding="utf-8") == content:
+        print(f"{MANIFEST_FILENAME} is up to date")
+    else:
+        manifest_path.write_text(content, encoding="utf-8")
+        print(f"Updated {MANIFEST_FILENAME}")
+
+    for name in ["critical", "media"]:
+        entries = manifest[name]
+        print(f"  {name:<8} {len(entries):>4} files {sum(entry['size'] for entry in entries) / 1024:>9.1f} KB")
+    return manifest
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate the service worker precache manifest.")
+    parser.add_argument("--check", action="store_true", help="Only check that the manifest is up to date (exit code 1 if not)")
+
+    args = parser.parse_args()
+
+    root = get_project_root()
+
+    if args.check:
+        manifest_path = root / MANIFEST_FILENAME
+        expected = render_precache_manifest(build_precache_manifest(root))
+        if not manifest_path.exists() or manifest_path.read_text(encoding="utf-8") != expected:
+            print(f"{MANIFEST_FILENAME} is out of date, run 'python precache.py'")
+            sys.exit(1)
+        print(f"{MANIFEST_FILENAME} is up to date")
+        return
+
+    write_precache_manifest(root)
+
+if __name__ == "__main__":
+    main()